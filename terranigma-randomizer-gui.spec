@@ -6,7 +6,7 @@ a = Analysis(
     pathex=['.', './terranigma_randomizer', './terranigma_randomizer/randomizers', './terranigma_randomizer/utils', './terranigma_randomizer/constants'],
     binaries=[],
     datas=[],
-    hiddenimports=['terranigma_randomizer.randomizers.chest', 'terranigma_randomizer.randomizers.shop', 'terranigma_randomizer.randomizers.integration', 'terranigma_randomizer.utils.rom', 'terranigma_randomizer.utils.logic', 'terranigma_randomizer.utils.spoilers', 'terranigma_randomizer.utils.asm', 'terranigma_randomizer.constants.items', 'terranigma_randomizer.constants.chests', 'terranigma_randomizer.constants.shops', 'terranigma_randomizer.constants.progression', 'tkinter', 'tkinter.filedialog', 'tkinter.ttk'],
+    hiddenimports=['terranigma_randomizer.randomizers.chest', 'terranigma_randomizer.randomizers.shop', 'terranigma_randomizer.randomizers.integration', 'terranigma_randomizer.utils.rom', 'terranigma_randomizer.utils.logic', 'terranigma_randomizer.utils.fill', 'terranigma_randomizer.utils.plan', 'terranigma_randomizer.utils.cache', 'terranigma_randomizer.utils.spoilers', 'terranigma_randomizer.utils.asm', 'terranigma_randomizer.constants.items', 'terranigma_randomizer.constants.chests', 'terranigma_randomizer.constants.shops', 'terranigma_randomizer.constants.progression', 'tkinter', 'tkinter.filedialog', 'tkinter.ttk'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -32,6 +32,9 @@ a = Analysis(
         'terranigma_randomizer.randomizers.integration',
         'terranigma_randomizer.utils.rom',
         'terranigma_randomizer.utils.logic',
+        'terranigma_randomizer.utils.fill',
+        'terranigma_randomizer.utils.plan',
+        'terranigma_randomizer.utils.cache',
         'terranigma_randomizer.utils.spoilers',
         'terranigma_randomizer.constants.items',
         'terranigma_randomizer.constants.chests',
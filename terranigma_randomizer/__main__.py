@@ -4,21 +4,31 @@ Terranigma Randomizer
 Main entry point for the randomizer
 """
 import argparse
+import logging
+import multiprocessing
 import os
 import sys
 import random
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Import modules properly
 from terranigma_randomizer.randomizers import chest, shop, integration
-from terranigma_randomizer.utils import rom, logic, spoilers, asm
+from terranigma_randomizer.utils import rom, logic, spoilers, asm, cache, plan as plans
 from terranigma_randomizer.constants import items, progression
 
+# Named explicitly, __name__ is "__main__" when run with python -m
+logger = logging.getLogger("terranigma_randomizer")
+batch_logger = logging.getLogger("terranigma_randomizer.batch")
+
+# --batch draws its distinct seeds from range(BATCH_SEED_SPACE)
+BATCH_SEED_SPACE = 1000000
+
 def main():
     """Main entry point for the randomizer CLI"""
     parser = argparse.ArgumentParser(description="Terranigma Randomizer")
-    parser.add_argument("input_rom", help="Path to the input ROM file")
-    parser.add_argument("output_rom", help="Path to the output ROM file")
+    parser.add_argument("input_rom", nargs="?", help="Path to the input ROM file (omitted with --plan-only)")
+    parser.add_argument("output_rom", nargs="?", help="Path to the output ROM file, or the spoiler log with --plan-only")
     parser.add_argument("--seed", type=int, help="Random seed (default: random)")
     parser.add_argument("--skip-chests", action="store_true", help="Skip chest randomization")
     parser.add_argument("--skip-shops", action="store_true", help="Skip shop randomization")
@@ -34,17 +44,64 @@ def main():
     parser.add_argument("--allow-duplicates", action="store_true", help="Allow duplicate weapons and armor")
     parser.add_argument("--enable-boss-magic", action="store_true", help="Enable magic usage in all boss fights")
     parser.add_argument("--skip-intro", action="store_true", help="Skip the intro sequence and start with necessary flags/items")
+    parser.add_argument("--placement", choices=["assumed", "backtrack", "greedy"], default="assumed", help="Key item placement engine: assumed fill, forward fill that backtracks on dead ends, or the older greedy placement with retries (default: assumed)")
+    parser.add_argument("--backtrack-budget", type=int, default=200, help="Undos a backtracking placement attempt may make before it starts over (default: 200)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for placement attempts or batch seeds, 0 for one per CPU (default: 1)")
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors")
+    parser.add_argument("--verbose", action="store_true", help="Log detailed placement and ROM write information")
+    parser.add_argument("--telemetry", action="store_true", help="Write placement attempt failure counters as JSON next to the spoiler log")
+    parser.add_argument("--ips", action="store_true", help="Write an IPS patch against the input ROM instead of the full ROM")
+    parser.add_argument("--save-plan", nargs="?", const="json", choices=["json", "binary"], help="Also save the placement plan next to the output, as JSON (.plan.json, default) or binary (.plan)")
+    parser.add_argument("--apply-plan", metavar="PLAN", help="Write the output ROM from a saved plan and the input ROM without running placement")
+    parser.add_argument("--cache-dir", metavar="DIR", help="Serve repeated requests (same ROM, seed and options) from a seed cache in DIR")
+    parser.add_argument("--cache-size", type=int, default=256, metavar="MB", help="Size the seed cache is kept under by evicting the least recently used seeds (default: 256)")
+    parser.add_argument("--plan-only", action="store_true", help="Plan and validate the placement without reading or writing a ROM, only the spoiler log is written")
+    parser.add_argument("--batch", type=int, metavar="N", help="Generate N seeds (derived from --seed) into the output_rom directory")
+    parser.add_argument("--seed-range", metavar="A:B", help="Generate seeds A to B-1 into the output_rom directory")
 
     args = parser.parse_args()
 
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.DEBUG if args.verbose else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout
+    )
+
+    # Plan-only runs take just the output path, the input ROM is never read
+    if args.plan_only:
+        args.input_rom, args.output_rom = None, args.output_rom or args.input_rom
+        if not args.output_rom:
+            parser.error("--plan-only needs an output path")
+        if args.ips or args.apply_plan:
+            parser.error("--plan-only does not write a ROM or IPS patch")
+    elif not args.output_rom:
+        parser.error("input_rom and output_rom are required")
+
+    if args.batch is not None and not 1 <= args.batch <= BATCH_SEED_SPACE:
+        parser.error(f"--batch must be between 1 and {BATCH_SEED_SPACE}")
+
+    seed_range = None
+    if args.seed_range:
+        try:
+            start, stop = (int(part) for part in args.seed_range.split(':'))
+        except ValueError:
+            parser.error("--seed-range must look like A:B")
+        if stop <= start:
+            parser.error("--seed-range A:B needs B greater than A")
+        seed_range = range(start, stop)
+
     # Configure options
     options = {
         "seed": args.seed if args.seed is not None else random.randint(0, 999999),
         "randomize_chests": not args.skip_chests,
         "randomize_shops": not args.skip_shops,
         "use_logic": not args.no_logic,
-        "verbose": False,
+        "verbose": args.verbose,
         "max_attempts": 5000,
+        "placement_mode": args.placement,
+        "backtrack_budget": args.backtrack_budget,
+        "workers": args.workers,
+        "telemetry": args.telemetry,
         "integrate_shop_logic": not args.no_integrate_shop_logic,
         "enforce_unique_items": not args.allow_duplicates,
         "randomize_items": True,
@@ -58,43 +115,303 @@ def main():
         "include_key_items": False,
         "special_items": [],
         "enable_boss_magic": args.enable_boss_magic,
-        "skip_intro": args.skip_intro
+        "skip_intro": args.skip_intro,
+        "output_format": "ips" if args.ips else "rom",
+        "plan_only": args.plan_only,
+        "plan_format": args.save_plan,
+        "cache_dir": args.cache_dir,
+        "cache_size": args.cache_size * 1024 * 1024
     }
 
     # Print banner
-    print("Terranigma Randomizer - Python Edition")
-    print("======================================")
-    print(f"Using seed: {options['seed']}")
+    logger.info("Terranigma Randomizer - Python Edition")
+    logger.info("======================================")
+    logger.info("Using seed: %s", options['seed'])
+
+    # Apply a stored plan, no placement or logic runs
+    if args.apply_plan:
+        result = run_apply_plan(args.input_rom, args.output_rom, args.apply_plan, options)
+        if result["success"]:
+            logger.info("\n%s", result["message"])
+            return 0
+        logger.error("\nError: %s", result["error"])
+        return 1
+
+    # Batch mode: output_rom is a directory that receives <seed>.sfc (or .ips) and <seed>.txt,
+    # or only <seed>.txt with --plan-only
+    if seed_range is not None:
+        return run_batch(args.input_rom, args.output_rom, list(seed_range), options)
+    if args.batch:
+        batch_seeds = random.Random(options['seed']).sample(range(BATCH_SEED_SPACE), args.batch)
+        return run_batch(args.input_rom, args.output_rom, batch_seeds, options)
 
     # Run randomizer
     try:
-        result = run_randomizer(args.input_rom, args.output_rom, options)
+        if args.plan_only:
+            result = run_plan_only(args.output_rom, options)
+        else:
+            result = run_randomizer(args.input_rom, args.output_rom, options)
         if result["success"]:
-            print("\n" + result["message"])
+            logger.info("\n%s", result["message"])
             return 0
         else:
-            print("\nError: " + result["error"])
+            logger.error("\nError: %s", result["error"])
             return 1
     except Exception as e:
-        print(f"Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error: %s", e)
         return 1
 
+def load_rom_fingerprint(input_path, options):
+    """
+    Fingerprint the base ROM and check that it can be randomized
+    
+    The fingerprint is kept in the seed cache directory when there is one,
+    so repeat runs do not hash the ROM again.
+    
+    Args:
+        input_path (str): Path to the base ROM
+        options (dict): Randomization options
+        
+    Returns:
+        tuple: (fingerprint from rom.fingerprint_rom, list of problems with the ROM)
+    """
+    cache_path = None
+    if options.get("cache_dir"):
+        os.makedirs(options["cache_dir"], exist_ok=True)
+        cache_path = os.path.join(options["cache_dir"], cache.FINGERPRINT_CACHE_FILE)
+    
+    fingerprint = rom.get_rom_fingerprint(input_path, cache_path)
+    logger.info("ROM CRC32: %s, SHA-1: %s", fingerprint['crc32'], fingerprint['sha1'])
+    return fingerprint, rom.check_rom_fingerprint(fingerprint)
+
+def is_same_file(input_path, output_path):
+    """Check whether writing output_path would overwrite the file at input_path"""
+    return os.path.exists(output_path) and os.path.samefile(input_path, output_path)
+
 def run_randomizer(input_path, output_path, options):
     """Run the randomizer with the specified options"""
     try:
-        # Load the ROM
-        print(f"Loading ROM: {input_path}")
-        rom_data = rom.read_rom(input_path)
-        print(f"Successfully loaded ROM: {len(rom_data)} bytes")
+        logger.info("Loading ROM: %s", input_path)
+        fingerprint, problems = load_rom_fingerprint(input_path, options)
+        if problems:
+            return {
+                "success": False,
+                "error": "Unsupported ROM: " + "; ".join(problems)
+            }
+        
+        # Map the ROM read-only, it is only copied when the output is built and
+        # the map is closed once the output is written. A ROM that is about to
+        # be overwritten is read into memory instead
+        with rom.open_rom_image(input_path, copy=is_same_file(input_path, output_path)) as (header, rom_data):
+            logger.info("Successfully loaded ROM: %s bytes", len(rom_data))
+            if header:
+                logger.info("ROM has a %s byte copier header, it is kept in the output", len(header))
+            return randomize_rom_data(rom_data, output_path, options, fingerprint, header)
+    except Exception as e:
+        import traceback
+        return {
+            "success": False,
+            "error": f"{str(e)}\n{traceback.format_exc()}"
+        }
 
-        # Create a copy of the ROM data to modify
-        randomized_rom = bytearray(rom_data)
+def run_plan_only(output_path, options):
+    """
+    Plan a seed without reading or writing a ROM
+    
+    Runs the key item placement, shop integration and logic validation on the
+    known chest and shop databases and writes only the spoiler log, so seeds
+    can be searched on machines that do not hold the ROM.
+    
+    Args:
+        output_path (str): Path whose .txt sibling receives the spoiler log
+        options (dict): Randomization options
+        
+    Returns:
+        dict: Result with success flag and message, and the plan from
+              integration.plan_with_unique_items under "plan"
+    """
+    try:
+        if not (options["randomize_chests"] and options["randomize_shops"] and options["integrate_shop_logic"]):
+            return {
+                "success": False,
+                "error": "Plan-only mode needs chest and shop randomization with integrated shop logic"
+            }
+        
+        if options.get("telemetry"):
+            options = dict(options, telemetry_path=str(Path(output_path).with_suffix('.telemetry.json')))
+        
+        logger.info("\nPlanning unique item placement and shop integration without a ROM...")
+        plan = integration.plan_with_unique_items(options)
+        if not plan["success"]:
+            return plan
+        
+        spoiler_path = str(Path(output_path).with_suffix('.txt'))
+        logger.info("Generating spoiler log: %s", spoiler_path)
+        spoiler_content = spoilers.generate_enhanced_spoiler_text({
+            "chest_spoiler_log": plan["chest_spoiler_log"],
+            "shop_spoiler_log": plan["shop_spoiler_log"],
+            "key_items_in_shops": plan["key_items_in_shops"],
+            "unique_items_in_shops": plan["unique_items_in_shops"],
+            "playthrough": plan["playthrough"]
+        }, options['seed'])
+        
+        with open(spoiler_path, 'w') as f:
+            f.write(spoiler_content)
+        
+        if options.get("plan_format"):
+            save_plan(output_path, plans.create_plan(options['seed'], plan["chest_contents"], plan["shop_spoiler_log"], options), options)
+        
+        return {
+            "success": True,
+            "message": f"Planning complete!\nSpoiler log: {spoiler_path}",
+            "plan": plan
+        }
+        
+    except Exception as e:
+        import traceback
+        return {
+            "success": False,
+            "error": f"{str(e)}\n{traceback.format_exc()}"
+        }
+
+def save_plan(output_path, plan, options):
+    """Save a placement plan next to the output in the format chosen by options['plan_format']"""
+    binary = options["plan_format"] == "binary"
+    plan_path = str(Path(output_path).with_suffix('.plan' if binary else '.plan.json'))
+    logger.info("Saving placement plan: %s", plan_path)
+    plans.save_plan(plan, plan_path, binary)
+
+def run_apply_plan(input_path, output_path, plan_path, options):
+    """
+    Write a randomized ROM from a saved plan and the base ROM
+    
+    No placement or logic runs, the planned bytes are written as they are.
+    
+    Args:
+        input_path (str): Path to the base ROM
+        output_path (str): Path to the output ROM (or .ips with options['output_format'] "ips")
+        plan_path (str): Path to a JSON or binary plan
+        options (dict): Randomization options, only the output format is used
+        
+    Returns:
+        dict: Result with success flag and message or error
+    """
+    try:
+        _, problems = load_rom_fingerprint(input_path, options)
+        if problems:
+            return {
+                "success": False,
+                "error": "Unsupported ROM: " + "; ".join(problems)
+            }
+        plan = plans.load_plan(plan_path)
+        if options.get("output_format") == "ips":
+            output_path = str(Path(output_path).with_suffix('.ips'))
+        
+        # The map is closed once the output is written, so the patched image
+        # is built up front instead of keeping a view of the map
+        with rom.open_rom_image(input_path, copy=is_same_file(input_path, output_path)) as (header, rom_data):
+            logger.info("Applying plan for seed %s: %s", plan['seed'], plan_path)
+            rom_image = plans.apply_plan(rom_data, plan).materialize()
+            
+            if options.get("output_format") == "ips":
+                patch_size = rom.write_ips_patch(output_path, rom_data, rom_image, len(header))
+                logger.info("Patch size: %s bytes", patch_size)
+            else:
+                rom.write_rom(output_path, rom_image, header)
+        
+        return {
+            "success": True,
+            "message": f"Plan applied!\nOutput: {output_path}"
+        }
+        
+    except Exception as e:
+        import traceback
+        return {
+            "success": False,
+            "error": f"{str(e)}\n{traceback.format_exc()}"
+        }
+
+def write_cached_seed(rom_data, output_path, entry, options, header=b''):
+    """
+    Write the output of a seed served from the seed cache
+    
+    Args:
+        rom_data (bytes): Base ROM image
+        output_path (str): Path to the output ROM (or .ips with options['output_format'] "ips")
+        entry (dict): Cache entry from SeedCache.get
+        options (dict): Randomization options
+        header (bytes): Copier header of the base ROM
+        
+    Returns:
+        dict: Result with success flag and message
+    """
+    logger.info("\nSeed %s found in the cache", options['seed'])
+    
+    if options.get("output_format") == "ips":
+        output_path = str(Path(output_path).with_suffix('.ips'))
+        logger.info("Writing IPS patch to: %s", output_path)
+        if header:
+            # Cached patches address the image, move them past the header
+            rom.write_ips_patch(output_path, rom_data, rom.apply_ips_patch(rom_data, entry["patch"]), len(header))
+        else:
+            with open(output_path, 'wb') as f:
+                f.write(entry["patch"])
+    else:
+        logger.info("Writing randomized ROM to: %s", output_path)
+        rom.write_rom(output_path, rom.apply_ips_patch(rom_data, entry["patch"]), header)
+    
+    spoiler_path = str(Path(output_path).with_suffix('.txt'))
+    logger.info("Writing spoiler log: %s", spoiler_path)
+    with open(spoiler_path, 'w') as f:
+        f.write(entry["spoiler"].decode('utf-8'))
+    
+    if options.get("plan_format"):
+        save_plan(output_path, plans.decode_plan(entry["plan"]), options)
+    
+    return {
+        "success": True,
+        "message": f"Randomization complete (from cache)!\nOutput: {output_path}\nSpoiler log: {spoiler_path}"
+    }
+
+def randomize_rom_data(rom_data, output_path, options, fingerprint=None, header=b''):
+    """
+    Randomize an already loaded ROM image and write the result and spoiler log
+    
+    Args:
+        rom_data (bytes): Base ROM image without copier header
+        output_path (str): Path to the output ROM
+        options (dict): Randomization options
+        fingerprint (dict): Fingerprint of the base ROM from rom.fingerprint_rom, computed if needed
+        header (bytes): Copier header of the base ROM, written back in front of the output
+        
+    Returns:
+        dict: Result with success flag and message or error
+    """
+    try:
+        if options.get("telemetry"):
+            options = dict(options, telemetry_path=str(Path(output_path).with_suffix('.telemetry.json')))
+
+        # Serve a seed generated before with the same ROM and options from the cache
+        seed_cache = None
+        if options.get("cache_dir"):
+            seed_cache = cache.SeedCache(options["cache_dir"], options.get("cache_size", cache.DEFAULT_CACHE_SIZE))
+            rom_digest = fingerprint['sha1'] if fingerprint else cache.get_rom_digest(rom_data)
+            cache_key = cache.get_cache_key(rom_digest, options)
+            cached_seed = seed_cache.get(cache_key)
+            if cached_seed:
+                return write_cached_seed(rom_data, output_path, cached_seed, options, header)
+
+        # Identify the base ROM so seeds in this process share its parsed shops
+        if fingerprint:
+            options = dict(options, rom_digest=fingerprint['sha1'])
+
+        # Collect every write in one overlay over the loaded ROM, the
+        # patched image is only built when the output is written
+        randomized_rom = rom.RomPatchBuffer(rom_data)
 
         # Handle different randomization strategies
         if options["randomize_chests"] and options["randomize_shops"] and options["integrate_shop_logic"]:
-            print("\nRandomizing with unique item placement and shop integration...")
+            logger.info("\nRandomizing with unique item placement and shop integration...")
             
             if options["enforce_unique_items"]:
                 result = integration.randomize_with_unique_items(randomized_rom, options)
@@ -105,41 +422,60 @@ def run_randomizer(input_path, output_path, options):
                 return result
             
             randomized_rom = result["rom"]
+            chest_contents = result["chest_contents"]
             chest_spoiler_log = result.get("chest_spoiler_log", [])
             randomized_shops = result.get("shop_spoiler_log", [])
             key_items_in_shops = result.get("key_items_in_shops", [])
             unique_items_in_shops = result.get("unique_items_in_shops", [])
+            playthrough = result.get("playthrough")
         else:
             # Original separate randomization
+            chest_contents = {}
             chest_spoiler_log = []
             randomized_shops = []
             key_items_in_shops = []
             unique_items_in_shops = []
+            playthrough = None
             
             if options["randomize_chests"]:
-                print("\nRandomizing chests...")
+                logger.info("\nRandomizing chests...")
                 chest_result = chest.randomize_chests(randomized_rom, options)
                 randomized_rom = chest_result["rom"]
+                chest_contents = chest_result["chest_contents"]
                 chest_spoiler_log = chest_result["spoiler_log"]
             
             if options["randomize_shops"]:
-                print("\nRandomizing shops...")
+                logger.info("\nRandomizing shops...")
                 shop_result = shop.randomize_shops(randomized_rom, options)
                 randomized_rom = shop_result["rom"]
                 randomized_shops = shop_result["shops"]
 
         # Apply ASM patches
         if options.get("enable_boss_magic") or options.get("skip_intro"):
-            print("\nApplying ASM patches...")
+            logger.info("\nApplying ASM patches...")
             randomized_rom = asm.apply_asm_patches(randomized_rom, options)
 
-        # Write the randomized ROM
-        print(f"\nWriting randomized ROM to: {output_path}")
-        rom.write_rom(output_path, randomized_rom)
+        # Fix the internal checksum from the bytes that changed
+        randomized_rom.update_checksum()
+
+        # Build the patched image and the cached patch before any output is
+        # written, the base ROM may be a map of the file that is overwritten
+        rom_image = randomized_rom.materialize()
+        cache_patch = rom.create_ips_patch(rom_data, rom_image) if seed_cache else None
+
+        # Write the randomized ROM, or just the changes as an IPS patch
+        if options.get("output_format") == "ips":
+            output_path = str(Path(output_path).with_suffix('.ips'))
+            logger.info("\nWriting IPS patch to: %s", output_path)
+            patch_size = rom.write_ips_patch(output_path, rom_data, rom_image, len(header))
+            logger.info("Patch size: %s bytes", patch_size)
+        else:
+            logger.info("\nWriting randomized ROM to: %s", output_path)
+            rom.write_rom(output_path, rom_image, header)
 
         # Generate spoiler log
         spoiler_path = str(Path(output_path).with_suffix('.txt'))
-        print(f"Generating spoiler log: {spoiler_path}")
+        logger.info("Generating spoiler log: %s", spoiler_path)
         
         # Generate appropriate spoiler log based on options
         if options["randomize_chests"] and options["randomize_shops"] and options["integrate_shop_logic"]:
@@ -148,7 +484,8 @@ def run_randomizer(input_path, output_path, options):
                 "chest_spoiler_log": chest_spoiler_log,
                 "shop_spoiler_log": randomized_shops,
                 "key_items_in_shops": key_items_in_shops,
-                "unique_items_in_shops": unique_items_in_shops
+                "unique_items_in_shops": unique_items_in_shops,
+                "playthrough": playthrough
             }, options['seed'])
         elif options["randomize_chests"] and not options["randomize_shops"]:
             # Chest-only spoiler
@@ -168,6 +505,18 @@ def run_randomizer(input_path, output_path, options):
         with open(spoiler_path, 'w') as f:
             f.write(spoiler_content)
 
+        if options.get("plan_format") or seed_cache:
+            plan = plans.create_plan(options['seed'], chest_contents, randomized_shops, options)
+            if options.get("plan_format"):
+                save_plan(output_path, plan, options)
+
+        if seed_cache:
+            seed_cache.put(cache_key, {
+                "plan": plans.encode_plan(plan),
+                "patch": cache_patch,
+                "spoiler": spoiler_content.encode('utf-8')
+            })
+
         return {
             "success": True,
             "message": f"Randomization complete!\nOutput: {output_path}\nSpoiler log: {spoiler_path}"
@@ -180,5 +529,99 @@ def run_randomizer(input_path, output_path, options):
             "error": f"{str(e)}\n{traceback.format_exc()}"
         }
 
+# Base ROM image for batch workers, its copier header and fingerprint, set once per process by init_batch_worker
+_batch_rom_data = None
+_batch_rom_header = b''
+_batch_rom_fingerprint = None
+
+def init_batch_worker(input_path, fingerprint=None):
+    """Map the base ROM once in this worker process (unless planning only) and mute per-seed progress logs"""
+    global _batch_rom_data, _batch_rom_header, _batch_rom_fingerprint
+    if input_path is not None:
+        _batch_rom_header, _batch_rom_data = rom.map_rom_image(input_path)
+        _batch_rom_fingerprint = fingerprint
+    
+    # Per-seed progress would interleave across workers, keep warnings and errors
+    logger.setLevel(max(logging.WARNING, logger.getEffectiveLevel()))
+
+def run_batch_seed(seed, output_dir, options):
+    """
+    Generate one batch seed from the worker's base ROM
+    
+    Args:
+        seed (int): Seed to generate
+        output_dir (str): Directory for <seed>.sfc and <seed>.txt
+        options (dict): Randomization options shared by the batch
+        
+    Returns:
+        dict: Result from randomize_rom_data or run_plan_only with the seed added
+    """
+    seed_options = dict(options, seed=seed, workers=1)
+    output_path = str(Path(output_dir) / f"{seed}.sfc")
+    if options.get("plan_only"):
+        result = run_plan_only(output_path, seed_options)
+    else:
+        result = randomize_rom_data(_batch_rom_data, output_path, seed_options, _batch_rom_fingerprint, _batch_rom_header)
+    result["seed"] = seed
+    return result
+
+def run_batch(input_path, output_dir, seeds, options):
+    """
+    Generate many seeds from one base ROM
+    
+    Each worker process maps the ROM once, so the OS shares its pages
+    between workers instead of every worker holding a copy. Seeds run
+    in a pool of options['workers'] processes (0 means one per CPU), and each
+    seed writes <seed>.sfc (or <seed>.ips) and <seed>.txt into output_dir.
+    
+    Args:
+        input_path (str): Path to the base ROM, None with options['plan_only']
+        output_dir (str): Directory for the generated ROMs and spoiler logs
+        seeds (list): Seeds to generate
+        options (dict): Randomization options shared by the batch
+        
+    Returns:
+        int: Exit code, 0 if every seed succeeded
+    """
+    # Keep reporting at the configured level once the package logger is muted
+    batch_logger.setLevel(logger.getEffectiveLevel())
+    
+    # Reject a bad base ROM before any seed is planned
+    fingerprint = None
+    if input_path is not None:
+        fingerprint, problems = load_rom_fingerprint(input_path, options)
+        if problems:
+            batch_logger.error("Unsupported ROM: %s", "; ".join(problems))
+            return 1
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    workers = options.get("workers", 1) or os.cpu_count() or 1
+    batch_logger.info("Generating %s seeds into %s with %s worker(s)", len(seeds), output_dir, workers)
+    
+    if workers <= 1:
+        init_batch_worker(input_path, fingerprint)
+        results = (run_batch_seed(seed, output_dir, options) for seed in seeds)
+        return report_batch(results, len(seeds))
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(input_path, fingerprint)) as executor:
+        results = executor.map(run_batch_seed, seeds, [output_dir] * len(seeds), [options] * len(seeds))
+        return report_batch(results, len(seeds))
+
+def report_batch(results, total):
+    """Log one line per batch seed and return the batch exit code"""
+    failed = 0
+    for result in results:
+        if result["success"]:
+            batch_logger.info("Seed %s: OK", result['seed'])
+        else:
+            failed += 1
+            batch_logger.error("Seed %s: FAILED - %s", result['seed'], result['error'].splitlines()[0])
+    
+    batch_logger.info("\nBatch complete: %s/%s seeds generated", total - failed, total)
+    return 1 if failed else 0
+
 if __name__ == "__main__":
+    # Needed for the process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
@@ -213,6 +213,20 @@ for id_hex, item in ITEM_DATABASE.items():
     if item['name'] not in ITEM_NAME_TO_ID:
         ITEM_NAME_TO_ID[item['name']] = int(id_hex, 16)
 
+# Integer-keyed indexes built once at import time so the randomizers
+# never have to format IDs to hex strings or scan ITEM_DATABASE
+ITEM_BY_ID = {int(id_hex, 16): item for id_hex, item in ITEM_DATABASE.items()}
+
+# Items grouped by type, in ITEM_DATABASE order. Each record carries its
+# hex ID under 'id' alongside the database fields.
+ITEMS_BY_TYPE = {}
+ITEM_IDS_BY_TYPE = {}
+for id_hex, item in ITEM_DATABASE.items():
+    ITEMS_BY_TYPE.setdefault(item['type'], []).append({'id': id_hex, **item})
+    ITEM_IDS_BY_TYPE.setdefault(item['type'], []).append(int(id_hex, 16))
+ITEMS_BY_TYPE = {item_type: tuple(items) for item_type, items in ITEMS_BY_TYPE.items()}
+ITEM_IDS_BY_TYPE = {item_type: tuple(ids) for item_type, ids in ITEM_IDS_BY_TYPE.items()}
+
 # ROM address constants
 CHEST_DATA_START = 0x19E14C
 CHEST_ENTRY_SIZE = 7
@@ -245,17 +259,16 @@ def get_item_name(item_id):
     Returns:
         str: Item name or "Unknown Item" if not found
     """
-    id_hex = f"{item_id:04X}"
-    
-    if id_hex in ITEM_DATABASE:
-        return ITEM_DATABASE[id_hex]['name']
+    item = ITEM_BY_ID.get(item_id)
+    if item is not None:
+        return item['name']
     
     # For gem items with high bit set
-    gem_id_hex = f"{(item_id | 0x8000):04X}"
-    if gem_id_hex in ITEM_DATABASE:
-        return ITEM_DATABASE[gem_id_hex]['name']
+    item = ITEM_BY_ID.get(item_id | 0x8000)
+    if item is not None:
+        return item['name']
     
-    return f"Unknown Item (0x{id_hex})"
+    return f"Unknown Item (0x{item_id:04X})"
 
 def get_item_info(item_id):
     """
@@ -267,5 +280,43 @@ def get_item_info(item_id):
     Returns:
         dict: Item information or default values if not found
     """
-    hex_id = f"{item_id:04X}"
-    return ITEM_DATABASE.get(hex_id, {'name': 'Unknown', 'type': 'Unknown', 'power': 0})
\ No newline at end of file
+    item = ITEM_BY_ID.get(item_id)
+    if item is None:
+        return {'name': 'Unknown', 'type': 'Unknown', 'power': 0}
+    return item
+
+def get_item_id(item_name):
+    """
+    Get an item ID from its name
+    
+    Args:
+        item_name (str): The item name
+        
+    Returns:
+        int: Item ID, or None if no item has that name
+    """
+    return ITEM_NAME_TO_ID.get(item_name)
+
+def get_items_by_type(item_type):
+    """
+    Get every item of a given type
+    
+    Args:
+        item_type (str): One of the ItemTypes constants
+        
+    Returns:
+        tuple: Item records (with their hex ID under 'id') in database order
+    """
+    return ITEMS_BY_TYPE.get(item_type, ())
+
+def get_item_ids_by_type(item_type):
+    """
+    Get the IDs of every item of a given type
+    
+    Args:
+        item_type (str): One of the ItemTypes constants
+        
+    Returns:
+        tuple: Item IDs in database order
+    """
+    return ITEM_IDS_BY_TYPE.get(item_type, ())
\ No newline at end of file
@@ -3,6 +3,9 @@ Game progression data for Terranigma Randomizer
 Contains information about game areas, progression logic, and shop locations
 """
 
+from functools import lru_cache
+from terranigma_randomizer.constants.shops import KNOWN_SHOPS
+
 # Shop locations
 SHOP_LOCATIONS = {
     '0': 'Crysta Day',
@@ -45,6 +48,12 @@ SHOP_NAME_TO_ID = {
 # Reverse mapping for displaying shop names
 SHOP_ID_TO_NAME = {v: k for k, v in SHOP_NAME_TO_ID.items()}
 
+# Map numeric shop IDs from KNOWN_SHOPS to the shop IDs used by the logic
+ROM_SHOP_ID_TO_SHOP_ID = {
+    shop['id']: SHOP_NAME_TO_ID[shop['location']]
+    for shop in KNOWN_SHOPS if shop['location'] in SHOP_NAME_TO_ID
+}
+
 # Map shop IDs to region requirements - which area must be accessible to reach the shop
 SHOP_ID_TO_REGION = {
     'SHOP_CRYSTA_DAY': 'CRYSTA',
@@ -67,6 +76,10 @@ SHOP_ID_TO_REGION = {
 
 }
 
+# Numeric shop IDs that must not hold key items: their table at 0x19D2A2 is
+# overwritten by shop 38, so anything placed there never reaches the game
+UNSAFE_SHOPS_FOR_KEY_ITEMS = [18, 37]
+
 # Game progression areas for scaling equipment
 GAME_AREAS = [
     # Early game
@@ -310,6 +323,41 @@ KEY_ITEM_GATES = {
     'Hero Pike': ['DARK_GAIA']
 }
 
+# Compiled accessibility tables
+# Every item named in a requirement gets one bit and every area gets one bit,
+# so "can we reach this area" becomes a single mask test instead of a scan.
+ITEM_BITS = {}
+for _area in PROGRESSION_AREAS.values():
+    for _item in _area['required']:
+        if _item not in ITEM_BITS:
+            ITEM_BITS[_item] = 1 << len(ITEM_BITS)
+for _item in KEY_ITEM_GATES:
+    if _item not in ITEM_BITS:
+        ITEM_BITS[_item] = 1 << len(ITEM_BITS)
+
+AREA_BITS = {area_name: 1 << i for i, area_name in enumerate(PROGRESSION_AREAS)}
+AREA_BITS_IN_ORDER = tuple((bit, area_name) for area_name, bit in AREA_BITS.items())
+
+# Areas that are always open, regardless of requirements
+BASE_AREAS = ['CRYSTA', 'UNDERWORLD_START']
+BASE_AREA_MASK = 0
+for _area_name in BASE_AREAS:
+    BASE_AREA_MASK |= AREA_BITS[_area_name]
+
+# (area bit, required item mask) for every area
+AREA_REQUIRED_MASKS = tuple(
+    (AREA_BITS[area_name], sum(ITEM_BITS[item] for item in set(area['required'])))
+    for area_name, area in PROGRESSION_AREAS.items()
+)
+
+# Chest IDs per area, in the order they are listed
+AREA_CHESTS = {area_name: tuple(area['contains']) for area_name, area in PROGRESSION_AREAS.items()}
+
+# (shop ID, bit of the area the shop is in) - shops in unknown areas are never reachable
+SHOP_REGION_BITS = tuple(
+    (shop_id, AREA_BITS.get(region, 0)) for shop_id, region in SHOP_ID_TO_REGION.items()
+)
+
 def get_progression_tier(shop_location):
     """
     Determine the game progression tier for a shop location
@@ -328,6 +376,65 @@ def get_progression_tier(shop_location):
     # Default to tier 2 (mid-game) if not found
     return 2
 
+def get_item_mask(collected_items):
+    """
+    Convert a collection of item names into a requirement bitmask
+    
+    Args:
+        collected_items (iterable): Item names that have been collected
+        
+    Returns:
+        int: Bitmask of the collected items that gate progression
+    """
+    item_mask = 0
+    for item in collected_items:
+        item_mask |= ITEM_BITS.get(item, 0)
+    return item_mask
+
+@lru_cache(maxsize=4096)
+def get_accessible_locations_for_mask(item_mask):
+    """
+    Resolve areas, chests and shops reachable with an item bitmask in one pass
+    
+    Area requirements only name items, so a single sweep over the compiled
+    requirement masks is enough - no fixpoint loop is needed.
+    
+    Args:
+        item_mask (int): Bitmask built with get_item_mask
+        
+    Returns:
+        tuple: (area_mask, areas, chests, shops) - areas, chests and shops are tuples
+               in PROGRESSION_AREAS / SHOP_ID_TO_REGION order
+    """
+    area_mask = BASE_AREA_MASK
+    for area_bit, required_mask in AREA_REQUIRED_MASKS:
+        if not required_mask & ~item_mask:
+            area_mask |= area_bit
+    
+    areas = []
+    chests = []
+    for area_bit, area_name in AREA_BITS_IN_ORDER:
+        if area_mask & area_bit:
+            areas.append(area_name)
+            chests.extend(AREA_CHESTS[area_name])
+    
+    shops = tuple(shop_id for shop_id, region_bit in SHOP_REGION_BITS if area_mask & region_bit)
+    
+    return area_mask, tuple(areas), tuple(chests), shops
+
+def get_accessible_locations(collected_items):
+    """
+    Get the accessible areas, chests and shops based on currently collected items
+    
+    Args:
+        collected_items (set): Set of item names that have been collected
+        
+    Returns:
+        tuple: (areas, chests, shops) lists, as returned by the individual getters
+    """
+    _, areas, chests, shops = get_accessible_locations_for_mask(get_item_mask(collected_items))
+    return list(areas), list(chests), list(shops)
+
 def get_accessible_areas(collected_items):
     """
     Get the accessible areas based on currently collected items
@@ -338,28 +445,7 @@ def get_accessible_areas(collected_items):
     Returns:
         list: Array of area IDs that are accessible
     """
-    # Start with base areas
-    accessible_areas = ['CRYSTA', 'UNDERWORLD_START',]
-    
-    # Keep looping until no new areas are found
-    progress = True
-    while progress:
-        progress = False
-        
-        # Check each progression area to see if we can access it
-        for area_name, area in PROGRESSION_AREAS.items():
-            # Skip already accessible areas
-            if area_name in accessible_areas:
-                continue
-            
-            # Check if all required items for this area are collected
-            can_access = all(item in collected_items for item in area['required'])
-            
-            if can_access:
-                accessible_areas.append(area_name)
-                progress = True  # We made progress, so continue checking
-    
-    return accessible_areas
+    return list(get_accessible_locations_for_mask(get_item_mask(collected_items))[1])
 
 def get_accessible_chests(collected_items):
     """
@@ -371,15 +457,7 @@ def get_accessible_chests(collected_items):
     Returns:
         list: Array of chest IDs that are accessible
     """
-    accessible_areas = get_accessible_areas(collected_items)
-    accessible_chests = []
-    
-    # Get all chests from accessible areas
-    for area in accessible_areas:
-        if area in PROGRESSION_AREAS and PROGRESSION_AREAS[area]['contains']:
-            accessible_chests.extend(PROGRESSION_AREAS[area]['contains'])
-    
-    return accessible_chests
+    return list(get_accessible_locations_for_mask(get_item_mask(collected_items))[2])
 
 def get_accessible_shops(collected_items):
     """
@@ -391,12 +469,4 @@ def get_accessible_shops(collected_items):
     Returns:
         list: Array of shop IDs that are accessible
     """
-    accessible_areas = get_accessible_areas(collected_items)
-    accessible_shops = []
-    
-    # Check each shop to see if its region is accessible
-    for shop_id, region in SHOP_ID_TO_REGION.items():
-        if region in accessible_areas:
-            accessible_shops.append(shop_id)
-    
-    return accessible_shops
\ No newline at end of file
+    return list(get_accessible_locations_for_mask(get_item_mask(collected_items))[3])
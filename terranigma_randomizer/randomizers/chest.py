@@ -2,10 +2,14 @@
 Chest randomization module for Terranigma Randomizer
 """
 
+import logging
 import random
 from terranigma_randomizer.constants.chests import CHEST_MAP, KNOWN_CHESTS
 from terranigma_randomizer.constants.items import get_item_name, PROGRESSION_KEY_ITEMS, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID
 from terranigma_randomizer.utils.logic import create_seeded_rng, create_logical_placement, shuffle_array
+from terranigma_randomizer.utils.rom import as_patch_buffer
+
+logger = logging.getLogger(__name__)
 
 def read_chests_from_rom(rom_data):
     """
@@ -17,7 +21,7 @@ def read_chests_from_rom(rom_data):
     Returns:
         list: Array of chest objects with current data
     """
-    print('Reading chest data from ROM...')
+    logger.info("Reading chest data from ROM...")
     
     # Create a deep copy of the known chests array to avoid modifying the original
     import copy
@@ -27,7 +31,7 @@ def read_chests_from_rom(rom_data):
     for chest in chests:
         address = chest.get('address')
         if not address or address + 1 >= len(rom_data):
-            print(f"Warning: Invalid address {hex(address) if address else 'None'} for chest {chest.get('id')}")
+            logger.warning("Warning: Invalid address %s for chest %s", hex(address) if address else 'None', chest.get('id'))
             continue
         
         # Read the item ID (2 bytes)
@@ -41,34 +45,44 @@ def read_chests_from_rom(rom_data):
     
     return chests
 
+def get_vanilla_chests():
+    """
+    Get chest data from the known chests database instead of a ROM
+    
+    Returns:
+        list: Array of chest objects with their vanilla contents
+    """
+    import copy
+    return copy.deepcopy(list(CHEST_MAP.values()))
+
 def write_chests_to_rom(rom_data, chest_contents):
     """
     Write randomized chest contents to ROM
     
     Args:
-        rom_data (bytearray): ROM buffer
+        rom_data (bytearray or RomPatchBuffer): ROM buffer
         chest_contents (dict): Map of chest IDs to item IDs
         
     Returns:
-        bytearray: Modified ROM buffer
+        RomPatchBuffer: ROM buffer with the chest writes applied
     """
-    print('Writing randomized chest contents to ROM...')
+    logger.info("Writing randomized chest contents to ROM...")
     
-    # Create a copy of the ROM data to modify
-    new_rom_data = bytearray(rom_data)
+    # Write into a patch buffer instead of copying the ROM
+    new_rom_data = as_patch_buffer(rom_data)
     
     # Apply the randomized contents to each chest
     for chest_id, item_id in chest_contents.items():
         # Find the chest in our known chests
         if chest_id not in CHEST_MAP:
-            print(f"Warning: Unknown chest ID {chest_id} - skipping")
+            logger.warning("Warning: Unknown chest ID %s - skipping", chest_id)
             continue
         
         chest = CHEST_MAP[chest_id]
         address = chest.get('address')
         
         if not address or address + 4 >= len(new_rom_data):
-            print(f"Warning: Invalid address {hex(address) if address else 'None'} for chest {chest_id} - skipping")
+            logger.warning("Warning: Invalid address %s for chest %s - skipping", hex(address) if address else 'None', chest_id)
             continue
         
         # Write the item ID (2 bytes)
@@ -76,7 +90,7 @@ def write_chests_to_rom(rom_data, chest_contents):
         new_rom_data[address + 4] = (item_id >> 8) & 0xFF  # High byte
         
         if item_id != chest.get('itemID'):
-            print(f"Chest {chest_id}: {chest.get('itemName')} -> {get_item_name(item_id)}")
+            logger.debug("Chest %s: %s -> %s", chest_id, chest.get('itemName'), get_item_name(item_id))
     
     return new_rom_data
 
@@ -89,10 +103,10 @@ def randomize_chests(rom_data, options):
         options (dict): Randomization options
         
     Returns:
-        dict: Modified ROM buffer and spoiler log
+        dict: Modified ROM buffer, chest contents written and spoiler log
     """
-    print('\nRandomizing chests...')
-    print('NOTE: Portrait (chest 150) will remain in vanilla location due to Storkolm entry bug')
+    logger.info("\nRandomizing chests...")
+    logger.info("NOTE: Portrait (chest 150) will remain in vanilla location due to Storkolm entry bug")
     
     # Read current chest data for spoiler log
     current_chests = read_chests_from_rom(rom_data)
@@ -104,19 +118,19 @@ def randomize_chests(rom_data, options):
     chest_contents = {}
     
     if options.get('use_logic', True):
-        print('Using logical chest placement...')
+        logger.info("Using logical chest placement...")
         # Create a logical placement that ensures the game is beatable
-        chest_contents = create_logical_placement(options.get('verbose', False))
+        chest_contents = create_logical_placement(options.get('verbose', False), rng)
         
         if not chest_contents:
-            print('Failed to create logical placement, falling back to random placement')
+            logger.warning("Failed to create logical placement, falling back to random placement")
             options['use_logic'] = False
         else:
             # IMPORTANT: Ensure Portrait stays in its vanilla location
             chest_contents[PORTRAIT_CHEST_ID] = PORTRAIT_ITEM_ID
     
     if not options.get('use_logic', True):
-        print('Using random chest placement...')
+        logger.info("Using random chest placement...")
         # Collect all item IDs from the current chests EXCEPT Portrait
         all_item_ids = []
         for chest in current_chests:
@@ -124,7 +138,7 @@ def randomize_chests(rom_data, options):
                 all_item_ids.append(chest['itemID'])
         
         # Shuffle the items
-        shuffle_array(all_item_ids)
+        shuffle_array(all_item_ids, rng)
         
         # Assign items to chests (skipping Portrait chest)
         item_index = 0
@@ -162,5 +176,6 @@ def randomize_chests(rom_data, options):
     
     return {
         'rom': modified_rom,
+        'chest_contents': chest_contents,
         'spoiler_log': spoiler_log
     }
\ No newline at end of file
@@ -4,9 +4,13 @@ This module handles the integration of chest and shop randomization
 with shared logic to maintain game progression
 """
 
+import json
+import logging
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from terranigma_randomizer.constants.items import (
-    ITEM_DATABASE, PROGRESSION_KEY_ITEMS, ITEM_NAME_TO_ID, 
+    ITEM_BY_ID, PROGRESSION_KEY_ITEMS, ITEM_NAME_TO_ID, get_item_ids_by_type,
     ItemTypes, get_item_name, get_item_info, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID
 )
 from terranigma_randomizer.constants.chests import CHEST_MAP, KNOWN_CHESTS
@@ -14,21 +18,27 @@ from terranigma_randomizer.constants.shops import (
     KNOWN_SHOPS, SHOP_ID_TO_INDEX, decimal_to_bcd, bcd_to_decimal
 )
 from terranigma_randomizer.constants.progression import (
-    get_accessible_areas, get_accessible_chests, get_progression_tier,
-    GAME_AREAS, PROGRESSION_AREAS
+    get_accessible_areas, get_accessible_chests, get_accessible_locations, get_progression_tier,
+    GAME_AREAS, PROGRESSION_AREAS, UNSAFE_SHOPS_FOR_KEY_ITEMS
 )
 from terranigma_randomizer.utils.logic import (
-    create_seeded_rng, shuffle_array, validate_game_progress, get_chest_location_name
+    create_seeded_rng, derive_attempt_seed, shuffle_array, validate_game_progress, get_chest_location_name,
+    get_max_shop_items, create_chest_pool, compute_playthrough, record_failure, get_missing_essential_items,
+    ALL_CHESTS_REGION, PROGRESSION_POINT_CONFLICTS
 )
+from terranigma_randomizer.utils.fill import assumed_fill, backtracking_fill, check_placement_feasibility
 from terranigma_randomizer.randomizers.chest import (
-    read_chests_from_rom, write_chests_to_rom
+    read_chests_from_rom, write_chests_to_rom, get_vanilla_chests
 )
 from terranigma_randomizer.randomizers.shop import (
-    read_shops_from_rom, write_shops_to_rom, 
+    read_shops_from_rom, write_shops_to_rom, get_vanilla_shops,
+    get_shop_model, verify_shop_writes,
     calculate_item_price, determine_item_limit,
     validate_shop_prices, validate_shop_item_counts
 )
 
+logger = logging.getLogger(__name__)
+
 def preserve_key_items_across_evolution(shop_contents):
     """
     Ensure that key items placed in any shop of an evolution group
@@ -41,7 +51,7 @@ def preserve_key_items_across_evolution(shop_contents):
     Returns:
         dict: Adjusted shop contents with key items preserved
     """
-    print("Preserving key items across shop evolution stages...")
+    logger.debug("Preserving key items across shop evolution stages...")
     
     # Evolution groups that need key item preservation
     evolution_groups = {
@@ -73,9 +83,9 @@ def preserve_key_items_across_evolution(shop_contents):
                             group_key_items.append(item.copy())
         
         if group_key_items and shops_with_content:
-            print(f"Evolution group {group_name} has {len(group_key_items)} key items to preserve across {len(shops_with_content)} shops")
+            logger.debug("Evolution group %s has %s key items to preserve across %s shops", group_name, len(group_key_items), len(shops_with_content))
             for item in group_key_items:
-                print(f"  - {item['name']}")
+                logger.debug("  - %s", item['name'])
             
             # Ensure each shop in the group has all the key items
             for shop_id in shops_with_content:
@@ -106,7 +116,7 @@ def preserve_key_items_across_evolution(shop_contents):
                         items_to_add = min(len(non_key_items), remaining_slots)
                         shop_contents[shop_id].extend(non_key_items[:items_to_add])
                 
-                print(f"  Shop {shop_id} now has {len(shop_contents[shop_id])} items ({len(group_key_items)} key items)")
+                logger.debug("  Shop %s now has %s items (%s key items)", shop_id, len(shop_contents[shop_id]), len(group_key_items))
     
     return shop_contents
 
@@ -124,7 +134,7 @@ def handle_shared_offset_shops(shop_contents):
     Returns:
         dict: Adjusted shop contents
     """
-    print("Handling shared offset shops (non-evolution)...")
+    logger.debug("Handling shared offset shops (non-evolution)...")
     
     # Define which shops share offsets but are NOT evolution groups
     SHARED_OFFSET_CONFLICTS = {
@@ -154,9 +164,9 @@ def handle_shared_offset_shops(shop_contents):
                              if item.get('name') in PROGRESSION_KEY_ITEMS]
             
             if shop_key_items:
-                print(f"Shop {shop_id} ({group}) has {len(shop_key_items)} key items at shared offset {hex(offset)}")
+                logger.debug("Shop %s (%s) has %s key items at shared offset %s", shop_id, group, len(shop_key_items), hex(offset))
                 for item in shop_key_items:
-                    print(f"  - {item['name']}")
+                    logger.debug("  - %s", item['name'])
                     key_items_to_preserve.extend(shop_key_items)
                 
                 # Remove key items from the non-primary shop
@@ -165,7 +175,7 @@ def handle_shared_offset_shops(shop_contents):
         
         # Add preserved key items to the primary shop
         if key_items_to_preserve and primary_shop in shop_contents:
-            print(f"Moving {len(key_items_to_preserve)} key items to primary shop {primary_shop}")
+            logger.debug("Moving %s key items to primary shop %s", len(key_items_to_preserve), primary_shop)
             # Add key items at the beginning of the shop
             shop_contents[primary_shop] = key_items_to_preserve + shop_contents[primary_shop]
             
@@ -175,11 +185,40 @@ def handle_shared_offset_shops(shop_contents):
                 original_shop = KNOWN_SHOPS[shop_index]
                 max_items = len(original_shop['items'])
                 if len(shop_contents[primary_shop]) > max_items:
-                    print(f"Trimming shop {primary_shop} from {len(shop_contents[primary_shop])} to {max_items} items")
+                    logger.debug("Trimming shop %s from %s to %s items", primary_shop, len(shop_contents[primary_shop]), max_items)
                     shop_contents[primary_shop] = shop_contents[primary_shop][:max_items]
     
     return shop_contents
 
+def resolve_shop_conflicts(shop_contents):
+    """
+    Apply the shop evolution and shared offset rules to planned shop contents
+    
+    Key items are copied to every stage of their evolution group first, then
+    moved out of shops whose table another shop overwrites, and prices are
+    clamped to what each shop's currency allows. Placements are resolved
+    before validation, so the sweep checks the contents that are actually
+    written.
+    
+    Args:
+        shop_contents (dict): Map of shop IDs to items
+        
+    Returns:
+        dict: Adjusted shop contents
+    """
+    shop_contents = preserve_key_items_across_evolution(shop_contents)
+    shop_contents = handle_shared_offset_shops(shop_contents)
+    
+    validate_shop_prices([
+        {
+            'id': shop_id,
+            'location': KNOWN_SHOPS[SHOP_ID_TO_INDEX[shop_id]]['location'] if shop_id in SHOP_ID_TO_INDEX else '',
+            'items': items
+        }
+        for shop_id, items in shop_contents.items()
+    ])
+    return shop_contents
+
 def get_evolution_group(shop_id):
     """Get the evolution group for a shop ID"""
     # Inline shop evolution groups data
@@ -284,52 +323,7 @@ def get_shops_at_same_location(shop_id):
                 return [shop['id'] for shop in shops]
     return [shop_id]
 
-# Helper function to get the max shop items
-def get_max_shop_items(shop_id, options):
-    """
-    Get the maximum number of items a shop can hold
-    
-    Args:
-        shop_id: Shop ID (can be string or int)
-        options (dict): Randomization options
-        
-    Returns:
-        int: Maximum number of items for the shop
-    """
-    # Convert shop_id to int if it's a string
-    if isinstance(shop_id, str) and shop_id.isdigit():
-        shop_id = int(shop_id)
-    elif isinstance(shop_id, str):
-        # If it's a non-numeric string, try to extract number
-        try:
-            shop_id = int(''.join(filter(str.isdigit, shop_id)))
-        except:
-            return 5  # Default
-        
-    shop_index = SHOP_ID_TO_INDEX.get(shop_id)
-    if shop_index is not None:
-        original_shop = KNOWN_SHOPS[shop_index]
-        original_count = len(original_shop['items'])
-        
-        # If user wants more items, allow more than original
-        items_per_shop = options.get('items_per_shop', 'normal')
-        if items_per_shop == 'more':
-            return min(15, original_count + 4)  # Add up to 4 more items, max 15
-        elif items_per_shop == 'fewer':
-            return max(2, original_count - 2)  # Remove up to 2 items, min 2
-        else:
-            return original_count
-    
-    # Default based on option
-    items_per_shop = options.get('items_per_shop', 'normal')
-    if items_per_shop == 'more':
-        return 8
-    elif items_per_shop == 'fewer':
-        return 3
-    else:
-        return 5
-
-def create_enhanced_logical_placement(verbose=False, options=None):
+def create_enhanced_logical_placement(verbose=False, options=None, rng=None, failure=None):
     """
     Enhanced logical placement function that incorporates shops into progression logic
     IMPORTANT: Protects Portrait chest (chest 150) from randomization
@@ -337,20 +331,24 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     Args:
         verbose (bool): Whether to print detailed logs
         options (dict): Randomization options
+        rng (SeededRNG): Random number generator
+        failure (dict): Filled with the stage, item and candidate count if the attempt fails
         
     Returns:
-        dict: Map of chest IDs to item IDs and shop placements or None if failed
+        dict: Map of chest IDs to item IDs and shop placements, with the validation sweep, or None if failed
     """
     if options is None:
         options = {}
+    if rng is None:
+        rng = create_seeded_rng()
     
     # Set a higher recursion limit to handle complex logic
     import sys
     sys.setrecursionlimit(10000)
     
     if verbose:
-        print("Creating logical placement with shop integration...")
-        print(f"NOTE: Portrait chest ({PORTRAIT_CHEST_ID}) will remain in vanilla location")
+        logger.debug("Creating logical placement with shop integration...")
+        logger.debug("NOTE: Portrait chest (%s) will remain in vanilla location", PORTRAIT_CHEST_ID)
     
     # Prepare our chest and shop placement maps
     chest_contents = {}
@@ -362,7 +360,10 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     used_chests.add(PORTRAIT_CHEST_ID)
     
     if verbose:
-        print(f"Protected Portrait chest {PORTRAIT_CHEST_ID} with item {PORTRAIT_ITEM_ID}")
+        logger.debug("Protected Portrait chest %s with item %s", PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID)
+    
+    # Free chests by area; placing an item takes its chest out of every area at once
+    chest_pool = create_chest_pool(used_chests)
     
     # Track placed items to ensure only one copy of each in the world
     placed_items = set()
@@ -377,44 +378,36 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     # Track how many items we've allocated to each shop
     shop_item_counts = {}
     
-    # Define shops that should NOT get key items due to offset conflicts
-    UNSAFE_SHOPS_FOR_KEY_ITEMS = [18, 37]  # Both share offset 0x19D2A2
-    
     # Decide where each key item will be placed - chest or shop
     key_item_placements = {}
     for key_item in PROGRESSION_KEY_ITEMS:
         # 30% chance for key item to be in a shop instead of a chest
-        key_item_placements[key_item] = 'shop' if random.random() < 0.3 else 'chest'
+        key_item_placements[key_item] = 'shop' if rng.random() < 0.3 else 'chest'
     
     # Always place Giant Leaves in a chest for guaranteed early access
     key_item_placements['Giant Leaves'] = 'chest'
     
     if verbose:
-        print("Key item placement decisions:")
+        logger.debug("Key item placement decisions:")
         for item, placement in key_item_placements.items():
-            print(f"- {item}: {placement}")
+            logger.debug("- %s: %s", item, placement)
     
     # Place Giant Leaves in Tree Cave
     giant_leaves_id = ITEM_NAME_TO_ID.get('Giant Leaves')
-    early_accessible_chests = [
-        chest_id for chest_id in PROGRESSION_AREAS['TREE_CAVE_ENTRANCE']['contains']
-        if chest_id not in used_chests  # Exclude Portrait chest
-    ]
+    chosen_chest_id = chest_pool.take(['TREE_CAVE_ENTRANCE'], rng) if giant_leaves_id else None
     
-    if giant_leaves_id and early_accessible_chests:
-        shuffle_array(early_accessible_chests)
-        chosen_chest_id = early_accessible_chests[0]
-        
+    if chosen_chest_id is not None:
         chest_contents[chosen_chest_id] = giant_leaves_id
         used_chests.add(chosen_chest_id)
         key_items_placed.add('Giant Leaves')
         placed_items.add(giant_leaves_id)
         
         if verbose:
-            print(f"Placed Giant Leaves in chest {chosen_chest_id}")
+            logger.debug("Placed Giant Leaves in chest %s", chosen_chest_id)
     else:
         if verbose:
-            print("Failed to place Giant Leaves - no suitable chests")
+            logger.debug("Failed to place Giant Leaves - no suitable chests")
+        record_failure(failure, 'giant_leaves', 'Giant Leaves', chest_pool.count(['TREE_CAVE_ENTRANCE']))
         return None
     
     # Create collections of early, mid, and late game shops
@@ -435,19 +428,22 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         item_id = ITEM_NAME_TO_ID.get(item_name)
         if not item_id:
             if verbose:
-                print(f"Missing ID for item: {item_name}")
+                logger.debug("Missing ID for item: %s", item_name)
+            record_failure(failure, 'missing_id', item_name)
             return False
         
         # Don't place if the item is already placed somewhere
         if item_id in placed_items:
             if verbose:
-                print(f"Item {item_name} is already placed elsewhere")
+                logger.debug("Item %s is already placed elsewhere", item_name)
+            record_failure(failure, 'already_placed', item_name)
             return False
         
         # Choose an available shop with space
         if not shop_tiers:
             if verbose:
-                print(f"No shops available for {item_name}")
+                logger.debug("No shops available for %s", item_name)
+            record_failure(failure, 'shop', item_name, 0)
             return False
         
         # Sort shops by available space, but exclude unsafe shops for key items
@@ -458,7 +454,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             # CRITICAL: Skip unsafe shops for key items
             if shop_id in UNSAFE_SHOPS_FOR_KEY_ITEMS and item_name in PROGRESSION_KEY_ITEMS:
                 if verbose:
-                    print(f"Skipping shop {shop_id} for key item {item_name} due to offset conflict")
+                    logger.debug("Skipping shop %s for key item %s due to offset conflict", shop_id, item_name)
                 continue
             
             current_count = shop_item_counts.get(shop_id, 0)
@@ -472,10 +468,11 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             
         if not available_shops:
             if verbose:
-                print(f"No shops with available space for {item_name}")
+                logger.debug("No shops with available space for %s", item_name)
+            record_failure(failure, 'shop', item_name, 0)
             return False
             
-        shuffle_array(available_shops)
+        shuffle_array(available_shops, rng)
         chosen_shop = available_shops[0]
         shop_id = chosen_shop['id']
         
@@ -484,11 +481,10 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             shop_item_counts[shop_id] = 0
         
         # Add variation to price
-        price = base_price + random.randint(0, base_price // 2)
+        price = base_price + rng.randint(0, base_price // 2)
         
         # Get item type from database
-        item_hex = f"{item_id:04X}"
-        item_type = ITEM_DATABASE.get(item_hex, {}).get('type', ItemTypes.KEY_ITEM)
+        item_type = ITEM_BY_ID.get(item_id, {}).get('type', ItemTypes.KEY_ITEM)
         
         shop_contents[shop_id].append({
             'itemId': item_id,
@@ -507,34 +503,33 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         placed_items.add(item_id)
         
         if verbose:
-            print(f"Placed {item_name} in shop {shop_id} ({chosen_shop['location']}) for {price} gems")
+            logger.debug("Placed %s in shop %s (%s) for %s gems", item_name, shop_id, chosen_shop['location'], price)
         return True
     
-    # Helper function to place an item in a chest
-    def place_item_in_chest(item_name, accessible_chests):
+    # Helper function to place an item in a free chest of the given areas
+    def place_item_in_chest(item_name, areas):
         item_id = ITEM_NAME_TO_ID.get(item_name)
         if not item_id:
             if verbose:
-                print(f"Missing ID for item: {item_name}")
+                logger.debug("Missing ID for item: %s", item_name)
+            record_failure(failure, 'missing_id', item_name)
             return False
         
         # Don't place if the item is already placed somewhere
         if item_id in placed_items:
             if verbose:
-                print(f"Item {item_name} is already placed elsewhere")
+                logger.debug("Item %s is already placed elsewhere", item_name)
+            record_failure(failure, 'already_placed', item_name)
             return False
         
-        # Filter out already used chests (including Portrait chest)
-        available_chests = [chest_id for chest_id in accessible_chests if chest_id not in used_chests]
+        chosen_chest_id = chest_pool.take(areas, rng)
         
-        if not available_chests:
+        if chosen_chest_id is None:
             if verbose:
-                print(f"No chests available for {item_name}")
+                logger.debug("No chests available for %s", item_name)
+            record_failure(failure, 'chest', item_name, 0)
             return False
         
-        shuffle_array(available_chests)
-        chosen_chest_id = available_chests[0]
-        
         chest_contents[chosen_chest_id] = item_id
         used_chests.add(chosen_chest_id)
         key_items_placed.add(item_name)
@@ -542,7 +537,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         placed_items.add(item_id)
         
         if verbose:
-            print(f"Placed {item_name} in chest {chosen_chest_id}")
+            logger.debug("Placed %s in chest %s", item_name, chosen_chest_id)
         return True
     
     # Place key progression items in a specific order to maintain game logic
@@ -551,83 +546,54 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     if key_item_placements['Ra Dewdrop'] == 'shop' and early_shops:
         if not place_item_in_shop('Ra Dewdrop', early_shops, 120):
             # Fallback to chest placement
-            early_chests_for_ra_dewdrop = [
-                chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['TREE_CAVE_ENTRANCE']['contains'] 
-                if chest_id not in used_chests
-            ]
-            
-            if not place_item_in_chest('Ra Dewdrop', early_chests_for_ra_dewdrop):
+            if not place_item_in_chest('Ra Dewdrop', ['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE']):
                 if verbose:
-                    print("Failed to place Ra Dewdrop")
+                    logger.debug("Failed to place Ra Dewdrop")
                 return None
     else:
         # Place in chest
-        early_chests_for_ra_dewdrop = [
-            chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-            if chest_id not in used_chests
-        ] + [
-            chest_id for chest_id in PROGRESSION_AREAS['TREE_CAVE_ENTRANCE']['contains'] 
-            if chest_id not in used_chests
-        ]
-        
-        if not place_item_in_chest('Ra Dewdrop', early_chests_for_ra_dewdrop):
+        if not place_item_in_chest('Ra Dewdrop', ['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE']):
             if verbose:
-                print("Failed to place Ra Dewdrop")
+                logger.debug("Failed to place Ra Dewdrop")
             return None
     
     # 2. Place RocSpear - needed for Grecliff advanced areas
-    remaining_early_chests = [
-        chest_id for chest_id in early_accessible_chests 
-        if chest_id not in used_chests
-    ]
-    
     if key_item_placements['RocSpear'] == 'shop' and early_shops:
         if not place_item_in_shop('RocSpear', early_shops, 180):
             # Fallback to chest placement
-            if not place_item_in_chest('RocSpear', remaining_early_chests):
+            if not place_item_in_chest('RocSpear', ['TREE_CAVE_ENTRANCE']):
                 if verbose:
-                    print("Failed to place RocSpear")
+                    logger.debug("Failed to place RocSpear")
                 return None
     else:
         # Place in chest
-        if not place_item_in_chest('RocSpear', remaining_early_chests):
+        if not place_item_in_chest('RocSpear', ['TREE_CAVE_ENTRANCE']):
             if verbose:
-                print("Failed to place RocSpear")
+                logger.debug("Failed to place RocSpear")
             return None
     
     # 3. Place Crystal Thread for ElleCape - needed for Tower 5
     if key_item_placements['Crystal Thread'] == 'shop' and early_shops:
         if not place_item_in_shop('Crystal Thread', early_shops, 250):
             # Fallback to chest placement
-            tower_chests = [chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-                          if chest_id not in used_chests]
-            
-            if not place_item_in_chest('Crystal Thread', tower_chests):
+            if not place_item_in_chest('Crystal Thread', ['UNDERWORLD_START']):
                 if verbose:
-                    print("Failed to place Crystal Thread")
+                    logger.debug("Failed to place Crystal Thread")
                 return None
     else:
         # Place in chest
-        tower_chests = [chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-                      if chest_id not in used_chests]
-        
-        if not place_item_in_chest('Crystal Thread', tower_chests):
+        if not place_item_in_chest('Crystal Thread', ['UNDERWORLD_START']):
             if verbose:
-                print("Failed to place Crystal Thread")
+                logger.debug("Failed to place Crystal Thread")
             return None
     
     # 4. Place Sharp Claws - needed for climbing in Grecliff and beyond
     # Get all areas accessible with current items
     accessible_areas = get_accessible_areas(collected_items)
-    accessible_chests = [chest_id for chest_id in get_accessible_chests(collected_items) 
-                        if chest_id not in used_chests]
     
     if verbose:
-        print(f"Accessible areas with current items: {', '.join(accessible_areas)}")
-        print(f"Accessible chests count: {len(accessible_chests)}")
+        logger.debug("Accessible areas with current items: %s", ', '.join(accessible_areas))
+        logger.debug("Accessible chests count: %s", chest_pool.count(accessible_areas))
     
     if key_item_placements['Sharp Claws'] == 'shop':
         # Decide if we should place in early shop
@@ -635,136 +601,68 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         
         if not place_item_in_shop('Sharp Claws', available_shops, 300):
             # Fallback to chest
-            if not place_item_in_chest('Sharp Claws', accessible_chests):
+            if not place_item_in_chest('Sharp Claws', accessible_areas):
                 if verbose:
-                    print("Failed to place Sharp Claws")
+                    logger.debug("Failed to place Sharp Claws")
                 return None
     else:
         # Place in chest
-        if not place_item_in_chest('Sharp Claws', accessible_chests):
+        if not place_item_in_chest('Sharp Claws', accessible_areas):
             if verbose:
-                print("Failed to place Sharp Claws")
+                logger.debug("Failed to place Sharp Claws")
             return None
     
     # 5. Place Red Scarf - Needed for Louran
     if key_item_placements['Red Scarf'] == 'shop' and early_shops:
         if not place_item_in_shop('Red Scarf', early_shops, 120):
             # Fallback to chest placement
-            mid_chests_for_red_scarf = [
-                chest_id for chest_id in PROGRESSION_AREAS['GRECLIFF_BOSS']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['EKLEMATA_REGION']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['LOURAN_REGION']['contains'] 
-                if chest_id not in used_chests
-            ]
-            
-            if not place_item_in_chest('Red Scarf', mid_chests_for_red_scarf):
+            if not place_item_in_chest('Red Scarf', ['GRECLIFF_BOSS', 'EKLEMATA_REGION', 'LOURAN_REGION']):
                 if verbose:
-                    print("Failed to place Red Scarf")
+                    logger.debug("Failed to place Red Scarf")
                 return None
     else:
         # Place in chest
-        mid_chests_for_red_scarf = [
-            chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-            if chest_id not in used_chests
-        ] + [
-            chest_id for chest_id in PROGRESSION_AREAS['TREE_CAVE_ENTRANCE']['contains'] 
-            if chest_id not in used_chests
-        ]
-        
-        if not place_item_in_chest('Red Scarf', mid_chests_for_red_scarf):
+        if not place_item_in_chest('Red Scarf', ['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE']):
             if verbose:
-                print("Failed to place Red Scarf")
+                logger.debug("Failed to place Red Scarf")
             return None
     
     # 6. Place Engagement Ring - needed for Great Lakes Caves
     if key_item_placements['Engagement Ring'] == 'shop' and mid_shops:
         if not place_item_in_shop('Engagement Ring', mid_shops, 120):
             # Fallback to chest placement
-            mid_chests_for_engagement_ring = [
-                chest_id for chest_id in PROGRESSION_AREAS['GRECLIFF_BOSS']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['EKLEMATA_REGION']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['LOIRE_CASTLE']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['LOURAN_REGION']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['NORFEST_REGION']['contains'] 
-                if chest_id not in used_chests
-            ]
-            
-            if not place_item_in_chest('Engagement Ring', mid_chests_for_engagement_ring):
+            if not place_item_in_chest('Engagement Ring', ['GRECLIFF_BOSS', 'EKLEMATA_REGION', 'LOIRE_CASTLE', 'LOURAN_REGION', 'NORFEST_REGION']):
                 if verbose:
-                    print("Failed to place Engagement Ring")
+                    logger.debug("Failed to place Engagement Ring")
                 return None
     else:
         # Place in chest
-        mid_chests_for_engagement_ring = [
-            chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-            if chest_id not in used_chests
-        ] + [
-            chest_id for chest_id in PROGRESSION_AREAS['TREE_CAVE_ENTRANCE']['contains'] 
-            if chest_id not in used_chests
-        ]
-        
-        if not place_item_in_chest('Engagement Ring', mid_chests_for_engagement_ring):
+        if not place_item_in_chest('Engagement Ring', ['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE']):
             if verbose:
-                print("Failed to place Engagement Ring")
+                logger.debug("Failed to place Engagement Ring")
             return None
     
     # 7. Place Air Herb - needed for Great Lakes Caves
     if key_item_placements['Air Herb'] == 'shop' and mid_shops:
         if not place_item_in_shop('Air Herb', mid_shops, 120):
             # Fallback to chest placement
-            mid_chests_for_air_herb = [
-                chest_id for chest_id in PROGRESSION_AREAS['GRECLIFF_BOSS']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['EKLEMATA_REGION']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['LOIRE_CASTLE']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['LOURAN_REGION']['contains'] 
-                if chest_id not in used_chests
-            ] + [
-                chest_id for chest_id in PROGRESSION_AREAS['NORFEST_REGION']['contains'] 
-                if chest_id not in used_chests
-            ]
-            
-            if not place_item_in_chest('Air Herb', mid_chests_for_air_herb):
+            if not place_item_in_chest('Air Herb', ['GRECLIFF_BOSS', 'EKLEMATA_REGION', 'LOIRE_CASTLE', 'LOURAN_REGION', 'NORFEST_REGION']):
                 if verbose:
-                    print("Failed to place Air Herb")
+                    logger.debug("Failed to place Air Herb")
                 return None
     else:
         # Place in chest
-        mid_chests_for_air_herb = [
-            chest_id for chest_id in PROGRESSION_AREAS['UNDERWORLD_START']['contains'] 
-            if chest_id not in used_chests
-        ] + [
-            chest_id for chest_id in PROGRESSION_AREAS['TREE_CAVE_ENTRANCE']['contains'] 
-            if chest_id not in used_chests
-        ]
-        
-        if not place_item_in_chest('Air Herb', mid_chests_for_air_herb):
+        if not place_item_in_chest('Air Herb', ['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE']):
             if verbose:
-                print("Failed to place Air Herb")
+                logger.debug("Failed to place Air Herb")
             return None
 
     # Handle Starstones - We need 5 of them to access Astarica
     starstone_id = ITEM_NAME_TO_ID.get('Starstone')
     if not starstone_id:
         if verbose:
-            print("Missing ID for Starstone")
+            logger.debug("Missing ID for Starstone")
+        record_failure(failure, 'missing_id', 'Starstone')
         return None
 
     # Track how many Starstones we've placed
@@ -780,18 +678,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         pre_astarica_areas.append(area_name)
 
     if verbose:
-        print(f"Areas available for Starstone placement: {', '.join(pre_astarica_areas)}")
-
-    # Get chests from all areas accessible before Astarica
-    available_chests = []
-    for area in pre_astarica_areas:
-        if area in PROGRESSION_AREAS and 'contains' in PROGRESSION_AREAS[area]:
-            for chest_id in PROGRESSION_AREAS[area]['contains']:
-                if chest_id not in used_chests and chest_id in CHEST_MAP:  # Only use chests that exist
-                    available_chests.append(chest_id)
-
-    # Shuffle the chest list
-    shuffle_array(available_chests)
+        logger.debug("Areas available for Starstone placement: %s", ', '.join(pre_astarica_areas))
 
     # Get all shops available before Astarica
     # Shops in pre-Astarica areas - but exclude unsafe shops
@@ -800,7 +687,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         # Skip unsafe shops for key items
         if shop['id'] in UNSAFE_SHOPS_FOR_KEY_ITEMS:
             if verbose:
-                print(f"Skipping shop {shop['id']} for Starstone placement due to offset conflict")
+                logger.debug("Skipping shop %s for Starstone placement due to offset conflict", shop['id'])
             continue
             
         # Skip shops in areas requiring Starstones
@@ -814,13 +701,13 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             available_shops.append(shop)
 
     # Divide Starstones between chests and shops (3 in chests, 2 in shops is a good balance)
-    chest_starstone_count = min(3, len(available_chests))
+    chest_starstone_count = min(3, chest_pool.count(pre_astarica_areas))
     shop_starstone_count = 5 - chest_starstone_count
 
-    # Place Starstones in chests
+    # Place Starstones in chests from all areas accessible before Astarica
     for i in range(chest_starstone_count):
-        if i < len(available_chests):
-            chest_id = available_chests[i]
+        chest_id = chest_pool.take(pre_astarica_areas, rng)
+        if chest_id is not None:
             chest_contents[chest_id] = starstone_id
             used_chests.add(chest_id)
             starstone_count += 1
@@ -839,7 +726,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             })
             
             if verbose:
-                print(f"Placed Starstone #{starstone_count} in chest {chest_id} ({chest_location})")
+                logger.debug("Placed Starstone #%s in chest %s (%s)", starstone_count, chest_id, chest_location)
 
     # Filter shops with available space for Starstones
     shops_with_space = []
@@ -853,7 +740,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         if current_count < max_items:
             shops_with_space.append(shop)
 
-    shuffle_array(shops_with_space)
+    shuffle_array(shops_with_space, rng)
 
     # Place remaining Starstones in shops
     for i in range(min(shop_starstone_count, len(shops_with_space))):
@@ -865,7 +752,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             shop_item_counts[shop_id] = 0
         
         # Add Starstone to shop with a higher price (since it's a key item)
-        price = 400 + random.randint(0, 200)
+        price = 400 + rng.randint(0, 200)
         shop_contents[shop_id].append({
             'itemId': starstone_id,
             'name': 'Starstone',
@@ -889,16 +776,16 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         starstone_count += 1
         
         if verbose:
-            print(f"Placed Starstone #{starstone_count} in shop {shop['location']} for {price} gems")
+            logger.debug("Placed Starstone #%s in shop %s for %s gems", starstone_count, shop['location'], price)
 
     # If we still can't place all the Starstones, fallback to any chest except Portrait
     while starstone_count < 5:
-        remaining_chests = [chest_id for chest_id in CHEST_MAP.keys() 
-                          if chest_id not in used_chests and chest_id != PORTRAIT_CHEST_ID]
-        if not remaining_chests:
+        chest_id = chest_pool.take([ALL_CHESTS_REGION], rng)
+        out_of_chests = chest_id is None
+        if out_of_chests:
             # If we run out of chests, force placement by replacing a non-key item (but not Portrait)
             all_chests = [chest_id for chest_id in CHEST_MAP.keys() if chest_id != PORTRAIT_CHEST_ID]
-            shuffle_array(all_chests)
+            shuffle_array(all_chests, rng)
             for chest_id in all_chests:
                 if chest_id not in used_chests or chest_contents.get(chest_id) not in [ITEM_NAME_TO_ID.get(key) for key in PROGRESSION_KEY_ITEMS]:
                     chest_contents[chest_id] = starstone_id
@@ -919,14 +806,12 @@ def create_enhanced_logical_placement(verbose=False, options=None):
                     
                     starstone_count += 1
                     if verbose:
-                        print(f"Placed Starstone #{starstone_count} in chest {chest_id} ({chest_location}) (forced placement)")
+                        logger.debug("Placed Starstone #%s in chest %s (%s) (forced placement)", starstone_count, chest_id, chest_location)
                     break
             
             if starstone_count >= 5:
                 break
         else:
-            shuffle_array(remaining_chests)
-            chest_id = remaining_chests[0]
             chest_contents[chest_id] = starstone_id
             used_chests.add(chest_id)
             
@@ -945,22 +830,23 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             
             starstone_count += 1
             if verbose:
-                print(f"Placed Starstone #{starstone_count} in chest {chest_id} ({chest_location}) (fallback)")
+                logger.debug("Placed Starstone #%s in chest %s (%s) (fallback)", starstone_count, chest_id, chest_location)
                 
         # Emergency break if we somehow can't place more
-        if starstone_count < 5 and len(remaining_chests) == 0:
+        if starstone_count < 5 and out_of_chests:
             if verbose:
-                print(f"WARNING: Could only place {starstone_count}/5 Starstones even with fallbacks")
+                logger.warning("WARNING: Could only place %s/5 Starstones even with fallbacks", starstone_count)
+            record_failure(failure, 'starstones', 'Starstone', 0)
             return None
     
     # If we get here, we should have successfully placed all 5 Starstones
     if verbose:
-        print(f"Successfully placed all 5 Starstones")
+        logger.debug("Successfully placed all 5 Starstones")
         for i, location in enumerate(starstone_locations):
             if location['type'] == 'chest':
-                print(f"  Starstone #{i+1}: Chest in {location['location']}")
+                logger.debug("  Starstone #%s: Chest in %s", i+1, location['location'])
             else:
-                print(f"  Starstone #{i+1}: Shop in {location['location']} ({location['price']} gems)")
+                logger.debug("  Starstone #%s: Shop in %s (%s gems)", i+1, location['location'], location['price'])
     
     # Add a virtual "Starstones5" to collected_items to represent having all 5
     collected_items.add('Starstones5')
@@ -971,12 +857,10 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     for key_item in remaining_key_items:
         # Get accessible areas with current items
         current_accessible_areas = get_accessible_areas(collected_items)
-        current_accessible_chests = [chest_id for chest_id in get_accessible_chests(collected_items) 
-                                   if chest_id not in used_chests]
         
         if verbose:
-            print(f"For {key_item} placement - Accessible areas: {', '.join(current_accessible_areas)}")
-            print(f"For {key_item} placement - Accessible chests: {len(current_accessible_chests)}")
+            logger.debug("For %s placement - Accessible areas: %s", key_item, ', '.join(current_accessible_areas))
+            logger.debug("For %s placement - Accessible chests: %s", key_item, chest_pool.count(current_accessible_areas))
         
         # Determine base price based on key item importance
         base_price = 200
@@ -1013,14 +897,14 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             
             if not place_item_in_shop(key_item, shops_with_space, base_price):
                 # Fallback to chest placement
-                if not place_item_in_chest(key_item, current_accessible_chests):
+                if not place_item_in_chest(key_item, current_accessible_areas):
                     if verbose:
-                        print(f"Failed to place {key_item}")
+                        logger.debug("Failed to place %s", key_item)
                     continue  # Skip this item - not all are essential
             
         else:
             # Place in chest
-            if not place_item_in_chest(key_item, current_accessible_chests):
+            if not place_item_in_chest(key_item, current_accessible_areas):
                 # If no accessible chests, try shop placement as fallback
                 available_shops = []
                 
@@ -1042,7 +926,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
                 
                 if not place_item_in_shop(key_item, available_shops, base_price):
                     if verbose:
-                        print(f"Failed to place {key_item}")
+                        logger.debug("Failed to place %s", key_item)
                     continue  # Skip this item - not all are essential
     
     # Verify the key items placements are complete
@@ -1053,22 +937,65 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     for key_item in essential_items:
         if key_item not in collected_items:
             if verbose:
-                print(f"Missing essential key item: {key_item}")
+                logger.debug("Missing essential key item: %s", key_item)
+            record_failure(failure, 'essential_items', key_item)
             return None
     
+    fill_remaining_locations(chest_contents, shop_contents, shop_item_counts, used_chests, placed_items, options, rng)
+    shop_contents = resolve_shop_conflicts(shop_contents)
+    
+    # Verify the placement works correctly
+    sweep = validate_game_progress(chest_contents, shop_contents, verbose)
+    if sweep:
+        if verbose:
+            logger.debug("Placement validated - game is beatable!")
+            logger.debug("Portrait chest %s protected with item %s", PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID)
+        return {
+            'chest_contents': chest_contents,
+            'shop_contents': shop_contents,
+            'key_item_placements': key_item_placements,
+            'starstone_locations': starstone_locations,
+            'sweep': sweep
+        }
+    else:
+        if verbose:
+            logger.debug("Placement validation failed - game is not beatable!")
+        record_failure(failure, 'validation', get_missing_essential_items(chest_contents, shop_contents)[0])
+        return None
+
+def fill_remaining_locations(chest_contents, shop_contents, shop_item_counts, used_chests, placed_items, options, rng):
+    """
+    Fill every location left over after the key items have been placed
+    
+    Unique weapons and armor are split between chests and shops, then the
+    remaining chests get common items and the remaining shop slots get
+    consumables. All arguments except options and rng are updated in place.
+    
+    Args:
+        chest_contents (dict): Map of chest IDs to item IDs
+        shop_contents (dict): Map of shop IDs to item arrays
+        shop_item_counts (dict): Map of shop IDs to the number of items allocated
+        used_chests (set): Chest IDs that already hold an item
+        placed_items (set): Item IDs that already have a location
+        options (dict): Randomization options
+        rng (SeededRNG): Random number generator
+    """
+    # Early, mid and late game shops, in that order
+    all_shops = sorted(KNOWN_SHOPS, key=lambda shop: (get_progression_tier(shop['location']) + 1) // 2)
+    
     # Get all unique weapons and armor
     unique_weapons = []
     unique_armor = []
     
-    for id_hex, item in ITEM_DATABASE.items():
-        if item['type'] == ItemTypes.WEAPON and int(id_hex, 16) not in placed_items:
-            unique_weapons.append(int(id_hex, 16))
-        elif item['type'] == ItemTypes.ARMOR and int(id_hex, 16) not in placed_items:
-            unique_armor.append(int(id_hex, 16))
+    for item_id, item in ITEM_BY_ID.items():
+        if item['type'] == ItemTypes.WEAPON and item_id not in placed_items:
+            unique_weapons.append(item_id)
+        elif item['type'] == ItemTypes.ARMOR and item_id not in placed_items:
+            unique_armor.append(item_id)
     
     # Shuffle these pools
-    shuffle_array(unique_weapons)
-    shuffle_array(unique_armor)
+    shuffle_array(unique_weapons, rng)
+    shuffle_array(unique_armor, rng)
     
     # Place weapons (50% in chests, 50% in shops)
     weapons_in_chest = len(unique_weapons) // 2
@@ -1076,7 +1003,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     # Place weapons in chests (excluding Portrait chest)
     all_known_chest_ids = [chest_id for chest_id in CHEST_MAP.keys() if chest_id != PORTRAIT_CHEST_ID]
     remaining_chests = [chest_id for chest_id in all_known_chest_ids if chest_id not in used_chests]
-    shuffle_array(remaining_chests)
+    shuffle_array(remaining_chests, rng)
     
     for i in range(min(weapons_in_chest, len(unique_weapons), len(remaining_chests))):
         chest_id = remaining_chests[i]
@@ -1088,7 +1015,6 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     
     # Place remaining weapons in shops with space available
     weapons_for_shops = unique_weapons[weapons_in_chest:]
-    all_shops = early_shops + mid_shops + late_shops
     shops_with_space = []
     
     # Check space in each shop
@@ -1114,8 +1040,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         
         for i in range(weapons_to_add):
             item_id = weapons_for_shops[weapon_index]
-            item_hex = f"{item_id:04X}"
-            item = ITEM_DATABASE.get(item_hex, {})
+            item = ITEM_BY_ID.get(item_id, {})
             
             if not item:
                 weapon_index += 1
@@ -1127,7 +1052,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             
             # Calculate price based on game tier
             tier = get_progression_tier(shop['location'])
-            price = calculate_item_price(item, tier, lambda: random.random(), {
+            price = calculate_item_price(item, tier, rng, {
                 'randomize_prices': True,
                 'price_variation': 30
             })
@@ -1189,8 +1114,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
         
         for i in range(armor_to_add):
             item_id = armor_for_shops[armor_index]
-            item_hex = f"{item_id:04X}"
-            item = ITEM_DATABASE.get(item_hex, {})
+            item = ITEM_BY_ID.get(item_id, {})
             
             if not item:
                 armor_index += 1
@@ -1202,7 +1126,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             
             # Calculate price based on game tier
             tier = get_progression_tier(shop['location'])
-            price = calculate_item_price(item, tier, lambda: random.random(), {
+            price = calculate_item_price(item, tier, rng, {
                 'randomize_prices': True,
                 'price_variation': 30
             })
@@ -1226,27 +1150,18 @@ def create_enhanced_logical_placement(verbose=False, options=None):
     # These can have duplicates
     
     # Consumables are fine to duplicate
-    consumables = []
-    for id_hex, item in ITEM_DATABASE.items():
-        if item['type'] == ItemTypes.CONSUMABLE:
-            consumables.append(int(id_hex, 16))
+    consumables = list(get_item_ids_by_type(ItemTypes.CONSUMABLE))
     
     # Rings can have duplicates too
-    rings = []
-    for id_hex, item in ITEM_DATABASE.items():
-        if item['type'] == ItemTypes.RING:
-            rings.append(int(id_hex, 16))
+    rings = list(get_item_ids_by_type(ItemTypes.RING))
     
     # Gems can have duplicates
-    gems = []
-    for id_hex, item in ITEM_DATABASE.items():
-        if item['type'] == ItemTypes.GEMS:
-            gems.append(int(id_hex, 16))
+    gems = list(get_item_ids_by_type(ItemTypes.GEMS))
     
     # Now fill remaining chests with common items (excluding Portrait)
     final_remaining_chests = [chest_id for chest_id in all_known_chest_ids if chest_id not in used_chests]
     common_items = consumables + rings + gems
-    shuffle_array(common_items)
+    shuffle_array(common_items, rng)
     
     for i, chest_id in enumerate(final_remaining_chests):
         item_id = common_items[i % len(common_items)]  # Cycle through items if needed
@@ -1274,14 +1189,13 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             continue
             
         # Add consumables
-        shuffle_array(consumables)
+        shuffle_array(consumables, rng)
         for i in range(remaining_slots):
             if i >= len(consumables):
                 break
                 
             item_id = consumables[i % len(consumables)]
-            item_hex = f"{item_id:04X}"
-            item = ITEM_DATABASE.get(item_hex, {})
+            item = ITEM_BY_ID.get(item_id, {})
             
             if not item:
                 continue
@@ -1315,7 +1229,7 @@ def create_enhanced_logical_placement(verbose=False, options=None):
                 price = 25  # Default
             
             # Add some variation
-            price = max(5, int(price * (0.85 + (random.random() * 0.3))))
+            price = max(5, int(price * (0.85 + (rng.random() * 0.3))))
             
             shop_contents[shop_id].append({
                 'itemId': item_id,
@@ -1332,48 +1246,136 @@ def create_enhanced_logical_placement(verbose=False, options=None):
             # If we've reached the max items for this shop, break
             if shop_item_counts[shop_id] >= max_items:
                 break
+
+def finish_key_item_placement(placement, verbose=False, options=None, rng=None, failure=None):
+    """
+    Fill the rest of the world around a key item placement and validate it
     
-    # Verify the placement works correctly
-    if validate_game_progress(chest_contents, shop_contents, verbose):
-        if verbose:
-            print("Placement validated - game is beatable!")
-            print(f"Portrait chest {PORTRAIT_CHEST_ID} protected with item {PORTRAIT_ITEM_ID}")
-        return {
-            'chest_contents': chest_contents,
-            'shop_contents': shop_contents,
-            'key_item_placements': key_item_placements,
-            'starstone_locations': starstone_locations
-        }
-    else:
+    Args:
+        placement (dict): Key item placement from assumed_fill or backtracking_fill
+        verbose (bool): Whether to print detailed logs
+        options (dict): Randomization options
+        rng (SeededRNG): Random number generator
+        failure (dict): Filled with the stage and missing item if validation fails
+    
+    Returns:
+        dict: Map of chest IDs to item IDs and shop placements, with the validation sweep, or None if failed
+    """
+    chest_contents = placement['chest_contents']
+    shop_contents = placement['shop_contents']
+    
+    fill_remaining_locations(
+        chest_contents, shop_contents, placement['shop_item_counts'],
+        placement['used_chests'], placement['placed_items'], options, rng
+    )
+    shop_contents = resolve_shop_conflicts(shop_contents)
+    
+    # Gem costs and the shop conflict rules are not part of the fill rules,
+    # so the sweep still has the final say
+    sweep = validate_game_progress(chest_contents, shop_contents, verbose)
+    if not sweep:
         if verbose:
-            print("Placement validation failed - game is not beatable!")
+            logger.debug("Placement validation failed - game is not beatable!")
+        record_failure(failure, 'validation', get_missing_essential_items(chest_contents, shop_contents)[0])
         return None
+    
+    if verbose:
+        logger.debug("Placement validated - game is beatable!")
+    return {
+        'chest_contents': chest_contents,
+        'shop_contents': shop_contents,
+        'key_item_placements': placement['key_item_placements'],
+        'starstone_locations': placement['starstone_locations'],
+        'sweep': sweep
+    }
 
-def randomize_shops_with_key_items(rom_data, options, shop_contents):
+def create_assumed_fill_placement(verbose=False, options=None, rng=None, failure=None):
     """
-    Modified shop randomization function that incorporates key item integration
-    and handles shop evolution conflicts
+    Logical placement that places key items with assumed fill
+    
+    Unlike create_enhanced_logical_placement this does not hit dead ends for
+    satisfiable rules, so a single attempt is normally enough. The rest of the
+    world is filled the same way as the enhanced placement.
+    IMPORTANT: Protects Portrait chest (chest 150) from randomization
     
     Args:
-        rom_data (bytearray): ROM buffer
+        verbose (bool): Whether to print detailed logs
         options (dict): Randomization options
-        shop_contents (dict): Map of shop IDs to items
+        rng (SeededRNG): Random number generator
+        failure (dict): Filled with the stage, item and candidate count if the attempt fails
         
     Returns:
-        dict: Modified ROM buffer and randomized shops
+        dict: Map of chest IDs to item IDs and shop placements, with the validation sweep, or None if failed
     """
-    print('\nRandomizing shops with unique item integration...')
+    if options is None:
+        options = {}
+    if rng is None:
+        rng = create_seeded_rng()
     
-    # IMPORTANT: Preserve key items across evolution groups FIRST
-    print("Preserving key items across shop evolution stages...")
-    shop_contents = preserve_key_items_across_evolution(shop_contents)
+    if verbose:
+        logger.debug("Creating logical placement with assumed fill...")
     
-    # THEN handle shared offset conflicts (non-evolution)
-    shop_contents = handle_shared_offset_shops(shop_contents)
+    placement = assumed_fill(options, rng, verbose, failure)
+    if not placement:
+        return None
+    
+    return finish_key_item_placement(placement, verbose, options, rng, failure)
+    
+def create_backtracking_placement(verbose=False, options=None, rng=None, failure=None):
+    """
+    Logical placement that places key items with a backtracking forward fill
+    
+    A dead end undoes the last few key item decisions instead of throwing the
+    whole attempt away. Only when the 'backtrack_budget' option is used up
+    does the attempt fail and find_logical_placement start over.
+    IMPORTANT: Protects Portrait chest (chest 150) from randomization
+    
+    Args:
+        verbose (bool): Whether to print detailed logs
+        options (dict): Randomization options
+        rng (SeededRNG): Random number generator
+        failure (dict): Filled with the stage, item and candidate count if the attempt fails
+    
+    Returns:
+        dict: Map of chest IDs to item IDs and shop placements, with the validation sweep, or None if failed
+    """
+    if options is None:
+        options = {}
+    if rng is None:
+        rng = create_seeded_rng()
+    
+    if verbose:
+        logger.debug("Creating logical placement with backtracking fill...")
+    
+    placement = backtracking_fill(options, rng, verbose, failure)
+    if not placement:
+        return None
+    
+    return finish_key_item_placement(placement, verbose, options, rng, failure)
+
+# Placement engines selectable with the 'placement_mode' option
+PLACEMENT_MODES = {
+    'assumed': create_assumed_fill_placement,
+    'backtrack': create_backtracking_placement,
+    'greedy': create_enhanced_logical_placement
+}
+
+def plan_shops_with_key_items(shops, options, shop_contents):
+    """
+    Put the planned shop contents into the shop list without touching a ROM
     
-    # Read shop data using our known addresses
-    shops = read_shops_from_rom(rom_data)
-    print(f"Using {len(shops)} shops from the known shops database.")
+    Args:
+        shops (list): Shop objects from read_shops_from_rom or get_vanilla_shops
+        options (dict): Randomization options
+        shop_contents (dict): Map of shop IDs to items from a placement, with
+                              the shop conflicts already resolved
+        
+    Returns:
+        list: The shop objects with their planned items
+    """
+    logger.info("\nRandomizing shops with unique item integration...")
+    
+    logger.info("Using %s shops from the known shops database.", len(shops))
     
     # Create RNG with seed
     rng = create_seeded_rng(options.get('seed', random.randint(0, 999999)))
@@ -1384,7 +1386,7 @@ def randomize_shops_with_key_items(rom_data, options, shop_contents):
         try:
             shop_id = int(shop_id_str) if isinstance(shop_id_str, str) else shop_id_str
         except ValueError:
-            print(f"WARNING: Invalid shop ID format: {shop_id_str}")
+            logger.warning("WARNING: Invalid shop ID format: %s", shop_id_str)
             continue
             
         shop_index = -1
@@ -1411,16 +1413,34 @@ def randomize_shops_with_key_items(rom_data, options, shop_contents):
                     shop_location_info += f" (Evolution group: {evolution_group}, Stage: {stage})"
                 
                 if key_items:
-                    print(f"Added {len(key_items)} key items to shop #{shop_id} ({shop_location_info})")
+                    logger.debug("Added %s key items to shop #%s (%s)", len(key_items), shop_id, shop_location_info)
                     for item in key_items:
-                        print(f"  - {get_item_name(item['itemId'])}: {item['price']} gems (limit: {item['limit']})")
+                        logger.debug("  - %s: %s gems (limit: %s)", get_item_name(item['itemId']), item['price'], item['limit'])
         else:
-            print(f"WARNING: Shop ID {shop_id} not found in loaded shops - skipping")
+            logger.warning("WARNING: Shop ID %s not found in loaded shops - skipping", shop_id)
     
     # Validate prices and item counts
     validate_shop_prices(shops)
     validate_shop_item_counts(shops)
     
+    return shops
+
+def randomize_shops_with_key_items(rom_data, options, shop_contents):
+    """
+    Modified shop randomization function that incorporates key item integration
+    and handles shop evolution conflicts
+    
+    Args:
+        rom_data (bytearray): ROM buffer
+        options (dict): Randomization options
+        shop_contents (dict): Map of shop IDs to items from a placement
+        
+    Returns:
+        dict: Modified ROM buffer and randomized shops
+    """
+    # Shop data from our known addresses, parsed once per base ROM
+    shops = plan_shops_with_key_items(get_shop_model(rom_data, options.get('rom_digest')), options, shop_contents)
+    
     # Write changes back to the ROM
     modified_rom = write_shops_to_rom(rom_data, shops)
     
@@ -1429,46 +1449,196 @@ def randomize_shops_with_key_items(rom_data, options, shop_contents):
         'shops': shops
     }
 
-def randomize_with_unique_items(rom_data, options):
+def run_placement_attempt(seed, attempt_index, options):
     """
-    Modified main randomizer function that enforces unique items across the game world
-    and handles shop evolution conflicts by preserving key items across evolution stages
+    Run a single placement attempt with its derived sub-seed
+    
+    Module-level so that it can be sent to worker processes.
+    
+    Args:
+        seed (int): Base randomizer seed
+        attempt_index (int): Zero-based attempt number
+        options (dict): Randomization options
+        
+    Returns:
+        tuple: (placement from the engine named by options['placement_mode'] or None,
+                failure record or None if the attempt succeeded)
+    """
+    rng = create_seeded_rng(derive_attempt_seed(seed, attempt_index))
+    create_placement = PLACEMENT_MODES[options.get('placement_mode', 'assumed')]
+    failure = {}
+    placement = create_placement(options.get('verbose', False), options, rng, failure)
+    if placement:
+        return placement, None
+    return None, {'attempt': attempt_index + 1, 'stage': 'unknown', 'item': None, 'candidates': None, **failure}
+
+def create_placement_telemetry():
+    """
+    Create empty counters for the placement attempts of one seed
+    
+    Returns:
+        dict: Telemetry with attempt and failure counts, failures by stage and by
+              item, and the failure record of every failed attempt
+    """
+    return {
+        'attempts': 0,
+        'failures': 0,
+        'problems': [],
+        'by_stage': {},
+        'by_item': {},
+        'records': []
+    }
+
+def add_attempt_to_telemetry(telemetry, failure):
+    """
+    Count one placement attempt
+    
+    Args:
+        telemetry (dict): Telemetry from create_placement_telemetry, or None
+        failure (dict): Failure record of the attempt, or None if it succeeded
+    """
+    if telemetry is None:
+        return
+    
+    telemetry['attempts'] += 1
+    if failure is None:
+        return
+    
+    telemetry['failures'] += 1
+    telemetry['by_stage'][failure['stage']] = telemetry['by_stage'].get(failure['stage'], 0) + 1
+    item_key = failure['item'] or 'none'
+    telemetry['by_item'][item_key] = telemetry['by_item'].get(item_key, 0) + 1
+    telemetry['records'].append(failure)
+
+def log_placement_telemetry(telemetry):
+    """
+    Log a summary of the placement attempts
+    
+    Args:
+        telemetry (dict): Telemetry from create_placement_telemetry
+    """
+    logger.info("Placement attempts: %s, failed: %s", telemetry['attempts'], telemetry['failures'])
+    for stage, count in sorted(telemetry['by_stage'].items(), key=lambda entry: -entry[1]):
+        logger.info("  Failed at %s: %s", stage, count)
+    for item, count in sorted(telemetry['by_item'].items(), key=lambda entry: -entry[1]):
+        logger.debug("  Failed on %s: %s", item, count)
+
+def write_placement_telemetry(telemetry, path):
+    """
+    Write placement telemetry as JSON
+    
+    Args:
+        telemetry (dict): Telemetry from create_placement_telemetry
+        path (str): Output file path
+    """
+    with open(path, 'w') as f:
+        json.dump(telemetry, f, indent=2)
+    logger.info("Wrote placement telemetry to: %s", path)
+
+def find_logical_placement(options, telemetry=None):
+    """
+    Run placement attempts until one succeeds or max_attempts is reached
+    
+    Every attempt is seeded from the randomizer seed and its attempt index.
+    With more than one worker, attempts run in waves across a process pool
+    and the lowest-numbered success wins, so the result for a given seed does
+    not depend on the worker count.
+    
+    Args:
+        options (dict): Randomization options ('seed', 'max_attempts', 'workers')
+        telemetry (dict): Counters from create_placement_telemetry to fill in, optional
+        
+    Returns:
+        tuple: (placement dict or None, number of attempts up to the chosen one)
+    """
+    seed = options.get('seed')
+    if seed is None:
+        seed = random.randint(0, 999999)
+    max_attempts = options.get('max_attempts', 100)
+    workers = options.get('workers', 1) or os.cpu_count() or 1
+    verbose = options.get('verbose', False)
+    
+    # Assumed fill follows KEY_PROGRESSION_POINTS, so contradictions there are
+    # known before the first attempt
+    if options.get('placement_mode', 'assumed') == 'assumed':
+        for conflict in PROGRESSION_POINT_CONFLICTS:
+            logger.debug("Progression rule conflict: %s", conflict)
+        problems = check_placement_feasibility(options)
+        if problems:
+            for problem in problems:
+                logger.error("Impossible placement: %s", problem)
+            if telemetry is not None:
+                telemetry['problems'] = problems
+            return None, 0
+    
+    if workers <= 1:
+        for attempt_index in range(max_attempts):
+            if verbose:
+                logger.debug("Attempt %s/%s to create logical placement...", attempt_index + 1, max_attempts)
+            placement, failure = run_placement_attempt(seed, attempt_index, options)
+            add_attempt_to_telemetry(telemetry, failure)
+            if placement:
+                return placement, attempt_index + 1
+        return None, max_attempts
+    
+    # Keep every worker busy for a few attempts per wave
+    wave_size = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for wave_start in range(0, max_attempts, wave_size):
+            wave = range(wave_start, min(wave_start + wave_size, max_attempts))
+            if verbose:
+                logger.debug("Attempts %s-%s/%s to create logical placement on %s workers...", wave.start + 1, wave.stop, max_attempts, workers)
+            results = executor.map(
+                run_placement_attempt,
+                [seed] * len(wave), wave, [options] * len(wave)
+            )
+            # Results come back in attempt order, so the first hit is the lowest index
+            for attempt_index, (placement, failure) in zip(wave, results):
+                add_attempt_to_telemetry(telemetry, failure)
+                if placement:
+                    return placement, attempt_index + 1
+    
+    return None, max_attempts
+
+def plan_with_unique_items(options, chests=None, shops=None):
+    """
+    Plan the unique item placement for chests and shops without touching a ROM
+    
+    Runs the key item placement, shop integration and logic validation of
+    randomize_with_unique_items. The original chest and shop contents come
+    from the known chests and shops databases unless the caller read them
+    from a ROM.
     IMPORTANT: Protects Portrait chest from randomization
     
     Args:
-        rom_data (bytearray): ROM buffer
         options (dict): Randomization options
+        chests (list): Chest objects from read_chests_from_rom, defaults to get_vanilla_chests()
+        shops (list): Shop objects from read_shops_from_rom, defaults to get_vanilla_shops()
         
     Returns:
-        dict: Modified ROM buffer, spoiler log, etc.
+        dict: Chest contents, planned shops, spoiler logs, etc.
     """
-    print('\nRandomizing with unique item constraints and shop evolution support...')
-    print(f'NOTE: Portrait chest ({PORTRAIT_CHEST_ID}) will remain in vanilla location')
-    print('Key items will persist across shop evolution stages')
+    logger.info("\nRandomizing with unique item constraints and shop evolution support...")
+    logger.info("NOTE: Portrait chest (%s) will remain in vanilla location", PORTRAIT_CHEST_ID)
+    logger.info("Key items will persist across shop evolution stages")
     
     # Create logical placement of items in both chests and shops
-    placement = None
-    attempts = 0
     max_attempts = options.get('max_attempts', 100)
+    telemetry = create_placement_telemetry()
+    placement, attempts = find_logical_placement(options, telemetry)
     
-    while attempts < max_attempts:
-        attempts += 1
-        if options.get('verbose', False):
-            print(f"Attempt {attempts}/{max_attempts} to create logical placement...")
-        
-        placement = create_enhanced_logical_placement(options.get('verbose', False), options)
-        if placement:
-            break
+    log_placement_telemetry(telemetry)
+    if options.get('telemetry_path'):
+        write_placement_telemetry(telemetry, options['telemetry_path'])
     
     if not placement:
-        print(f"Failed to create logical placement after {max_attempts} attempts.")
-        return { 
-            'rom': rom_data, 
+        logger.error("Failed to create logical placement after %s attempts.", max_attempts)
+        return {
             'success': False,
             'error': "Could not create a valid logical placement" 
         }
     
-    print(f"Created logical placement with unique items after {attempts} attempt(s).")
+    logger.info("Created logical placement with unique items after %s attempt(s).", attempts)
     
     # Extract the chest contents and shop placements
     chest_contents = placement['chest_contents']
@@ -1477,39 +1647,35 @@ def randomize_with_unique_items(rom_data, options):
     
     # Verify Portrait chest is protected
     if PORTRAIT_CHEST_ID not in chest_contents or chest_contents[PORTRAIT_CHEST_ID] != PORTRAIT_ITEM_ID:
-        print(f"ERROR: Portrait chest protection failed! Expected {PORTRAIT_ITEM_ID}, got {chest_contents.get(PORTRAIT_CHEST_ID)}")
+        logger.error("ERROR: Portrait chest protection failed! Expected %s, got %s", PORTRAIT_ITEM_ID, chest_contents.get(PORTRAIT_CHEST_ID))
         return {
-            'rom': rom_data,
             'success': False,
             'error': "Portrait chest protection failed"
         }
     
     if options.get('verbose', False):
-        print(f"Confirmed Portrait chest {PORTRAIT_CHEST_ID} protected with item {PORTRAIT_ITEM_ID}")
+        logger.debug("Confirmed Portrait chest %s protected with item %s", PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID)
     
     # Initialize starstone_locations - either from the placement or as an empty list
     starstone_locations = placement.get('starstone_locations', [])
     
-    # Read current chest data for spoiler log
-    current_chests = read_chests_from_rom(rom_data)
+    # Original chest data for spoiler log
+    current_chests = chests if chests is not None else get_vanilla_chests()
     
     # DEBUG: Print contents of shop_contents
     if options.get('verbose', False):
-        print("\nDEBUG: Shop contents to be written:")
+        logger.debug("\nDEBUG: Shop contents to be written:")
         for shop_id, items in shop_contents.items():
             evolution_group, stage = get_evolution_group(int(shop_id) if isinstance(shop_id, str) else shop_id)
             group_info = f" (Group: {evolution_group}, Stage: {stage})" if evolution_group else ""
-            print(f"  Shop {shop_id}{group_info}: {len(items)} items")
+            logger.debug("  Shop %s%s: %s items", shop_id, group_info, len(items))
             for item in items:
-                print(f"    - {item['name']} (ID: {item['itemId']}, Price: {item['price']})")
-    
-    # Randomize chests with the logical placement
-    modified_rom = write_chests_to_rom(rom_data, chest_contents)
+                logger.debug("    - %s (ID: %s, Price: %s)", item['name'], item['itemId'], item['price'])
     
     # Randomize shops with key items integrated
-    shop_result = randomize_shops_with_key_items(modified_rom, options, shop_contents)
-    final_rom = shop_result['rom']
-    randomized_shops = shop_result['shops']
+    if shops is None:
+        shops = get_vanilla_shops()
+    randomized_shops = plan_shops_with_key_items(shops, options, shop_contents)
     
     # Create combined spoiler log
     chest_spoiler_log = []
@@ -1542,8 +1708,7 @@ def randomize_with_unique_items(rom_data, options):
         
         for item in shop['items']:
             item_name = get_item_name(item['itemId'])
-            item_hex = f"{item['itemId']:04X}"
-            item_info = ITEM_DATABASE.get(item_hex, {})
+            item_info = ITEM_BY_ID.get(item['itemId'], {})
             
             # Track key items
             if item_name in PROGRESSION_KEY_ITEMS:
@@ -1573,7 +1738,7 @@ def randomize_with_unique_items(rom_data, options):
     
     # Verify we have 5 Starstones
     if len(starstone_locations) < 5:
-        print(f"WARNING: Only {len(starstone_locations)}/5 Starstones were placed.")
+        logger.warning("WARNING: Only %s/5 Starstones were placed.", len(starstone_locations))
         
         # Count Starstones in chest contents and shops to debug
         starstone_id = ITEM_NAME_TO_ID.get('Starstone')
@@ -1581,8 +1746,8 @@ def randomize_with_unique_items(rom_data, options):
         shop_starstone_count = sum(1 for shop_id, items in shop_contents.items() 
                                   for item in items if item['itemId'] == starstone_id)
         
-        print(f"Starstones in chest_contents: {chest_starstone_count}")
-        print(f"Starstones in shop_contents: {shop_starstone_count}")
+        logger.debug("Starstones in chest_contents: %s", chest_starstone_count)
+        logger.debug("Starstones in shop_contents: %s", shop_starstone_count)
         
         # Try to recover missing Starstones
         for chest_id, item_id in chest_contents.items():
@@ -1604,7 +1769,7 @@ def randomize_with_unique_items(rom_data, options):
                         'location': chest_location,
                         'chest_id': chest_id
                     })
-                    print(f"Recovered missing Starstone in chest {chest_id} at {chest_location}")
+                    logger.info("Recovered missing Starstone in chest %s at %s", chest_id, chest_location)
         
         # Check for Starstones in shops that might not be tracked
         for shop_id, items in shop_contents.items():
@@ -1626,31 +1791,70 @@ def randomize_with_unique_items(rom_data, options):
                                 'price': item['price'],
                                 'shop_id': shop_id
                             })
-                            print(f"Recovered missing Starstone in shop {shop_id} at {shop_info['location']}")
+                            logger.info("Recovered missing Starstone in shop %s at %s", shop_id, shop_info['location'])
         
         # Total Starstones after recovery attempts
         total_starstones = len(starstone_locations)
         
         # If we still don't have 5 Starstones, this seed is invalid
         if total_starstones < 5:
-            print(f"FATAL ERROR: Only found {total_starstones}/5 required Starstones. This seed is invalid.")
+            logger.error("FATAL ERROR: Only found %s/5 required Starstones. This seed is invalid.", total_starstones)
             return {
-                'rom': rom_data,
                 'success': False,
                 'error': f"Could not place all 5 Starstones (found {total_starstones})"
             }
     else:
-        print(f"Successfully placed all 5 Starstones:")
+        logger.info("Successfully placed all 5 Starstones:")
         for i, location in enumerate(starstone_locations):
             if location['type'] == 'chest':
-                print(f"  - Starstone #{i+1}: Chest in {location['location']}")
+                logger.debug("  - Starstone #%s: Chest in %s", i+1, location['location'])
             else:
-                print(f"  - Starstone #{i+1}: Shop in {location['location']} ({location['price']} gems)")
+                logger.debug("  - Starstone #%s: Shop in %s (%s gems)", i+1, location['location'], location['price'])
+    
+    return {
+        'chest_contents': chest_contents,
+        'chest_spoiler_log': chest_spoiler_log,
+        'shop_spoiler_log': randomized_shops,
+        'key_items_in_shops': key_items_in_shops,
+        'unique_items_in_shops': unique_items_in_shops,
+        'key_item_placements': key_item_placements,
+        'starstone_locations': starstone_locations,
+        'playthrough': compute_playthrough(placement['sweep']),
+        'placement_telemetry': telemetry,
+        'success': True
+    }
+
+def randomize_with_unique_items(rom_data, options):
+    """
+    Modified main randomizer function that enforces unique items across the game world
+    and handles shop evolution conflicts by preserving key items across evolution stages
+    IMPORTANT: Protects Portrait chest from randomization
+    
+    Args:
+        rom_data (bytearray): ROM buffer
+        options (dict): Randomization options
+        
+    Returns:
+        dict: Modified ROM buffer, spoiler log, etc.
+    """
+    # The base ROM shops are parsed once per ROM digest and copied per seed
+    shops = get_shop_model(rom_data, options.get('rom_digest'))
+    plan = plan_with_unique_items(options, read_chests_from_rom(rom_data), shops)
+    if not plan['success']:
+        return dict(plan, rom=rom_data)
+    
+    # Randomize chests with the logical placement
+    modified_rom = write_chests_to_rom(rom_data, plan['chest_contents'])
+    
+    # Write the planned shops, key items included
+    final_rom = write_shops_to_rom(modified_rom, plan['shop_spoiler_log'])
     
     # Additional verification of shop contents
-    # Read shops from the final ROM to verify they were properly written
-    final_shops = read_shops_from_rom(final_rom)
-    print("\nVerifying shop contents after randomization:")
+    # Check only the written shop tables instead of parsing every shop again
+    final_shops, unwritten_shops = verify_shop_writes(final_rom, plan['shop_spoiler_log'])
+    logger.info("\nVerifying shop contents after randomization:")
+    for shop_id in unwritten_shops:
+        logger.warning("WARNING: Shop %s table does not hold the written items", shop_id)
     
     key_items_found = 0
     evolution_groups_with_key_items = {}
@@ -1669,9 +1873,9 @@ def randomize_with_unique_items(rom_data, options):
         if key_items_in_shop:
             key_items_found += len(key_items_in_shop)
             group_info = f" (Evolution group: {evolution_group}, Stage: {stage})" if evolution_group else ""
-            print(f"  Shop {shop_id} ({shop['location']}{group_info}): {len(key_items_in_shop)} key items found")
+            logger.debug("  Shop %s (%s%s): %s key items found", shop_id, shop['location'], group_info, len(key_items_in_shop))
             for item in key_items_in_shop:
-                print(f"    - {item['name']} (ID: {item['itemId']}, Price: {item['price']})")
+                logger.debug("    - %s (ID: %s, Price: %s)", item['name'], item['itemId'], item['price'])
             
             # Track evolution groups with key items
             if evolution_group:
@@ -1679,17 +1883,17 @@ def randomize_with_unique_items(rom_data, options):
                     evolution_groups_with_key_items[evolution_group] = {}
                 evolution_groups_with_key_items[evolution_group][shop_id] = key_items_in_shop
     
-    print(f"Total key items found in shops: {key_items_found}")
+    logger.info("Total key items found in shops: %s", key_items_found)
     
     # Verify key items are preserved across evolution groups
-    print("\nVerifying key item preservation across evolution groups:")
+    logger.info("\nVerifying key item preservation across evolution groups:")
     for group_name, shops_dict in evolution_groups_with_key_items.items():
         group_key_items = set()
         for shop_id, items in shops_dict.items():
             for item in items:
                 group_key_items.add(item['name'])
         
-        print(f"  {group_name}: {len(group_key_items)} unique key items across {len(shops_dict)} stages")
+        logger.info("  %s: %s unique key items across %s stages", group_name, len(group_key_items), len(shops_dict))
         if len(shops_dict) > 1:
             # Check that all shops in the group have the same key items
             first_shop_items = set(item['name'] for item in list(shops_dict.values())[0])
@@ -1698,20 +1902,11 @@ def randomize_with_unique_items(rom_data, options):
                 for items in shops_dict.values()
             )
             if all_match:
-                print(f"    [OK] All stages have the same key items")
+                logger.debug("    [OK] All stages have the same key items")
             else:
-                print(f"    [WARN] WARNING: Key items differ between stages!")
+                logger.warning("    [WARN] WARNING: Key items differ between stages!")
     
-    return {
-        'rom': final_rom,
-        'chest_spoiler_log': chest_spoiler_log,
-        'shop_spoiler_log': randomized_shops,
-        'key_items_in_shops': key_items_in_shops,
-        'unique_items_in_shops': unique_items_in_shops,
-        'key_item_placements': key_item_placements,
-        'starstone_locations': starstone_locations,
-        'success': True
-    }
+    return dict(plan, rom=final_rom)
 
 def randomize_with_shop_integration(rom_data, options):
     """
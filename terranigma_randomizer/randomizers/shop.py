@@ -2,19 +2,26 @@
 Shop randomization module for Terranigma Randomizer
 """
 
+import logging
 import random
 from terranigma_randomizer.constants.shops import (
     KNOWN_SHOPS, SHOP_ID_TO_INDEX, decimal_to_bcd, bcd_to_decimal,
-    SHOP_ITEM_ENTRY_SIZE, SHOP_ITEM_ID_OFFSET, 
+    SHOP_ITEM_ENTRY_SIZE, SHOP_ITEM_ID_OFFSET, SHOP_ITEM_LIMIT,
     SHOP_PRICE_LOW_OFFSET, SHOP_PRICE_HIGH_OFFSET, SHOP_LIMIT_OFFSET
 )
 from terranigma_randomizer.constants.items import (
-    ItemTypes, ITEM_DATABASE, get_item_name, get_item_info, PROGRESSION_KEY_ITEMS
+    ItemTypes, get_item_name, get_item_info, get_item_id, get_items_by_type, PROGRESSION_KEY_ITEMS
 )
 from terranigma_randomizer.constants.progression import get_progression_tier, GAME_AREAS
 from terranigma_randomizer.utils.logic import create_seeded_rng, shuffle_array
+from terranigma_randomizer.utils.rom import as_patch_buffer
 from terranigma_randomizer.constants.items import PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID
 
+logger = logging.getLogger(__name__)
+
+# Shops parsed from each base ROM by get_shop_model, by ROM digest
+_shop_models = {}
+
 # Define shop regions based on game progression
 SHOP_REGIONS = {
     'EARLY_GAME': [
@@ -140,7 +147,7 @@ def read_shops_from_rom(rom_data):
     Returns:
         list: Array of shop objects with current data
     """
-    print('Reading shop data from ROM using known addresses...')
+    logger.info("Reading shop data from ROM using known addresses...")
     
     # Create a deep copy of the known shops array
     import copy
@@ -152,7 +159,7 @@ def read_shops_from_rom(rom_data):
         
         # Skip if the offset is invalid or beyond the buffer
         if not file_offset or file_offset >= len(rom_data):
-            print(f"Warning: Invalid file offset {file_offset} for shop {shop['id']}")
+            logger.warning("Warning: Invalid file offset %s for shop %s", file_offset, shop['id'])
             continue
         
         # Read items up to the end marker or maximum count
@@ -205,38 +212,154 @@ def read_shops_from_rom(rom_data):
     
     return shops
 
+def copy_shops(shops):
+    """
+    Copy shop objects deep enough for the randomizer to modify
+    
+    Args:
+        shops (list): Array of shop objects
+        
+    Returns:
+        list: New shop objects with their own item lists and item objects
+    """
+    return [dict(shop, items=[dict(item) for item in shop['items']]) for shop in shops]
+
+def get_shop_model(rom_data, rom_digest=None):
+    """
+    Get the shops of a base ROM, parsing its shop tables once per ROM
+    
+    Args:
+        rom_data (bytearray or RomPatchBuffer): Base ROM buffer, without writes
+        rom_digest (str): Digest that identifies the base ROM; without one
+                          the shops are parsed and not kept
+        
+    Returns:
+        list: Copy of the shop objects that the caller may modify
+    """
+    shops = _shop_models.get(rom_digest) if rom_digest else None
+    if shops is None:
+        shops = read_shops_from_rom(rom_data)
+        if rom_digest:
+            _shop_models[rom_digest] = shops
+    
+    return copy_shops(shops)
+
+def encode_shop_items(items):
+    """
+    Encode shop items as the table bytes write_shops_to_rom writes
+    
+    Args:
+        items (list): Shop item objects
+        
+    Returns:
+        bytes: Item entries for up to SHOP_ITEM_LIMIT items and the 0xFF end marker
+    """
+    items = items[:SHOP_ITEM_LIMIT]
+    data = bytearray(SHOP_ITEM_ENTRY_SIZE * len(items) + 1)
+    for i, item in enumerate(items):
+        item_offset = SHOP_ITEM_ENTRY_SIZE * i
+        bcd_price = item.get('bcdPrice', decimal_to_bcd(item['price']))
+        data[item_offset + SHOP_ITEM_ID_OFFSET] = item['itemId'] & 0xFF
+        data[item_offset + SHOP_PRICE_LOW_OFFSET] = bcd_price & 0xFF
+        data[item_offset + SHOP_PRICE_HIGH_OFFSET] = (bcd_price >> 8) & 0xFF
+        data[item_offset + SHOP_LIMIT_OFFSET] = item['limit'] & 0xFF
+    data[-1] = 0xFF
+    return bytes(data)
+
+def verify_shop_writes(rom_data, shops):
+    """
+    Check the shop tables written by write_shops_to_rom without parsing them
+    
+    Only the byte ranges the shops were written to are read back. Tables can
+    overlap when a shop holds more items than the one it replaced, so each
+    range is compared with the bytes left after all writes, not just its own.
+    Shops that share a table sell the items of the last shop written to it.
+    
+    Args:
+        rom_data (bytearray or RomPatchBuffer): ROM buffer the shops were written to
+        shops (list): Array of shop objects in the order they were written
+        
+    Returns:
+        tuple: (shop objects with the items their table now holds,
+                IDs of shops whose table does not hold the written bytes)
+    """
+    shop_ranges = []
+    expected = {}
+    last_written = {}
+    for shop in shops:
+        shop_index = SHOP_ID_TO_INDEX.get(shop['id'])
+        if shop_index is None:
+            continue
+        file_offset = KNOWN_SHOPS[shop_index]['fileOffset']
+        entries = encode_shop_items(shop['items'])
+        shop_ranges.append((shop, file_offset, len(entries)))
+        last_written[file_offset] = shop
+        for i, value in enumerate(entries):
+            expected[file_offset + i] = value
+    
+    # Single byte reads stay cheap on a RomPatchBuffer, slices scan every write
+    rom_size = len(rom_data)
+    mismatched = {
+        address for address, value in expected.items()
+        if address >= rom_size or rom_data[address] != value
+    }
+    
+    shops_in_rom = []
+    unwritten = []
+    for shop, file_offset, length in shop_ranges:
+        table_items = last_written[file_offset]['items'][:SHOP_ITEM_LIMIT]
+        shops_in_rom.append(dict(shop, items=table_items))
+        if mismatched and any(file_offset + i in mismatched for i in range(length)):
+            unwritten.append(shop['id'])
+    
+    return shops_in_rom, unwritten
+
+def get_vanilla_shops():
+    """
+    Get shop data from the known shops database instead of a ROM
+    
+    Returns:
+        list: Array of shop objects with their vanilla items
+    """
+    import copy
+    shops = copy.deepcopy(KNOWN_SHOPS)
+    for shop in shops:
+        shop['region'] = get_shop_region(shop['location'])
+    
+    return shops
+
 def write_shops_to_rom(rom_data, shops):
     """
     Write shops to ROM
     
     Args:
-        rom_data (bytearray): ROM buffer
+        rom_data (bytearray or RomPatchBuffer): ROM buffer
         shops (list): Array of shop objects
         
     Returns:
-        bytearray: Modified ROM buffer
+        RomPatchBuffer: ROM buffer with the shop writes applied
     """
-    new_rom_data = bytearray(rom_data)
+    new_rom_data = as_patch_buffer(rom_data)
     
-    print(f"Writing {len(shops)} shops to ROM...")
+    logger.info("Writing %s shops to ROM...", len(shops))
     
     # Process each shop
     for shop in shops:
         # Find the shop template in our known shops array
         shop_index = SHOP_ID_TO_INDEX.get(shop['id'])
         if shop_index is None:
-            print(f"Warning: Shop ID {shop['id']} (type: {type(shop['id'])}) not found in known shops - skipping")
+            logger.warning("Warning: Shop ID %s (type: %s) not found in known shops - skipping", shop['id'], type(shop['id']))
             continue
         
         known_shop = KNOWN_SHOPS[shop_index]
         file_offset = known_shop['fileOffset']
         
-        print(f"Shop ID {shop['id']} ({shop.get('location', 'Unknown')}): Writing to offset {hex(file_offset)}")
-        print(f"  Items: {len(shop['items'])}")
+        logger.debug("Shop ID %s (%s): Writing to offset %s", shop['id'], shop.get('location', 'Unknown'), hex(file_offset))
+        logger.debug("  Items: %s", len(shop['items']))
         
         # Safety check - validate file offset is within buffer boundaries
         if file_offset + (len(shop['items']) * SHOP_ITEM_ENTRY_SIZE) + 1 > len(new_rom_data):
-            print(f"Warning: File offset {hex(file_offset)} for shop {shop['id']} is beyond buffer bounds - skipping")
+            logger.warning("Warning: File offset %s for shop %s is beyond buffer bounds - skipping", hex(file_offset), shop['id'])
             continue
         
         # Handle length limit - use the actual number of items we want to write
@@ -266,43 +389,34 @@ def write_shops_to_rom(rom_data, shops):
                 
                 # Debug output for key items
                 if item['name'] == 'Starstone' or item['name'] in PROGRESSION_KEY_ITEMS:
-                    print(f"    Item {i}: {item['name']} (ID: {item['itemId']}, Price: {item['price']}, BCD: 0x{valid_bcd_price:04X}, Limit: {item['limit']})")
+                    logger.debug("    Item %s: %s (ID: %s, Price: %s, BCD: 0x%04X, Limit: %s)", i, item['name'], item['itemId'], item['price'], valid_bcd_price, item['limit'])
                 else:
-                    print(f"    Item {i}: {item['name']} (ID: {item['itemId']}, Price: {item['price']}, Limit: {item['limit']})")
+                    logger.debug("    Item %s: %s (ID: %s, Price: %s, Limit: %s)", i, item['name'], item['itemId'], item['price'], item['limit'])
             except Exception as e:
-                print(f"Error writing item {item['name']} to shop {shop['id']}: {e}")
+                logger.error("Error writing item %s to shop %s: %s", item['name'], shop['id'], e)
         
         # Write end marker (0xFF) only after all items
         end_offset = file_offset + (SHOP_ITEM_ENTRY_SIZE * max_items)
         new_rom_data[end_offset] = 0xFF
-        print(f"  Wrote {max_items} items to shop {shop['id']}")
-    
-    # Verify the shops were written correctly
-    print("\nVerifying shops were written correctly...")
-    verification_shops = []
-    try:
-        # Don't print verbose logs during verification
-        temp_print = print
-        def silent_print(*args, **kwargs):
-            pass
-        globals()['print'] = silent_print
-        
-        verification_shops = read_shops_from_rom(new_rom_data)
-        
-        # Restore print function
-        globals()['print'] = temp_print
-        
-        for shop in verification_shops:
-            # Check if the shop has key items
-            key_items = [item for item in shop['items'] if item['name'] in PROGRESSION_KEY_ITEMS]
-            if key_items:
-                print(f"  Verified shop {shop['id']} ({shop['location']}) has {len(key_items)} key items:")
-                for item in key_items:
-                    print(f"    - {item['name']} (ID: {item['itemId']}, Price: {item['price']})")
-    except Exception as e:
-        # Restore print function if an error occurred
-        globals()['print'] = temp_print
-        print(f"Error during verification: {e}")
+        logger.debug("  Wrote %s items to shop %s", max_items, shop['id'])
+    
+    # Check the written tables and list their key items; this only produces
+    # log output, so skip it entirely unless debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("\nVerifying shops were written correctly...")
+        try:
+            shops_in_rom, unwritten = verify_shop_writes(new_rom_data, shops)
+            for shop_id in unwritten:
+                logger.debug("  Shop %s table does not hold the written items", shop_id)
+            for shop in shops_in_rom:
+                # Check if the shop has key items
+                key_items = [item for item in shop['items'] if item['name'] in PROGRESSION_KEY_ITEMS]
+                if key_items:
+                    logger.debug("  Verified shop %s (%s) has %s key items:", shop['id'], shop['location'], len(key_items))
+                    for item in key_items:
+                        logger.debug("    - %s (ID: %s, Price: %s)", item['name'], item['itemId'], item['price'])
+        except Exception as e:
+            logger.error("Error during verification: %s", e)
     
     return new_rom_data
 
@@ -467,7 +581,7 @@ def validate_shop_item_counts(shops):
             
             # Trim if necessary
             if len(shop['items']) > max_items:
-                print(f"Shop {shop['id']} ({shop['location']}) has too many items. Trimming from {len(shop['items'])} to {max_items}.")
+                logger.info("Shop %s (%s) has too many items. Trimming from %s to %s.", shop['id'], shop['location'], len(shop['items']), max_items)
                 shop['items'] = shop['items'][:max_items]
 
 def distribute_key_items_to_shops(shops, key_items_to_place, rng, options):
@@ -514,25 +628,25 @@ def distribute_key_items_to_shops(shops, key_items_to_place, rng, options):
                     if key_item not in ['Tower Key', 'Magic Anchor', 'Starstone']:
                         eligible_shops.extend(regional_shops)
                     else:
-                        print(f"Warning: Cannot place {key_item} in Magirock shops (too expensive)")
+                        logger.warning("Warning: Cannot place %s in Magirock shops (too expensive)", key_item)
         
         # If still no eligible shops, use MID_GAME gem shops as fallback
         if not eligible_shops and 'MID_GAME' in shops_by_region:
             gem_shops = [s for s in shops_by_region['MID_GAME'] if not is_magirock_shop(s)]
             if gem_shops:
                 eligible_shops = gem_shops
-                print(f"Warning: No eligible shops found for {key_item}, falling back to MID_GAME gem shops")
+                logger.warning("Warning: No eligible shops found for %s, falling back to MID_GAME gem shops", key_item)
         
         # If still no eligible shops, use any gem shop
         if not eligible_shops:
             all_gem_shops = [s for s in shops if not is_magirock_shop(s)]
             if all_gem_shops:
                 eligible_shops = all_gem_shops
-                print(f"Warning: No MID_GAME shops found for {key_item}, using any available gem shop")
+                logger.warning("Warning: No MID_GAME shops found for %s, using any available gem shop", key_item)
         
         # If we have eligible shops, randomly select one
         if eligible_shops:
-            shuffle_array(eligible_shops)
+            shuffle_array(eligible_shops, rng)
             chosen_shop = eligible_shops[0]
             
             # Add key item to the shop's placements
@@ -544,13 +658,13 @@ def distribute_key_items_to_shops(shops, key_items_to_place, rng, options):
             
             # Print placement info
             shop_type = "Magirock" if is_magirock_shop(chosen_shop) else "Gem"
-            print(f"Placed key item {key_item} in {chosen_shop['location']} shop (region: {chosen_shop['region']}, type: {shop_type})")
+            logger.info("Placed key item %s in %s shop (region: %s, type: %s)", key_item, chosen_shop['location'], chosen_shop['region'], shop_type)
             
             # Remove the shop from eligible shops to avoid overloading a single shop
             for region in shops_by_region:
                 shops_by_region[region] = [s for s in shops_by_region[region] if s['id'] != shop_id]
         else:
-            print(f"ERROR: Could not place key item {key_item} - no eligible shops available")
+            logger.error("ERROR: Could not place key item %s - no eligible shops available", key_item)
     
     return key_item_placements
 
@@ -583,15 +697,8 @@ def randomize_shop_with_key_items(shop, key_items, rng, options):
     # Start with key items
     new_items = []
     for key_item in key_items:
-        item_id = None
-        item_info = None
-        
         # Find item ID for this key item
-        for id_hex, item in ITEM_DATABASE.items():
-            if item['name'] == key_item:
-                item_id = int(id_hex, 16)
-                item_info = item
-                break
+        item_id = get_item_id(key_item)
         
         if item_id is not None:
             # Calculate price based on shop type
@@ -625,7 +732,7 @@ def randomize_shop_with_key_items(shop, key_items, rng, options):
             })
             
             currency = "Magirocks" if shop_uses_magirocks else "gems"
-            print(f"Added key item {key_item} to shop {shop['id']} ({shop['location']}) for {price} {currency}")
+            logger.info("Added key item %s to shop %s (%s) for %s %s", key_item, shop['id'], shop['location'], price, currency)
     
     # Determine number of items for this shop based on options
     items_per_shop = options.get('items_per_shop', 'normal')
@@ -642,42 +749,22 @@ def randomize_shop_with_key_items(shop, key_items, rng, options):
     
     # Add weapons (not for Magirock shops)
     if not shop_uses_magirocks:
-        weapons = []
-        for id_hex, item in ITEM_DATABASE.items():
-            if item['type'] == ItemTypes.WEAPON:
-                weapons.append({'id': id_hex, **item})
-        all_possible_items.extend(weapons)
+        all_possible_items.extend(get_items_by_type(ItemTypes.WEAPON))
     
     # Add armor (not for Magirock shops)
     if not shop_uses_magirocks:
-        armor = []
-        for id_hex, item in ITEM_DATABASE.items():
-            if item['type'] == ItemTypes.ARMOR:
-                armor.append({'id': id_hex, **item})
-        all_possible_items.extend(armor)
+        all_possible_items.extend(get_items_by_type(ItemTypes.ARMOR))
     
     # Add consumables (not typical for Magirock shops)
     if not shop_uses_magirocks:
-        consumables = []
-        for id_hex, item in ITEM_DATABASE.items():
-            if item['type'] == ItemTypes.CONSUMABLE:
-                consumables.append({'id': id_hex, **item})
-        all_possible_items.extend(consumables)
+        all_possible_items.extend(get_items_by_type(ItemTypes.CONSUMABLE))
     
     # Add rings (primary items for Magirock shops)
-    rings = []
-    for id_hex, item in ITEM_DATABASE.items():
-        if item['type'] == ItemTypes.RING:
-            rings.append({'id': id_hex, **item})
-    all_possible_items.extend(rings)
+    all_possible_items.extend(get_items_by_type(ItemTypes.RING))
     
     # If we want to add other items like accessories
     if options.get('include_accessories', False) and not shop_uses_magirocks:
-        accessories = []
-        for id_hex, item in ITEM_DATABASE.items():
-            if item['type'] == ItemTypes.ACCESSORY:
-                accessories.append({'id': id_hex, **item})
-        all_possible_items.extend(accessories)
+        all_possible_items.extend(get_items_by_type(ItemTypes.ACCESSORY))
     
     # Filter out any key items that we don't want in shops unless specifically enabled
     if not options.get('include_key_items', False):
@@ -848,7 +935,7 @@ def randomize_shop_with_key_items(shop, key_items, rng, options):
             }
         
         new_items.append(basic_ring)
-        print(f"Shop {shop['id']} ({shop['location']}) had no items, added a basic item")
+        logger.info("Shop %s (%s) had no items, added a basic item", shop['id'], shop['location'])
     
     randomized_shop['items'] = new_items
     
@@ -865,16 +952,16 @@ def randomize_shops(rom_data, options):
     Returns:
         dict: Modified ROM buffer and randomized shops
     """
-    print('\nRandomizing shops with region logic...')
+    logger.info("\nRandomizing shops with region logic...")
     
-    # Read shop data using our known addresses
-    shops = read_shops_from_rom(rom_data)
-    print(f"Using {len(shops)} shops from the known shops database.")
+    # Shop data from our known addresses, parsed once per base ROM
+    shops = get_shop_model(rom_data, options.get('rom_digest'))
+    logger.info("Using %s shops from the known shops database.", len(shops))
     
     # Check regions
     for shop in shops:
         shop_type = "Magirock" if is_magirock_shop(shop) else "Gem"
-        print(f"Shop {shop['id']} ({shop['location']}) - Region: {shop['region']}, Type: {shop_type}")
+        logger.debug("Shop %s (%s) - Region: %s, Type: %s", shop['id'], shop['location'], shop['region'], shop_type)
     
     # Create RNG with seed
     rng = create_seeded_rng(options.get('seed', random.randint(0, 999999)))
@@ -887,13 +974,13 @@ def randomize_shops(rom_data, options):
         num_key_items = int(len(CRITICAL_KEY_ITEMS) * key_item_percent)
         num_key_items = max(2, min(num_key_items, 5))  # At least 2, at most 5
         
-        # Choose which key items to place in shops
-        shuffle_array(CRITICAL_KEY_ITEMS)
-        key_items_for_shops = CRITICAL_KEY_ITEMS[:num_key_items]
+        # Choose which key items to place in shops (shuffle a copy, the list is shared)
+        critical_key_items = shuffle_array(list(CRITICAL_KEY_ITEMS), rng)
+        key_items_for_shops = critical_key_items[:num_key_items]
         
-        print(f"\nPlacing {num_key_items} key items in shops:")
+        logger.info("\nPlacing %s key items in shops:", num_key_items)
         for item in key_items_for_shops:
-            print(f"- {item}")
+            logger.info("- %s", item)
     
     # Distribute key items to shops based on region logic
     key_item_placements = distribute_key_items_to_shops(shops, key_items_for_shops, rng, options)
@@ -932,9 +1019,9 @@ def randomize_shops(rom_data, options):
                 })
     
     if key_items_in_shops:
-        print("\nKey items placed in shops:")
+        logger.info("\nKey items placed in shops:")
         for entry in key_items_in_shops:
-            print(f"- {entry['item']} in {entry['shop']} ({entry['region']}) - {entry['price']} {entry['currency']}")
+            logger.info("- %s in %s (%s) - %s %s", entry['item'], entry['shop'], entry['region'], entry['price'], entry['currency'])
     
     return {
         'rom': modified_rom,
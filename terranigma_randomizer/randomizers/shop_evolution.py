@@ -3,8 +3,11 @@ Shop evolution handler for Terranigma Randomizer
 Handles shops that share the same memory location but represent different stages
 """
 
+import logging
 from terranigma_randomizer.constants.items import PROGRESSION_KEY_ITEMS
 
+logger = logging.getLogger(__name__)
+
 # Shop evolution groups - shops that share the same physical location
 # but represent different stages of town development
 SHOP_EVOLUTION_GROUPS = {
@@ -167,8 +170,8 @@ def handle_shop_evolution_conflicts(shop_contents):
                     adjusted_contents[shop_id_to_assign] = unique_items
                     
                 if key_items_found:
-                    print(f"Consolidated {len(unique_items)} items across {group_name} shop stages: {all_shop_ids}")
-                    print(f"  Key items preserved: {', '.join(key_items_found)}")
+                    logger.info("Consolidated %s items across %s shop stages: %s", len(unique_items), group_name, all_shop_ids)
+                    logger.info("  Key items preserved: %s", ', '.join(key_items_found))
         
         elif group_name is None:
             # This shop is not part of an evolution group
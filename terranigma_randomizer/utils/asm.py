@@ -3,21 +3,28 @@ ASM patch module for Terranigma Randomizer
 Contains functions to apply various ROM patches
 """
 
+import logging
+from terranigma_randomizer.utils.rom import as_patch_buffer
+
+logger = logging.getLogger(__name__)
+
 def debug_rom_section(rom_data, address, length=16):
     """
-    Print a section of ROM bytes for debugging
+    Log a section of ROM bytes for debugging
     
     Args:
         rom_data (bytearray): ROM buffer
         address (int): Starting address
-        length (int): Number of bytes to print
+        length (int): Number of bytes to log
     """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     try:
-        print(f"ROM section at {hex(address)}:")
+        logger.debug("ROM section at %s:", hex(address))
         hex_bytes = ' '.join([f"{rom_data[address+i]:02X}" for i in range(length)])
-        print(hex_bytes)
+        logger.debug("%s", hex_bytes)
     except Exception as e:
-        print(f"Error examining ROM at {hex(address)}: {e}")
+        logger.error("Error examining ROM at %s: %s", hex(address), e)
 
 def apply_intro_skip_patch(rom_data):
     """
@@ -36,16 +43,16 @@ def apply_intro_skip_patch(rom_data):
     10. Warps the player outside Crysta (coordinates: $0003, $00, $55, $0210, $0210)
     
     Args:
-        rom_data (bytearray): ROM buffer
+        rom_data (bytearray or RomPatchBuffer): ROM buffer
         
     Returns:
-        bytearray: Modified ROM buffer
+        RomPatchBuffer: ROM buffer with the patch applied
     """
-    print("Applying intro skip patch...")
-    print(f"ROM size: {len(rom_data)} bytes ({hex(len(rom_data))})")
+    logger.info("Applying intro skip patch...")
+    logger.debug("ROM size: %s bytes (%s)", len(rom_data), hex(len(rom_data)))
     
-    # Create a copy of the ROM data to modify
-    patched_rom = bytearray(rom_data)
+    # Write into a patch buffer instead of copying the ROM
+    patched_rom = as_patch_buffer(rom_data)
     
     # org $90886f - Hook location (HiROM address)
     # In HiROM: Bank $90 mirrors bank $10
@@ -53,7 +60,7 @@ def apply_intro_skip_patch(rom_data):
     hook_offset = 0x10886F
     
     # First, let's see what's currently at the hook location
-    print(f"\nBefore patching at hook location ${hook_offset:06X}:")
+    logger.debug("\nBefore patching at hook location $%06X:", hook_offset)
     debug_rom_section(patched_rom, hook_offset, 16)
     
     # JML $FE0000
@@ -66,7 +73,7 @@ def apply_intro_skip_patch(rom_data):
     for i in range(6):
         patched_rom[hook_offset + 4 + i] = 0xEA
     
-    print(f"\nAfter patching at hook location ${hook_offset:06X}:")
+    logger.debug("\nAfter patching at hook location $%06X:", hook_offset)
     debug_rom_section(patched_rom, hook_offset, 16)
     
     # org $FE0000 - Custom code location (HiROM address)
@@ -75,11 +82,11 @@ def apply_intro_skip_patch(rom_data):
     
     # Check if we have enough space
     if code_offset >= len(patched_rom):
-        print(f"ERROR: Code offset ${code_offset:06X} is beyond ROM size!")
-        print(f"ROM size is only ${len(patched_rom):06X}")
+        logger.error("ERROR: Code offset $%06X is beyond ROM size!", code_offset)
+        logger.error("ROM size is only $%06X", len(patched_rom))
         return patched_rom
     
-    print(f"\nBefore patching at code location ${code_offset:06X}:")
+    logger.debug("\nBefore patching at code location $%06X:", code_offset)
     debug_rom_section(patched_rom, code_offset, 32)
     
     # The full patch code exactly as in my current ASM
@@ -210,33 +217,33 @@ def apply_intro_skip_patch(rom_data):
         if code_offset + i < len(patched_rom):
             patched_rom[code_offset + i] = byte
         else:
-            print(f"ERROR: Trying to write beyond ROM size at ${code_offset + i:06X}")
+            logger.error("ERROR: Trying to write beyond ROM size at $%06X", code_offset + i)
             break
     
-    print(f"\nAfter patching at code location ${code_offset:06X}:")
+    logger.debug("\nAfter patching at code location $%06X:", code_offset)
     debug_rom_section(patched_rom, code_offset, 32)
     
-    print(f"\n[OK] Intro skip patch applied")
-    print(f"  - Hook at $90886F (ROM: ${hook_offset:06X})")
-    print(f"  - Custom code at $FE0000 (ROM: ${code_offset:06X})")
+    logger.info("\n[OK] Intro skip patch applied")
+    logger.debug("  - Hook at $90886F (ROM: $%06X)", hook_offset)
+    logger.debug("  - Custom code at $FE0000 (ROM: $%06X)", code_offset)
     
-    # Let's also verify the bytes were actually changed
+    # Let's also verify the bytes were actually changed compared to the base ROM
     hook_changed = False
     for i in range(10):
-        if rom_data[hook_offset + i] != patched_rom[hook_offset + i]:
+        if patched_rom.original(hook_offset + i) != patched_rom[hook_offset + i]:
             hook_changed = True
             break
     
     code_changed = False
     for i in range(len(code_bytes)):
-        if code_offset + i < len(rom_data) and code_offset + i < len(patched_rom):
-            if rom_data[code_offset + i] != patched_rom[code_offset + i]:
+        if code_offset + i < len(patched_rom):
+            if patched_rom.original(code_offset + i) != patched_rom[code_offset + i]:
                 code_changed = True
                 break
     
-    print(f"\nVerification:")
-    print(f"  - Hook location modified: {hook_changed}")
-    print(f"  - Code location modified: {code_changed}")
+    logger.debug("\nVerification:")
+    logger.debug("  - Hook location modified: %s", hook_changed)
+    logger.debug("  - Code location modified: %s", code_changed)
     
     return patched_rom
 
@@ -248,15 +255,15 @@ def apply_boss_magic_patch(rom_data):
     The addresses provided disable the magic restriction flag for each boss.
     
     Args:
-        rom_data (bytearray): ROM buffer
+        rom_data (bytearray or RomPatchBuffer): ROM buffer
         
     Returns:
-        bytearray: Modified ROM buffer
+        RomPatchBuffer: ROM buffer with the patch applied
     """
-    print("Applying boss magic patch...")
+    logger.info("Applying boss magic patch...")
     
-    # Create a copy of the ROM data to modify
-    patched_rom = bytearray(rom_data)
+    # Write into a patch buffer instead of copying the ROM
+    patched_rom = as_patch_buffer(rom_data)
     
     # Boss fight magic restriction addresses
     # Each address needs to be set to 0x00 to enable magic
@@ -279,7 +286,7 @@ def apply_boss_magic_patch(rom_data):
         try:
             # Check if offset is within ROM bounds
             if file_offset >= len(patched_rom):
-                print(f"[ERROR] {boss_name}: Offset {hex(file_offset)} is beyond ROM size")
+                logger.error("[ERROR] %s: Offset %s is beyond ROM size", boss_name, hex(file_offset))
                 continue
             
             # Get the current value
@@ -289,24 +296,26 @@ def apply_boss_magic_patch(rom_data):
             if original_value != 0x00:
                 # Apply the patch - set to 0x00 to enable magic
                 patched_rom[file_offset] = 0x00
-                print(f"[OK] {boss_name}: Patched at {hex(file_offset)} (was {hex(original_value)}, now 0x00)")
+                logger.debug("[OK] %s: Patched at %s (was %s, now 0x00)", boss_name, hex(file_offset), hex(original_value))
                 patches_applied += 1
             else:
-                print(f"[--] {boss_name}: Already enabled at {hex(file_offset)} (value is 0x00)")
+                logger.debug("[--] %s: Already enabled at %s (value is 0x00)", boss_name, hex(file_offset))
                 
         except Exception as e:
-            print(f"[ERROR] {boss_name}: Error patching at {hex(file_offset)}: {e}")
+            logger.error("[ERROR] %s: Error patching at %s: %s", boss_name, hex(file_offset), e)
     
-    print(f"\nBoss magic patch completed: {patches_applied} patches applied")
+    logger.info("\nBoss magic patch completed: %s patches applied", patches_applied)
     
     # Verify the patches
-    print("\nVerifying patches:")
+    logger.debug("\nVerifying patches:")
     for file_offset, boss_name in boss_patches:
         try:
             if file_offset < len(patched_rom):
                 value = patched_rom[file_offset]
-                status = "[OK] Enabled" if value == 0x00 else "[FAIL] Still disabled"
-                print(f"{boss_name}: {status} (value: {hex(value)})")
+                if value == 0x00:
+                    logger.debug("%s: [OK] Enabled (value: %s)", boss_name, hex(value))
+                else:
+                    logger.warning("%s: [FAIL] Still disabled (value: %s)", boss_name, hex(value))
         except:
             pass
     
@@ -317,13 +326,13 @@ def apply_asm_patches(rom_data, options):
     Apply all selected ASM patches based on options
     
     Args:
-        rom_data (bytearray): ROM buffer
+        rom_data (bytearray or RomPatchBuffer): ROM buffer
         options (dict): Randomization options
         
     Returns:
-        bytearray: Modified ROM buffer
+        RomPatchBuffer: ROM buffer with the selected patches applied
     """
-    patched_rom = bytearray(rom_data)
+    patched_rom = as_patch_buffer(rom_data)
     
     # Apply intro skip patch if enabled
     if options.get("skip_intro", False):
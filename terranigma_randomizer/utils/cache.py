@@ -0,0 +1,177 @@
+"""
+On-disk seed result cache for Terranigma Randomizer
+
+Finished seeds are stored under a key derived from the base ROM, the seed,
+the options, the randomizer version and CACHE_VERSION, so an identical
+request can be served without running placement again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import terranigma_randomizer
+from terranigma_randomizer.utils.rom import fingerprint_rom
+
+logger = logging.getLogger(__name__)
+
+# Version of the seed generation in the cache key. Bump it with every change
+# that alters the seed generated for the same ROM and options (placement,
+# logic, pricing, shop contents, ASM patches or the plan layout), otherwise
+# cached seeds made by the old code keep being served.
+CACHE_VERSION = 2
+
+# Default cap on the total size of the cache directory
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+
+# Options that do not change the generated seed, left out of the cache key
+CACHE_IGNORED_OPTIONS = [
+    'verbose', 'workers', 'telemetry', 'telemetry_path', 'plan_only', 'plan_format',
+    'output_format', 'cache_dir', 'cache_size'
+]
+
+# File in the cache directory that keeps base ROM fingerprints across runs
+FINGERPRINT_CACHE_FILE = 'rom-fingerprints.json'
+
+# Files of a cache entry, by the name they are stored and returned under
+CACHE_ENTRY_FILES = {
+    'plan': 'plan.bin',
+    'patch': 'patch.ips',
+    'spoiler': 'spoiler.txt'
+}
+
+def get_rom_digest(rom_data):
+    """
+    Get the digest of a base ROM, the SHA-1 from its fingerprint
+    
+    Args:
+        rom_data (bytes): ROM data
+    
+    Returns:
+        str: Hex digest
+    """
+    return fingerprint_rom(rom_data)['sha1']
+
+def get_cache_key(rom_digest, options):
+    """
+    Get the cache key for a seed
+    
+    The key changes with the package version and CACHE_VERSION, so seeds
+    cached before a change to seed generation are not served.
+    
+    Args:
+        rom_digest (str): Digest of the base ROM from get_rom_digest
+        options (dict): Randomization options, including the seed
+    
+    Returns:
+        str: Hex key
+    """
+    key_options = {name: value for name, value in options.items() if name not in CACHE_IGNORED_OPTIONS}
+    key_data = json.dumps({
+        'rom': rom_digest,
+        'options': key_options,
+        'version': terranigma_randomizer.__version__,
+        'cache_version': CACHE_VERSION
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+class SeedCache:
+    """
+    Directory of cached seed results with least-recently-used eviction
+    
+    Each entry is a subdirectory named by its key that holds the files in
+    CACHE_ENTRY_FILES. Reading an entry touches it, and once the cache grows
+    past max_size the entries used longest ago are removed. Entries are
+    written to a temporary directory first and renamed into place, so
+    processes sharing the cache never see half-written entries.
+    
+    Args:
+        directory (str): Cache directory, created if missing
+        max_size (int): Size in bytes the cache is kept under
+    """
+    
+    def __init__(self, directory, max_size=DEFAULT_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+    
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key)
+    
+    def get(self, key):
+        """
+        Read a cached entry
+        
+        Args:
+            key (str): Key from get_cache_key
+        
+        Returns:
+            dict: Entry contents as bytes by name, or None if not cached
+        """
+        entry_path = self._entry_path(key)
+        entry = {}
+        try:
+            for name, filename in CACHE_ENTRY_FILES.items():
+                with open(os.path.join(entry_path, filename), 'rb') as f:
+                    entry[name] = f.read()
+            os.utime(entry_path)
+        except OSError:
+            # Missing, or evicted by another process while reading
+            return None
+        return entry
+    
+    def put(self, key, entry):
+        """
+        Store an entry and evict old entries if the cache is over its size
+        
+        Args:
+            key (str): Key from get_cache_key
+            entry (dict): Entry contents as bytes by name, see CACHE_ENTRY_FILES
+        """
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.tmp-{os.getpid()}"
+        
+        os.makedirs(temp_path, exist_ok=True)
+        for name, filename in CACHE_ENTRY_FILES.items():
+            with open(os.path.join(temp_path, filename), 'wb') as f:
+                f.write(entry[name])
+        
+        try:
+            os.rename(temp_path, entry_path)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(temp_path, ignore_errors=True)
+        
+        self.evict()
+    
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_size
+        
+        Returns:
+            int: Number of entries removed
+        """
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or '.tmp-' in entry.name:
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+            except OSError:
+                continue
+            total_size += size
+        
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+            removed += 1
+        
+        if removed:
+            logger.debug("Evicted %s cached seeds", removed)
+        return removed
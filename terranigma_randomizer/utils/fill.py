@@ -0,0 +1,661 @@
+"""
+Assumed-fill placement for Terranigma Randomizer
+Places progression items so that every one of them is reachable by construction
+"""
+
+import logging
+from terranigma_randomizer.constants.items import (
+    ITEM_BY_ID, ITEM_NAME_TO_ID, PROGRESSION_KEY_ITEMS, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID, ItemTypes
+)
+from terranigma_randomizer.constants.progression import (
+    get_item_mask, AREA_CHESTS, ROM_SHOP_ID_TO_SHOP_ID, UNSAFE_SHOPS_FOR_KEY_ITEMS
+)
+from terranigma_randomizer.constants.chests import CHEST_MAP
+from terranigma_randomizer.constants.shops import KNOWN_SHOPS, decimal_to_bcd
+from terranigma_randomizer.utils.logic import (
+    PLACEABLE_LOCATIONS, UNPLACEABLE_ITEMS, STARTING_GEMS, create_seeded_rng, shuffle_array,
+    get_max_shop_items, get_chest_location_name, get_reachable_locations_for_mask, record_failure
+)
+
+logger = logging.getLogger(__name__)
+
+# Shop names for messages
+SHOP_NAMES = {shop['id']: shop['location'] for shop in KNOWN_SHOPS}
+
+# Number of Starstones needed to open Astarica
+STARSTONE_COUNT = 5
+
+# Key items that are never sold in shops
+CHEST_ONLY_KEY_ITEMS = ['Giant Leaves']
+
+# Undos a backtracking fill may make before the attempt is abandoned
+DEFAULT_BACKTRACK_BUDGET = 200
+
+# Chance for a key item to prefer a shop over a chest
+SHOP_PLACEMENT_CHANCE = 0.3
+
+# Base shop prices for key items, before variation
+KEY_ITEM_BASE_PRICES = {
+    'Ra Dewdrop': 120,
+    'RocSpear': 180,
+    'Crystal Thread': 250,
+    'Sharp Claws': 300,
+    'Red Scarf': 120,
+    'Engagement Ring': 120,
+    'Air Herb': 120,
+    'Tower Key': 400,
+    'Sewer Key': 400,
+    'Magic Anchor': 550,
+    'Speed Shoes': 550,
+    'Starstone': 400
+}
+DEFAULT_KEY_ITEM_PRICE = 200
+
+def get_progression_item_pool():
+    """
+    Get every progression item that has to be placed, one entry per copy
+    
+    Returns:
+        list: Item names - each key item once, plus one entry per Starstone
+    """
+    pool = [item for item in PROGRESSION_KEY_ITEMS if item != 'Starstone' and item in ITEM_NAME_TO_ID]
+    pool.extend(['Starstone'] * STARSTONE_COUNT)
+    return pool
+
+def get_reachable_locations(assumed_items, chest_items, shop_items):
+    """
+    Get the chests and logic shops reachable while holding the assumed items
+    
+    Items already placed in reachable locations are picked up as well, until
+    nothing new opens. Starstones only count once all five are held, the same
+    way ProgressionSweep counts them. Locations are tested against their
+    transitive requirement closure, so a location is never offered when one of
+    the items it needs could only be placed behind the item being placed.
+    
+    Args:
+        assumed_items (list): Item names assumed to be in the player's hands
+        chest_items (dict): Map of chest IDs to placed item names
+        shop_items (dict): Map of logic shop IDs to lists of placed item names
+    
+    Returns:
+        tuple: (set of reachable chest IDs, set of reachable logic shop IDs)
+    """
+    base_items = set(assumed_items)
+    base_starstones = assumed_items.count('Starstone')
+    reachable_chests = frozenset()
+    reachable_shops = frozenset()
+    
+    while True:
+        collected_items = set(base_items)
+        starstones = base_starstones
+        
+        for chest_id in reachable_chests:
+            item_name = chest_items.get(chest_id)
+            if item_name == 'Starstone':
+                starstones += 1
+            elif item_name:
+                collected_items.add(item_name)
+        for shop_id in reachable_shops:
+            for item_name in shop_items.get(shop_id, ()):
+                if item_name == 'Starstone':
+                    starstones += 1
+                else:
+                    collected_items.add(item_name)
+        
+        collected_items.discard('Starstone')
+        if starstones >= STARSTONE_COUNT:
+            collected_items.add('Starstones5')
+        
+        chests, shops = get_reachable_locations_for_mask(get_item_mask(collected_items))
+        if chests == reachable_chests and shops == reachable_shops:
+            return chests, shops
+        reachable_chests, reachable_shops = chests, shops
+
+def get_key_item_shops(options):
+    """
+    Get the shops that can sell key items and how many items each can hold
+    
+    Args:
+        options (dict): Randomization options
+    
+    Returns:
+        tuple: (map of logic shop IDs to KNOWN_SHOPS entries, map of shop IDs to capacity)
+    """
+    logic_shops = {}
+    for shop in KNOWN_SHOPS:
+        logic_shop_id = ROM_SHOP_ID_TO_SHOP_ID.get(shop['id'])
+        if logic_shop_id and shop['id'] not in UNSAFE_SHOPS_FOR_KEY_ITEMS:
+            logic_shops.setdefault(logic_shop_id, []).append(shop)
+    
+    shop_capacity = {
+        shop['id']: get_max_shop_items(shop['id'], options)
+        for shops in logic_shops.values() for shop in shops
+    }
+    return logic_shops, shop_capacity
+
+def describe_locations(locations, capacity):
+    """
+    Summarise a set of locations by area and shop for error messages
+    
+    Args:
+        locations (iterable): ('chest', chest ID) and ('shop', shop ID) tuples
+        capacity (dict): Map of locations to the number of items they hold
+    
+    Returns:
+        str: Description like "UNDERWORLD_START (7 chests), Crysta Day (5 slots)"
+    """
+    chest_areas = {}
+    for area_name, chests in AREA_CHESTS.items():
+        for chest_id in chests:
+            chest_areas.setdefault(chest_id, area_name)
+    
+    counts = {}
+    for location_type, location_id in sorted(locations):
+        if location_type == 'chest':
+            key = (chest_areas.get(location_id, 'UNKNOWN'), 'chests')
+        else:
+            key = (SHOP_NAMES.get(location_id, location_id), 'slots')
+        counts[key] = counts.get(key, 0) + capacity[(location_type, location_id)]
+    
+    return ', '.join(f"{name} ({count} {unit})" for (name, unit), count in counts.items())
+
+def get_key_item_graph(pool, options):
+    """
+    Get the location slots each key item may be placed in
+    
+    Args:
+        pool (list): Progression item pool
+        options (dict): Randomization options
+    
+    Returns:
+        tuple: (map of item names to ('chest', chest ID) and ('shop', shop ID) locations,
+                map of those locations to the number of items they hold)
+    """
+    logic_shops, shop_capacity = get_key_item_shops(options)
+    
+    # Locations that open at all once every key item is held
+    reachable_chests, reachable_shops = get_reachable_locations(pool, {}, {})
+    
+    capacity = {}
+    edges = {}
+    for item_name in sorted(set(pool)):
+        allowed_chests, allowed_shops = PLACEABLE_LOCATIONS[item_name]
+        item_edges = [
+            ('chest', chest_id) for chest_id in sorted(allowed_chests & reachable_chests)
+            if chest_id in CHEST_MAP and chest_id != PORTRAIT_CHEST_ID
+        ]
+        if item_name not in CHEST_ONLY_KEY_ITEMS:
+            for logic_shop_id in sorted(allowed_shops & reachable_shops):
+                for shop in logic_shops.get(logic_shop_id, ()):
+                    if shop_capacity[shop['id']] > 0:
+                        item_edges.append(('shop', shop['id']))
+        for location in item_edges:
+            capacity[location] = shop_capacity[location[1]] if location[0] == 'shop' else 1
+        edges[item_name] = item_edges
+    
+    return edges, capacity
+
+def augment_matching(copy_index, pool, edges, capacity, assigned, visited):
+    """
+    Find a slot for one more item copy, moving matched copies along if needed
+    
+    Nothing is changed unless a slot is found.
+    
+    Args:
+        copy_index (int): Index of the copy in the pool
+        pool (list): Progression item pool
+        edges (dict): Map of item names to their locations
+        capacity (dict): Map of locations to the number of items they hold
+        assigned (dict): Map of locations to the pool indices matched to them
+        visited (set): Locations already searched
+    
+    Returns:
+        bool: True if the copy was matched
+    """
+    for location in edges[pool[copy_index]]:
+        if location in visited:
+            continue
+        visited.add(location)
+        if len(assigned[location]) < capacity[location]:
+            assigned[location].append(copy_index)
+            return True
+        for position, other_index in enumerate(assigned[location]):
+            if augment_matching(other_index, pool, edges, capacity, assigned, visited):
+                assigned[location][position] = copy_index
+                return True
+    return False
+
+def match_key_items(pool, edges, capacity, rng=None):
+    """
+    Match every copy in the pool to a location slot of its own
+    
+    With an RNG the copies and their locations are tried in random order, so
+    each seed samples a different valid matching.
+    
+    Args:
+        pool (list): Progression item pool
+        edges (dict): Map of item names to their locations
+        capacity (dict): Map of locations to the number of items they hold
+        rng (SeededRNG): Random number generator, or None for a fixed order
+    
+    Returns:
+        tuple: (map of locations to matched pool indices, index of the copy that could
+                not be matched or None, locations its search visited)
+    """
+    assigned = {location: [] for location in capacity}
+    order = list(range(len(pool)))
+    edges = {item_name: list(locations) for item_name, locations in edges.items()}
+    if rng is not None:
+        shuffle_array(order, rng)
+        for locations in edges.values():
+            shuffle_array(locations, rng)
+    
+    for copy_index in order:
+        visited = set()
+        if not augment_matching(copy_index, pool, edges, capacity, assigned, visited):
+            return assigned, copy_index, visited
+    
+    return assigned, None, set()
+
+def check_placement_feasibility(options=None):
+    """
+    Check that the key items can be placed at all before any attempt is made
+    
+    Counts the location slots each item may use, then matches every item copy
+    to its own slot (a bipartite matching with shop capacities). When the
+    matching gets stuck, the items it could not separate and the few locations
+    they all compete for are exactly the constraint that cannot be met. This
+    ignores the order items are found in, which assumed fill takes care of.
+    
+    Args:
+        options (dict): Randomization options
+    
+    Returns:
+        list: Descriptions of the unsatisfiable constraints, empty if placement is possible
+    """
+    if options is None:
+        options = {}
+    
+    problems = [f"{item} has no valid location in KEY_PROGRESSION_POINTS" for item in UNPLACEABLE_ITEMS]
+    if problems:
+        return problems
+    
+    pool = get_progression_item_pool()
+    edges, capacity = get_key_item_graph(pool, options)
+    
+    # Capacity counting: every copy of an item needs a slot of its own
+    for item_name in sorted(set(pool)):
+        needed = pool.count(item_name)
+        available = sum(capacity[location] for location in edges[item_name])
+        if available < needed:
+            problems.append(
+                f"{item_name} needs {needed} location(s) but only {available} can hold it"
+                + (f": {describe_locations(edges[item_name], capacity)}" if edges[item_name] else "")
+            )
+    if problems:
+        return problems
+    
+    assigned, unmatched, visited = match_key_items(pool, edges, capacity)
+    if unmatched is not None:
+        # Everything the search touched is full, and these items have nowhere else to go
+        competing = [pool[unmatched]] + [pool[index] for location in visited for index in assigned[location]]
+        names = ', '.join(sorted(set(competing), key=competing.index))
+        problems.append(
+            f"{len(competing)} key items ({names}) compete for {sum(capacity[location] for location in visited)} "
+            f"location slot(s): {describe_locations(visited, capacity)}"
+        )
+    
+    return problems
+
+def build_fill_result(placements):
+    """
+    Build the key item placement returned by the fill functions
+    
+    Args:
+        placements (list): (item name, 'chest' or 'shop', chest ID or KNOWN_SHOPS entry, price)
+                           tuples in placement order
+    
+    Returns:
+        dict: Key item placement (chest_contents, shop_contents, shop_item_counts,
+              used_chests, placed_items, key_item_placements, starstone_locations)
+    """
+    chest_contents = {PORTRAIT_CHEST_ID: PORTRAIT_ITEM_ID}
+    shop_contents = {}
+    shop_item_counts = {}
+    used_chests = {PORTRAIT_CHEST_ID}
+    placed_items = {PORTRAIT_ITEM_ID}
+    key_item_placements = {}
+    starstone_locations = []
+    
+    for item_name, location_type, location, price in placements:
+        item_id = ITEM_NAME_TO_ID[item_name]
+        
+        if location_type == 'chest':
+            chest_contents[location] = item_id
+            used_chests.add(location)
+            
+            if item_name == 'Starstone':
+                starstone_locations.append({
+                    'type': 'chest',
+                    'location': get_chest_location_name(location),
+                    'chest_id': location
+                })
+        else:
+            shop_id = location['id']
+            shop_contents.setdefault(shop_id, []).append({
+                'itemId': item_id,
+                'name': item_name,
+                'type': ITEM_BY_ID.get(item_id, {}).get('type', ItemTypes.KEY_ITEM),
+                'price': price,
+                'bcdPrice': decimal_to_bcd(price),
+                'limit': 1  # Limit all unique items to 1 purchase
+            })
+            shop_item_counts[shop_id] = shop_item_counts.get(shop_id, 0) + 1
+            
+            if item_name == 'Starstone':
+                starstone_locations.append({
+                    'type': 'shop',
+                    'location': location['location'],
+                    'price': price,
+                    'shop_id': shop_id
+                })
+        
+        placed_items.add(item_id)
+        if item_name != 'Starstone':
+            key_item_placements[item_name] = location_type
+    
+    return {
+        'chest_contents': chest_contents,
+        'shop_contents': shop_contents,
+        'shop_item_counts': shop_item_counts,
+        'used_chests': used_chests,
+        'placed_items': placed_items,
+        'key_item_placements': key_item_placements,
+        'starstone_locations': starstone_locations
+    }
+
+def assumed_fill(options=None, rng=None, verbose=False, failure=None):
+    """
+    Place progression items with assumed fill
+    
+    Items are placed one at a time while assuming the player already holds
+    every item that is still waiting to be placed. An item only goes into one
+    of its PLACEABLE_LOCATIONS that is reachable under that assumption, so
+    once the last item is placed every item is reachable without assuming
+    anything. Items with the fewest allowed locations are placed first.
+    
+    A random matching of every copy to its own slot is sampled up front, and a
+    location is only taken if the copies still waiting keep a slot each, so
+    placing one item never uses up the slots the others need. This only
+    guarantees capacity: an item can still be left without candidates when
+    its free slots are not reachable under the assumption or the shop gem
+    budget rules them out, and the attempt then fails through record_failure.
+    
+    Args:
+        options (dict): Randomization options
+        rng (SeededRNG): Random number generator
+        verbose (bool): Whether to log detailed information
+        failure (dict): Filled with the stage, item and candidate count if the fill fails
+    
+    Returns:
+        dict: Key item placement (chest_contents, shop_contents, shop_item_counts,
+              used_chests, placed_items, key_item_placements, starstone_locations),
+              or None if an item had nowhere to go
+    """
+    if options is None:
+        options = {}
+    if rng is None:
+        rng = create_seeded_rng()
+    
+    logic_shops, _ = get_key_item_shops(options)
+    
+    # The Portrait chest always keeps its vanilla item
+    free_chests = set(chest_id for chest_id in CHEST_MAP if chest_id != PORTRAIT_CHEST_ID)
+    
+    pool = get_progression_item_pool()
+    edges, capacity = get_key_item_graph(pool, options)
+    
+    def get_candidates(item_name, reachable_chests, reachable_shops):
+        allowed_chests, allowed_shops = PLACEABLE_LOCATIONS[item_name]
+        chests = reachable_chests & free_chests & allowed_chests
+        shops = []
+        for logic_shop_id in reachable_shops & allowed_shops:
+            for shop in logic_shops.get(logic_shop_id, ()):
+                if capacity.get(('shop', shop['id']), 0) > 0:
+                    shops.append(shop)
+        # Sort so the RNG alone decides the pick, not set iteration order
+        return sorted(chests), sorted(shops, key=lambda shop: shop['id'])
+    
+    # Most constrained items first; shuffling beforehand breaks ties randomly
+    shuffle_array(pool, rng)
+    reachable_chests, reachable_shops = get_reachable_locations(pool, {}, {})
+    pool.sort(key=lambda item_name: sum(
+        len(candidates) for candidates in get_candidates(item_name, reachable_chests, reachable_shops)
+    ))
+    
+    assigned, unmatched, _ = match_key_items(pool, edges, capacity, rng)
+    if unmatched is not None:
+        if verbose:
+            logger.debug("No slot left for %s in any matching", pool[unmatched])
+        record_failure(failure, 'matching', pool[unmatched], 0)
+        return None
+    
+    def claim(index, location):
+        # Take the slot for this copy; any later copy matched there must find another
+        for previous_location, copies in assigned.items():
+            if index in copies:
+                copies.remove(index)
+                break
+        capacity[location] -= 1
+        if len(assigned[location]) <= capacity[location]:
+            return True
+        
+        displaced = assigned[location].pop()
+        if augment_matching(displaced, pool, edges, capacity, assigned, {location}):
+            return True
+        
+        assigned[location].append(displaced)
+        capacity[location] += 1
+        assigned[previous_location].append(index)
+        return False
+    
+    # Chest or shop preference for each copy; Giant Leaves always goes in a chest
+    preferences = []
+    starstone_index = 0
+    for item_name in pool:
+        if item_name in CHEST_ONLY_KEY_ITEMS:
+            preferences.append('chest')
+        elif item_name == 'Starstone':
+            # 3 in chests, 2 in shops is a good balance
+            preferences.append('chest' if starstone_index < 3 else 'shop')
+            starstone_index += 1
+        else:
+            preferences.append('shop' if rng.random() < SHOP_PLACEMENT_CHANCE else 'chest')
+    
+    placements = []
+    
+    # Placed item names, used by the reachability check
+    chest_items = {}
+    shop_items = {}
+    
+    # Gems spent on key items in shops. Keeping the total within the starting
+    # gems means every purchase is affordable whatever order it is made in.
+    spent_gems = 0
+    
+    for index, (item_name, preference) in enumerate(zip(pool, preferences)):
+        assumed_items = pool[index + 1:]
+        reachable_chests, reachable_shops = get_reachable_locations(assumed_items, chest_items, shop_items)
+        chests, shops = get_candidates(item_name, reachable_chests, reachable_shops)
+        
+        base_price = KEY_ITEM_BASE_PRICES.get(item_name, DEFAULT_KEY_ITEM_PRICE)
+        price = base_price + rng.randint(0, base_price // 2)
+        if spent_gems + price > STARTING_GEMS:
+            shops = []
+        
+        if item_name in CHEST_ONLY_KEY_ITEMS or not shops:
+            location_types = ['chest']
+        elif preference == 'shop' or not chests:
+            location_types = ['shop', 'chest']
+        else:
+            location_types = ['chest', 'shop']
+        
+        # Random slot of the preferred type that keeps the matching whole
+        location_type = None
+        for candidate_type in location_types:
+            candidates = list(chests) if candidate_type == 'chest' else list(shops)
+            shuffle_array(candidates, rng)
+            for candidate in candidates:
+                location_id = candidate if candidate_type == 'chest' else candidate['id']
+                if claim(index, (candidate_type, location_id)):
+                    location_type = candidate_type
+                    break
+            if location_type:
+                break
+        
+        if location_type is None:
+            if verbose:
+                logger.debug("No reachable location left for %s", item_name)
+            record_failure(failure, 'assumed_fill', item_name, len(chests) + len(shops))
+            return None
+        
+        if location_type == 'chest':
+            free_chests.discard(candidate)
+            chest_items[candidate] = item_name
+            
+            if verbose:
+                logger.debug("Placed %s in chest %s", item_name, candidate)
+        else:
+            spent_gems += price
+            shop_items.setdefault(ROM_SHOP_ID_TO_SHOP_ID[candidate['id']], []).append(item_name)
+            
+            if verbose:
+                logger.debug("Placed %s in shop %s (%s) for %s gems", item_name, candidate['id'], candidate['location'], price)
+        
+        placements.append((item_name, location_type, candidate, price))
+    
+    return build_fill_result(placements)
+
+def backtracking_fill(options=None, rng=None, verbose=False, failure=None):
+    """
+    Place progression items with forward fill, backtracking on dead ends
+    
+    Items go one at a time into locations that the items placed so far
+    already open, so the placement can be played in the order it was made.
+    Every decision is pushed on an undo log along with the items not tried
+    at that step yet. When no remaining item fits anywhere, the newest
+    decisions are undone and their next alternative tried, so a dead end
+    late in the fill only repeats the last few steps instead of the whole
+    fill. The attempt gives up after 'backtrack_budget' undos.
+    
+    Args:
+        options (dict): Randomization options
+        rng (SeededRNG): Random number generator
+        verbose (bool): Whether to log detailed information
+        failure (dict): Filled with the stage, item and candidate count if the fill fails
+    
+    Returns:
+        dict: Key item placement in the same form as assumed_fill, or None if
+              the backtrack budget ran out
+    """
+    if options is None:
+        options = {}
+    if rng is None:
+        rng = create_seeded_rng()
+    
+    backtrack_budget = options.get('backtrack_budget', DEFAULT_BACKTRACK_BUDGET)
+    
+    logic_shops, _ = get_key_item_shops(options)
+    shops_by_id = {shop['id']: shop for shops in logic_shops.values() for shop in shops}
+    pool = get_progression_item_pool()
+    edges, capacity = get_key_item_graph(pool, options)
+    shuffle_array(pool, rng)
+    
+    remaining = list(pool)
+    chest_items = {}
+    shop_items = {}
+    spent_gems = 0
+    
+    # Undo log: (item name, location type, location, price, items not tried yet)
+    decisions = []
+    undos = 0
+    
+    def place(item_name, untried):
+        # Pick a free slot for the item among the locations opened so far
+        nonlocal spent_gems
+        reachable_chests, reachable_shops = get_reachable_locations([], chest_items, shop_items)
+        chests = []
+        shops = []
+        for location in edges[item_name]:
+            if capacity[location] <= 0:
+                continue
+            if location[0] == 'chest' and location[1] in reachable_chests:
+                chests.append(location[1])
+            elif location[0] == 'shop' and ROM_SHOP_ID_TO_SHOP_ID[location[1]] in reachable_shops:
+                shops.append(location[1])
+        
+        base_price = KEY_ITEM_BASE_PRICES.get(item_name, DEFAULT_KEY_ITEM_PRICE)
+        price = base_price + rng.randint(0, base_price // 2)
+        if spent_gems + price > STARTING_GEMS:
+            shops = []
+        if not chests and not shops:
+            return False
+        
+        if shops and (not chests or rng.random() < SHOP_PLACEMENT_CHANCE):
+            shop_id = shops[rng.randint(0, len(shops) - 1)]
+            location = shops_by_id[shop_id]
+            capacity[('shop', shop_id)] -= 1
+            spent_gems += price
+            shop_items.setdefault(ROM_SHOP_ID_TO_SHOP_ID[shop_id], []).append(item_name)
+            decisions.append((item_name, 'shop', location, price, untried))
+        else:
+            chest_id = chests[rng.randint(0, len(chests) - 1)]
+            capacity[('chest', chest_id)] -= 1
+            chest_items[chest_id] = item_name
+            decisions.append((item_name, 'chest', chest_id, price, untried))
+        
+        remaining.remove(item_name)
+        return True
+    
+    def undo():
+        # Take back the newest decision and return the items it had not tried
+        nonlocal spent_gems
+        item_name, location_type, location, price, untried = decisions.pop()
+        if location_type == 'chest':
+            capacity[('chest', location)] += 1
+            del chest_items[location]
+        else:
+            capacity[('shop', location['id'])] += 1
+            spent_gems -= price
+            shop_items[ROM_SHOP_ID_TO_SHOP_ID[location['id']]].remove(item_name)
+        remaining.append(item_name)
+        return untried
+    
+    def try_items(choices):
+        # Place the first item of choices that fits, remembering the rest
+        while choices:
+            item_name = choices.pop(0)
+            if place(item_name, choices):
+                return True
+        return False
+    
+    # Distinct items in random order; copies of an item are interchangeable
+    next_choices = list(dict.fromkeys(remaining))
+    while remaining:
+        if try_items(next_choices):
+            next_choices = list(dict.fromkeys(remaining))
+            shuffle_array(next_choices, rng)
+            continue
+        
+        # Dead end: go back to the newest decision that still has alternatives
+        if not decisions or undos >= backtrack_budget:
+            if verbose:
+                logger.debug("Backtracking gave up after %s undos with %s items left", undos, len(remaining))
+            record_failure(failure, 'backtrack_budget', remaining[0], 0)
+            return None
+        undos += 1
+        next_choices = undo()
+    
+    if verbose:
+        logger.debug("Forward fill finished after %s undos", undos)
+    
+    return build_fill_result([decision[:4] for decision in decisions])
@@ -3,15 +3,23 @@ Game logic functions for Terranigma Randomizer
 Functions for determining accessible areas, item placement, etc.
 """
 
+import logging
 import random
-from terranigma_randomizer.constants.items import ITEM_NAME_TO_ID, PROGRESSION_KEY_ITEMS, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID
+from functools import lru_cache
+from terranigma_randomizer.constants.items import (
+    ITEM_BY_ID, ITEM_NAME_TO_ID, PROGRESSION_KEY_ITEMS, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID, get_item_name, get_item_info
+)
 from terranigma_randomizer.constants.progression import (
     get_accessible_areas, get_accessible_chests, get_accessible_shops,
-    KEY_ITEM_GATES, SHOP_ID_TO_NAME, SHOP_NAME_TO_ID, PROGRESSION_AREAS
+    get_accessible_locations_for_mask, get_item_mask,
+    KEY_ITEM_GATES, SHOP_ID_TO_NAME, SHOP_NAME_TO_ID, SHOP_ID_TO_REGION, PROGRESSION_AREAS,
+    ROM_SHOP_ID_TO_SHOP_ID, AREA_BITS_IN_ORDER, AREA_CHESTS, SHOP_REGION_BITS, ITEM_BITS
 )
 from terranigma_randomizer.constants.chests import CHEST_MAP, KNOWN_CHESTS
 from terranigma_randomizer.constants.shops import KNOWN_SHOPS, SHOP_ID_TO_INDEX, decimal_to_bcd
 
+logger = logging.getLogger(__name__)
+
 # Define key progression points
 KEY_PROGRESSION_POINTS = {
     'Giant Leaves': {
@@ -137,33 +145,229 @@ KEY_PROGRESSION_POINTS = {
     }
 }
 
-def shuffle_array(array):
+def build_requirement_closures():
+    """
+    Compute the transitive requirement closure of every area, chest and shop
+    
+    An area directly requires the items in its 'required' list, but each of
+    those items can only be placed in its KEY_PROGRESSION_POINTS locations,
+    which have requirements of their own. Following that chain to the end
+    gives every item that has to be collected before the area can be
+    entered. Locations that could only be reached with the item they hold
+    are dropped from that item's placeable locations and reported.
+    
+    Returns:
+        tuple: (item prerequisite masks, area closure masks, placeable locations,
+                unplaceable items, list of conflict descriptions)
+    """
+    area_required = {
+        area_name: sum(ITEM_BITS[item] for item in set(area['required']))
+        for area_name, area in PROGRESSION_AREAS.items()
+    }
+    
+    # Every location an item can go to, with the area it is in
+    all_locations = [('area', area_name, area_name) for area_name, chests in AREA_CHESTS.items() if chests]
+    all_locations += [
+        ('shop', shop_id, region) for shop_id, region in SHOP_ID_TO_REGION.items() if region in area_required
+    ]
+    
+    items = list(PROGRESSION_KEY_ITEMS)
+    
+    # Bits that mark an item as held - all five Starstones count as one
+    item_bits = {item: ITEM_BITS.get(item, 0) for item in items}
+    item_bits['Starstone'] = ITEM_BITS['Starstone'] | ITEM_BITS['Starstones5']
+    
+    conflicts = []
+    allowed = {}
+    for item in items:
+        progression_point = KEY_PROGRESSION_POINTS.get(item)
+        if not progression_point:
+            allowed[item] = all_locations
+            continue
+        
+        allowed[item] = []
+        for location in progression_point['can_place_in']:
+            if location in SHOP_ID_TO_REGION and SHOP_ID_TO_REGION[location] in area_required:
+                allowed[item].append(('shop', location, SHOP_ID_TO_REGION[location]))
+            elif AREA_CHESTS.get(location):
+                allowed[item].append(('area', location, location))
+            else:
+                conflicts.append(f"{item}: can_place_in names {location}, which holds no chests or shop")
+        
+        for area_name in progression_point['required_before']:
+            if area_name not in area_required:
+                conflicts.append(f"{item}: required_before names unknown area {area_name}")
+            elif not area_required[area_name] & item_bits[item]:
+                conflicts.append(f"{item}: required_before names {area_name}, which does not require it")
+    
+    prerequisites = {item: 0 for item in items}
+    
+    def get_closure(required_mask):
+        closure = required_mask
+        for item, bit in item_bits.items():
+            if required_mask & bit:
+                closure |= prerequisites[item]
+        return closure
+    
+    # Prerequisites only ever grow, so iterate until they settle
+    changed = True
+    while changed:
+        changed = False
+        for item in items:
+            usable_masks = [
+                get_closure(area_required[region]) for _, _, region in allowed[item]
+            ]
+            usable_masks = [mask for mask in usable_masks if not mask & item_bits[item]]
+            if not usable_masks:
+                continue
+            
+            prerequisite_mask = usable_masks[0]
+            for mask in usable_masks[1:]:
+                prerequisite_mask &= mask
+            if prerequisite_mask != prerequisites[item]:
+                prerequisites[item] = prerequisite_mask
+                changed = True
+    
+    area_closures = {area_name: get_closure(mask) for area_name, mask in area_required.items()}
+    
+    placeable = {}
+    unplaceable = []
+    for item in items:
+        chests = set()
+        shops = set()
+        for location_type, location, region in allowed[item]:
+            if area_closures[region] & item_bits[item]:
+                if allowed[item] is not all_locations:
+                    conflicts.append(f"{item}: can_place_in names {location}, which cannot be reached without it")
+                continue
+            if location_type == 'shop':
+                shops.add(location)
+            else:
+                chests.update(AREA_CHESTS[location])
+        chests.discard(PORTRAIT_CHEST_ID)
+        
+        if not chests and not shops:
+            conflicts.append(f"{item}: no location in can_place_in can be reached without it")
+            unplaceable.append(item)
+        placeable[item] = (frozenset(chests), frozenset(shops))
+    
+    prerequisites['Starstones5'] = prerequisites.get('Starstone', 0)
+    return prerequisites, area_closures, placeable, unplaceable, conflicts
+
+# Transitive requirement closures, see build_requirement_closures
+(
+    ITEM_PREREQUISITE_MASKS, AREA_CLOSURE_MASKS, PLACEABLE_LOCATIONS,
+    UNPLACEABLE_ITEMS, PROGRESSION_POINT_CONFLICTS
+) = build_requirement_closures()
+
+# Closure masks per chest ID - one per area the chest is listed in
+CHEST_CLOSURE_MASKS = {}
+for _area_name, _chests in AREA_CHESTS.items():
+    for _chest_id in _chests:
+        _masks = CHEST_CLOSURE_MASKS.setdefault(_chest_id, ())
+        if AREA_CLOSURE_MASKS[_area_name] not in _masks:
+            CHEST_CLOSURE_MASKS[_chest_id] = _masks + (AREA_CLOSURE_MASKS[_area_name],)
+
+# Closure mask per logic shop ID
+SHOP_CLOSURE_MASKS = {
+    shop_id: AREA_CLOSURE_MASKS[region]
+    for shop_id, region in SHOP_ID_TO_REGION.items() if region in AREA_CLOSURE_MASKS
+}
+
+def is_location_reachable(closure_masks, item_mask):
+    """
+    Check a chest or shop against the items held, as a single subset test
+    
+    Args:
+        closure_masks (int or tuple): Entry from SHOP_CLOSURE_MASKS or CHEST_CLOSURE_MASKS
+        item_mask (int): Bitmask of held items, built with get_item_mask
+    
+    Returns:
+        bool: True if every item in the closure (of any one alternative) is held
+    """
+    if isinstance(closure_masks, int):
+        return not closure_masks & ~item_mask
+    return any(not mask & ~item_mask for mask in closure_masks)
+
+@lru_cache(maxsize=4096)
+def get_reachable_locations_for_mask(item_mask):
+    """
+    Get every chest and logic shop whose requirement closure is held
+    
+    Args:
+        item_mask (int): Bitmask of held items, built with get_item_mask
+        
+    Returns:
+        tuple: (frozenset of chest IDs, frozenset of logic shop IDs)
+    """
+    chests = frozenset(
+        chest_id for chest_id, closure_masks in CHEST_CLOSURE_MASKS.items()
+        if is_location_reachable(closure_masks, item_mask)
+    )
+    shops = frozenset(
+        shop_id for shop_id, closure_mask in SHOP_CLOSURE_MASKS.items()
+        if is_location_reachable(closure_mask, item_mask)
+    )
+    return chests, shops
+
+class SeededRNG(random.Random):
+    """
+    Random number generator owned by a single generation
+    
+    Calling the instance returns a float in [0, 1), so it can be passed
+    wherever an rng() callable is expected, while the usual random.Random
+    methods (randint, choice, ...) are available for everything else.
+    """
+    
+    def __call__(self):
+        return self.random()
+
+def shuffle_array(array, rng):
     """
     Shuffle an array in-place using the Fisher-Yates algorithm
     
     Args:
         array (list): Array to shuffle
-        
+        rng (SeededRNG): Random number generator
+    
     Returns:
         list: The same array, shuffled
     """
     for i in range(len(array) - 1, 0, -1):
-        j = random.randint(0, i)
+        j = rng.randint(0, i)
         array[i], array[j] = array[j], array[i]
     return array
 
-def create_seeded_rng(seed):
+def create_seeded_rng(seed=None):
     """
     Create a seeded random number generator
     
+    The generator has its own state, so generations running side by side in
+    threads or processes do not affect each other.
+    
     Args:
-        seed (int): Random seed
-        
+        seed (int): Random seed, or None to seed from system entropy
+    
     Returns:
-        function: Random number generator
+        SeededRNG: Random number generator
     """
-    random.seed(seed)
-    return lambda: random.random()
+    return SeededRNG(seed)
+
+def derive_attempt_seed(seed, attempt_index):
+    """
+    Derive the sub-seed for one placement attempt
+    
+    The result only depends on the seed and the attempt index, so attempt N
+    produces the same placement whichever process runs it.
+    
+    Args:
+        seed (int): Base randomizer seed
+        attempt_index (int): Zero-based attempt number
+    
+    Returns:
+        int: 32-bit sub-seed for the attempt
+    """
+    return random.Random(f"{seed}:{attempt_index}").getrandbits(32)
 
 def get_chests_for_regions(regions):
     """
@@ -171,7 +375,7 @@ def get_chests_for_regions(regions):
     
     Args:
         regions (list): List of region names
-        
+    
     Returns:
         list: List of chest IDs
     """
@@ -192,7 +396,7 @@ def get_shops_for_regions(regions):
     
     Args:
         regions (list): List of shop region identifiers
-        
+    
     Returns:
         list: List of shop IDs
     """
@@ -203,147 +407,500 @@ def get_shops_for_regions(regions):
     
     return shop_ids
 
-def validate_game_progress(chest_contents, shop_contents, verbose=False):
+# Pool region holding every chest in CHEST_MAP, for fallbacks outside the progression areas
+ALL_CHESTS_REGION = 'ALL_CHESTS'
+
+class LocationPool:
     """
-    Check if a randomized game is beatable by simulating progression
+    Free placement locations grouped by region
+    
+    Each region keeps its free locations in a list plus a position map, so a
+    random pick is a single index and taking a location swaps it with the last
+    entry of each region holding it and pops it (swap-remove). Picking across
+    several regions weights every listing equally, just like picking from the
+    concatenated region lists.
     
     Args:
-        chest_contents (dict): Map of chest IDs to item IDs
-        shop_contents (dict): Map of shop IDs to item arrays
-        verbose (bool): Whether to log detailed information
+        regions (dict): Map of region names to location lists
+        excluded (iterable): Locations that are already used
+    """
+    
+    def __init__(self, regions, excluded=()):
+        excluded = set(excluded)
+        self.locations = {}
+        self.positions = {}
+        self.regions_of = {}
+        for region, locations in regions.items():
+            region_locations = self.locations.setdefault(region, [])
+            region_positions = self.positions.setdefault(region, {})
+            for location in locations:
+                if location in excluded or location in region_positions:
+                    continue
+                region_positions[location] = len(region_locations)
+                region_locations.append(location)
+                self.regions_of.setdefault(location, []).append(region)
+    
+    def __contains__(self, location):
+        return location in self.regions_of
+    
+    def count(self, regions):
+        """
+        Count the free location listings in the given regions
+        
+        Args:
+            regions (list): Region names
+        
+        Returns:
+            int: Number of listings (a location in two of the regions counts twice)
+        """
+        return sum(len(self.locations.get(region, ())) for region in regions)
+    
+    def pick(self, regions, rng):
+        """
+        Pick a random free location from the given regions without taking it
+        
+        Args:
+            regions (list): Region names
+            rng (SeededRNG): Random number generator
+        
+        Returns:
+            Location, or None if the regions have no free locations
+        """
+        total = self.count(regions)
+        if not total:
+            return None
+        
+        index = rng.randint(0, total - 1)
+        for region in regions:
+            region_locations = self.locations.get(region, ())
+            if index < len(region_locations):
+                return region_locations[index]
+            index -= len(region_locations)
+    
+    def remove(self, location):
+        """
+        Mark a location as used in every region that lists it
+        
+        Args:
+            location: Location to remove
+        """
+        for region in self.regions_of.pop(location, ()):
+            region_locations = self.locations[region]
+            region_positions = self.positions[region]
+            index = region_positions.pop(location)
+            last = region_locations.pop()
+            if last != location:
+                region_locations[index] = last
+                region_positions[last] = index
+    
+    def take(self, regions, rng):
+        """
+        Pick a random free location from the given regions and mark it as used
         
+        Args:
+            regions (list): Region names
+            rng (SeededRNG): Random number generator
+        
+        Returns:
+            Location, or None if the regions have no free locations
+        """
+        location = self.pick(regions, rng)
+        if location is not None:
+            self.remove(location)
+        return location
+
+def create_chest_pool(used_chests=()):
+    """
+    Create a pool of the free chests in each progression area
+    
+    Every chest in CHEST_MAP is also listed under ALL_CHESTS_REGION. The
+    Portrait chest is never free.
+    
+    Args:
+        used_chests (iterable): Chests that already hold an item
+    
     Returns:
-        bool: True if game is beatable, false otherwise
+        LocationPool: Free chests by area
     """
-    # Start with no items
-    collected_items = set()
-    collected_gems = 1000  # Starting gems
-    starstone_count = 0  # Track number of Starstones collected
-    progress = True
+    regions = {area_name: area_data['contains'] for area_name, area_data in PROGRESSION_AREAS.items()}
+    regions[ALL_CHESTS_REGION] = list(CHEST_MAP.keys())
+    return LocationPool(regions, set(used_chests) | {PORTRAIT_CHEST_ID})
+
+# Gems the player is assumed to have before anything is collected
+STARTING_GEMS = 1000
+
+# Items that must be collectable for a placement to count as beatable
+ESSENTIAL_ITEMS = [
+    'Giant Leaves', 
+    'Ra Dewdrop', 
+    'RocSpear', 
+    'Sharp Claws',
+    'Crystal Thread',
+    'Red Scarf',
+    'Protect Bell',
+    'Dog Whistle',
+    'Magic Anchor',
+    'Starstones5'  # Add this to verify we have enough Starstones
+]
+
+class ProgressionSweep:
+    """
+    Incremental simulation of a player collecting items from a placement
     
-    # Keep track of collected items for iteration
-    item_count = 0
+    Each step opens the areas unlocked by everything collected in earlier steps
+    and only visits the chests and shops in those newly opened areas. Every
+    location is looted once, and shop items that could not be afforded yet are
+    kept aside and retried whenever more gems turn up. The step in which an
+    item was collected is its sphere.
     
-    # Simulate collecting items until we can't make progress
-    while progress:
-        if verbose:
-            print(f"Iteration with {len(collected_items)} items collected")
+    Args:
+        chest_contents (dict): Map of chest IDs to item IDs
+        shop_contents (dict): Map of shop IDs (logic IDs like 'SHOP_LUMINA_1' or
+                              numeric KNOWN_SHOPS IDs) to item arrays
+        starting_gems (int): Gems available before anything is collected
+    """
+    
+    def __init__(self, chest_contents, shop_contents, starting_gems=STARTING_GEMS):
+        self.chest_contents = chest_contents
+        self.shop_contents = {}
+        for shop_id, items in shop_contents.items():
+            logic_shop_id = get_logic_shop_id(shop_id)
+            if logic_shop_id:
+                self.shop_contents.setdefault(logic_shop_id, []).extend(items)
         
-        # Store item count to check for progress
-        item_count = len(collected_items)
+        self.collected_items = set()
+        self.item_mask = 0
+        self.area_mask = 0
+        self.gems = starting_gems
+        self.starstone_count = 0
+        self.sphere = -1
         
-        # Get accessible areas and chests with current items
-        accessible_areas = get_accessible_areas(collected_items)
-        accessible_chests = get_accessible_chests(collected_items)
-        accessible_shops = get_accessible_shops(collected_items)
+        # Item name -> sphere it was first collected in
+        self.item_spheres = {}
+        # One list per sphere of the key items and Starstones found in it
+        self.spheres = []
+        # One list per sphere of the ('chest', ID) and ('shop', ID) locations opened in it
+        self.sphere_locations = []
         
-        if verbose:
-            print(f"Accessible areas: {', '.join(accessible_areas)}")
-            print(f"Accessible chests: {len(accessible_chests)}")
-            print(f"Accessible shops: {len(accessible_shops)}")
-        
-        # Collect items from accessible chests
-        for chest_id in accessible_chests:
-            if chest_id in chest_contents:
-                item_id = chest_contents[chest_id]
-                from terranigma_randomizer.constants.items import get_item_name
-                item_name = get_item_name(item_id)
-                
-                # Special handling for Starstones
-                if item_name == 'Starstone':
-                    starstone_count += 1
-                    if verbose:
-                        print(f"Collected Starstone #{starstone_count} from chest {chest_id}")
-                    
-                    # Add a "virtual" item to track having enough Starstones
-                    if starstone_count >= 5 and 'Starstones5' not in collected_items:
-                        collected_items.add('Starstones5')
-                        if verbose:
-                            print(f"Collected enough Starstones (5) to access Astarica")
-                
-                # Add to collected items if it's a key item
-                elif item_name in PROGRESSION_KEY_ITEMS and item_name not in collected_items:
-                    collected_items.add(item_name)
-                    if verbose:
-                        print(f"Collected {item_name} from chest {chest_id}")
+        self._looted_chests = set()
+        self._pending_purchases = []
+    
+    def _collect(self, item_name, item_id, location_type, location_id, area, found, price=None):
+        """Record a collected key item or Starstone for the current sphere"""
+        if item_name == 'Starstone':
+            self.starstone_count += 1
+            if self.starstone_count >= 5 and 'Starstones5' not in self.collected_items:
+                self.collected_items.add('Starstones5')
+                self.item_spheres['Starstones5'] = self.sphere
+        else:
+            self.collected_items.add(item_name)
+            self.item_spheres[item_name] = self.sphere
+        
+        entry = {
+            'item': item_name,
+            'itemId': item_id,
+            'type': location_type,
+            'location': location_id,
+            'area': area
+        }
+        if price is not None:
+            entry['price'] = price
+        found.append(entry)
+    
+    def _buy_pending(self, found):
+        """Buy every pending shop item that is still wanted and affordable"""
+        still_pending = []
+        for shop_id, area, item in self._pending_purchases:
+            item_name = get_item_name(item['itemId'])
+            if item_name != 'Starstone' and item_name in self.collected_items:
+                continue
+            if self.gems >= item['price']:
+                self.gems -= item['price']
+                self._collect(item_name, item['itemId'], 'shop', shop_id, area, found, item['price'])
+            else:
+                still_pending.append((shop_id, area, item))
+        self._pending_purchases = still_pending
+    
+    def step(self):
+        """
+        Advance the sweep by one sphere
+        
+        Returns:
+            bool: True if new items were collected in this sphere
+        """
+        self.sphere += 1
+        item_count = len(self.collected_items)
+        
+        area_mask = get_accessible_locations_for_mask(self.item_mask)[0]
+        new_area_mask = area_mask & ~self.area_mask
+        self.area_mask = area_mask
+        
+        found = []
+        opened = []
+        
+        # Loot chests in the newly opened areas
+        for area_bit, area_name in AREA_BITS_IN_ORDER:
+            if not new_area_mask & area_bit:
+                continue
+            for chest_id in AREA_CHESTS[area_name]:
+                if chest_id in self._looted_chests or chest_id not in self.chest_contents:
+                    continue
+                self._looted_chests.add(chest_id)
+                opened.append(('chest', chest_id))
                 
-                # Check for gems
-                from terranigma_randomizer.constants.items import get_item_info
+                item_id = self.chest_contents[chest_id]
                 item_info = get_item_info(item_id)
                 if item_info.get('type') == 'gems':
-                    gem_value = item_info.get('value', 0)
-                    collected_gems += gem_value
-                    if verbose:
-                        print(f"Collected {gem_value} gems from chest {chest_id}")
-        
-        # Collect items from accessible shops
-        for shop_id in accessible_shops:
-            if shop_id in shop_contents:
-                shop_items = shop_contents[shop_id]
+                    self.gems += item_info.get('value', 0)
+                    continue
                 
-                # Shop items are represented as dicts with itemId and price
-                for item in shop_items:
-                    from terranigma_randomizer.constants.items import get_item_name
-                    item_name = get_item_name(item['itemId'])
-                    
-                    # Special handling for Starstones
-                    if item_name == 'Starstone':
-                        # Check if we can afford it
-                        if collected_gems >= item['price']:
-                            starstone_count += 1
-                            collected_gems -= item['price']
-                            if verbose:
-                                shop_name = SHOP_ID_TO_NAME.get(shop_id, shop_id)
-                                print(f"Purchased Starstone #{starstone_count} from shop {shop_name} for {item['price']} gems")
-                            
-                            # Add a "virtual" item to track having enough Starstones
-                            if starstone_count >= 5 and 'Starstones5' not in collected_items:
-                                collected_items.add('Starstones5')
-                                if verbose:
-                                    print(f"Collected enough Starstones (5) to access Astarica")
-                    
-                    # Only consider key items
-                    elif item_name in PROGRESSION_KEY_ITEMS and item_name not in collected_items:
-                        # Check if we can afford it
-                        if collected_gems >= item['price']:
-                            collected_items.add(item_name)
-                            collected_gems -= item['price']
-                            if verbose:
-                                shop_name = SHOP_ID_TO_NAME.get(shop_id, shop_id)
-                                print(f"Purchased {item_name} from shop {shop_name} for {item['price']} gems")
-                        else:
-                            if verbose:
-                                print(f"Can't afford {item_name} ({item['price']} gems) with {collected_gems} gems")
-        
-        # Check if we've made progress
-        progress = len(collected_items) > item_count
-    
-    # Check if we've collected all required items for major progression
-    essential_items = [
-        'Giant Leaves', 
-        'Ra Dewdrop', 
-        'RocSpear', 
-        'Sharp Claws',
-        'Crystal Thread',
-        'Red Scarf',
-        'Protect Bell',
-        'Dog Whistle',
-        'Magic Anchor',
-        'Starstones5'  # Add this to verify we have enough Starstones
-    ]
-    has_essential_items = all(item in collected_items for item in essential_items)
+                item_name = get_item_name(item_id)
+                if item_name == 'Starstone' or (item_name in PROGRESSION_KEY_ITEMS and item_name not in self.collected_items):
+                    self._collect(item_name, item_id, 'chest', chest_id, area_name, found)
+        
+        # Stock from the newly opened shops joins the purchase queue
+        for shop_id, region_bit in SHOP_REGION_BITS:
+            if not new_area_mask & region_bit:
+                continue
+            opened.append(('shop', shop_id))
+            for item in self.shop_contents.get(shop_id, []):
+                item_name = get_item_name(item['itemId'])
+                if item_name == 'Starstone' or item_name in PROGRESSION_KEY_ITEMS:
+                    self._pending_purchases.append((shop_id, SHOP_ID_TO_REGION[shop_id], item))
+        
+        self._buy_pending(found)
+        
+        self.spheres.append(found)
+        self.sphere_locations.append(opened)
+        self.item_mask = get_item_mask(self.collected_items)
+        
+        return len(self.collected_items) > item_count
+    
+    def run(self):
+        """
+        Step until no more progress can be made
+        
+        Returns:
+            ProgressionSweep: This sweep, for chaining
+        """
+        while self.step():
+            pass
+        return self
+    
+    def has_items(self, items):
+        """Check whether every item in items was collected"""
+        return all(item in self.collected_items for item in items)
+
+def get_max_shop_items(shop_id, options):
+    """
+    Get the maximum number of items a shop can hold
+    
+    Args:
+        shop_id: Shop ID (can be string or int)
+        options (dict): Randomization options
+    
+    Returns:
+        int: Maximum number of items for the shop
+    """
+    # Convert shop_id to int if it's a string
+    if isinstance(shop_id, str) and shop_id.isdigit():
+        shop_id = int(shop_id)
+    elif isinstance(shop_id, str):
+        # If it's a non-numeric string, try to extract number
+        try:
+            shop_id = int(''.join(filter(str.isdigit, shop_id)))
+        except:
+            return 5  # Default
+    
+    shop_index = SHOP_ID_TO_INDEX.get(shop_id)
+    if shop_index is not None:
+        original_shop = KNOWN_SHOPS[shop_index]
+        original_count = len(original_shop['items'])
+        
+        # If user wants more items, allow more than original
+        items_per_shop = options.get('items_per_shop', 'normal')
+        if items_per_shop == 'more':
+            return min(15, original_count + 4)  # Add up to 4 more items, max 15
+        elif items_per_shop == 'fewer':
+            return max(2, original_count - 2)  # Remove up to 2 items, min 2
+        else:
+            return original_count
+    
+    # Default based on option
+    items_per_shop = options.get('items_per_shop', 'normal')
+    if items_per_shop == 'more':
+        return 8
+    elif items_per_shop == 'fewer':
+        return 3
+    else:
+        return 5
+
+def get_logic_shop_id(shop_id):
+    """
+    Get the logic shop ID ('SHOP_...') for a shop_contents key
+    
+    Args:
+        shop_id (int or str): Logic shop ID or numeric KNOWN_SHOPS ID
+    
+    Returns:
+        str: Logic shop ID, or None if the shop is not part of the logic
+    """
+    if isinstance(shop_id, str):
+        if shop_id.startswith('SHOP_'):
+            return shop_id
+        if not shop_id.isdigit():
+            return None
+        shop_id = int(shop_id)
+    return ROM_SHOP_ID_TO_SHOP_ID.get(shop_id)
+
+def sweep_game_progress(chest_contents, shop_contents):
+    """
+    Run a full progression sweep over a placement
+    
+    Args:
+        chest_contents (dict): Map of chest IDs to item IDs
+        shop_contents (dict): Map of shop IDs to item arrays
+    
+    Returns:
+        ProgressionSweep: Finished sweep, with item_spheres and spheres filled in
+    """
+    return ProgressionSweep(chest_contents, shop_contents).run()
+
+def record_failure(failure, stage, item=None, candidates=None):
+    """
+    Fill in the failure record of a placement attempt
+    
+    Placement engines call this right before giving up, so the record always
+    describes the step that ended the attempt.
+    
+    Args:
+        failure (dict): Record to fill, or None if nobody collects failures
+        stage (str): Placement stage that failed
+        item (str): Item that could not be placed
+        candidates (int): Candidate slots that were left for the item
+    """
+    if failure is not None:
+        failure.update(stage=stage, item=item, candidates=candidates)
+
+def get_missing_essential_items(chest_contents, shop_contents):
+    """
+    Get the essential items a sweep over a placement cannot collect
+    
+    Args:
+        chest_contents (dict): Map of chest IDs to item IDs
+        shop_contents (dict): Map of shop IDs to item arrays
+    
+    Returns:
+        list: Missing items from ESSENTIAL_ITEMS
+    """
+    sweep = sweep_game_progress(chest_contents, shop_contents)
+    return [item for item in ESSENTIAL_ITEMS if item not in sweep.collected_items]
+
+def get_required_playthrough(sweep, goal_items=ESSENTIAL_ITEMS):
+    """
+    Trace which collected items a finished sweep actually needed for the goal
+    
+    Starting from the goal items, each item's entry pulls in the items its
+    area requires, and so on, using the areas the sweep found them in.
+    
+    Args:
+        sweep (ProgressionSweep): Finished sweep
+        goal_items (list): Items that make the game beatable
+    
+    Returns:
+        list: One list per sphere of the sweep entries that are required
+    """
+    entries_by_item = {}
+    for found in sweep.spheres:
+        for entry in found:
+            entries_by_item.setdefault(entry['item'], []).append(entry)
+    
+    required = set()
+    needed = list(goal_items)
+    traced_items = set()
+    while needed:
+        item = needed.pop()
+        if item in traced_items:
+            continue
+        traced_items.add(item)
+        
+        # All five Starstones are needed wherever one is required
+        if item in ('Starstone', 'Starstones5'):
+            entries = entries_by_item.get('Starstone', [])[:5]
+        else:
+            entries = entries_by_item.get(item, [])[:1]
+        
+        for entry in entries:
+            required.add(id(entry))
+            needed.extend(PROGRESSION_AREAS.get(entry['area'], {}).get('required', []))
+    
+    return [[entry for entry in found if id(entry) in required] for found in sweep.spheres]
+
+def compute_playthrough(sweep):
+    """
+    Compute the sphere playthrough of a placement from its sweep
+    
+    Args:
+        sweep (ProgressionSweep): Finished sweep of the placement, such as the
+                                  one validate_game_progress returns
+    
+    Returns:
+        dict: 'spheres' (key items found per sphere), 'sphere_locations' (locations
+              opened per sphere), 'required' (the entries of spheres needed to beat
+              the game) and 'beatable'
+    """
+    # The last sphere found nothing new, so it only ends the sweep
+    spheres = sweep.spheres
+    sphere_locations = sweep.sphere_locations
+    if spheres and not spheres[-1]:
+        spheres = spheres[:-1]
+        sphere_locations = sphere_locations[:len(spheres)]
+    
+    return {
+        'spheres': spheres,
+        'sphere_locations': sphere_locations,
+        'required': get_required_playthrough(sweep)[:len(spheres)],
+        'beatable': sweep.has_items(ESSENTIAL_ITEMS)
+    }
+
+def validate_game_progress(chest_contents, shop_contents, verbose=False):
+    """
+    Check if a randomized game is beatable by simulating progression
+    
+    The finished sweep is returned so the playthrough can be built from it
+    without sweeping the same placement again.
+    
+    Args:
+        chest_contents (dict): Map of chest IDs to item IDs
+        shop_contents (dict): Map of shop IDs to item arrays
+        verbose (bool): Whether to log detailed information
+    
+    Returns:
+        ProgressionSweep: The finished sweep if the game is beatable, None otherwise
+    """
+    sweep = sweep_game_progress(chest_contents, shop_contents)
+    has_essential_items = sweep.has_items(ESSENTIAL_ITEMS)
     
     if verbose:
-        print('\nValidation results:')
-        print(f"Total items collected: {len(collected_items)}")
-        print(f"Essential items collected: {'Yes' if has_essential_items else 'No'}")
-        print(f"Starstones collected: {starstone_count}/5")
-        print('Collected items:', ', '.join(collected_items))
-        missing_items = [item for item in essential_items if item not in collected_items]
+        for sphere, found in enumerate(sweep.spheres):
+            logger.debug("Sphere %s: collected %s items", sphere, len(found))
+            for entry in found:
+                if entry['type'] == 'shop':
+                    shop_name = SHOP_ID_TO_NAME.get(entry['location'], entry['location'])
+                    logger.debug("  Purchased %s from shop %s for %s gems", entry['item'], shop_name, entry['price'])
+                else:
+                    logger.debug("  Collected %s from chest %s", entry['item'], entry['location'])
+        
+        logger.debug("\nValidation results:")
+        logger.debug("Total items collected: %s", len(sweep.collected_items))
+        logger.debug("Essential items collected: %s", 'Yes' if has_essential_items else 'No')
+        logger.debug("Starstones collected: %s/5", sweep.starstone_count)
+        logger.debug("Collected items: %s", ', '.join(sweep.collected_items))
+        missing_items = [item for item in ESSENTIAL_ITEMS if item not in sweep.collected_items]
         if missing_items:
-            print('Missing essential items:', ', '.join(missing_items))
+            logger.debug("Missing essential items: %s", ', '.join(missing_items))
     
-    return has_essential_items
+    return sweep if has_essential_items else None
 
 def get_chest_location_name(chest_id):
     """
@@ -351,7 +908,7 @@ def get_chest_location_name(chest_id):
     
     Args:
         chest_id (int or str): Chest ID
-        
+    
     Returns:
         str: Location name
     """
@@ -365,7 +922,7 @@ def get_chest_location_name(chest_id):
         return f"{chest.get('mapName', 'Unknown')} ({chest.get('posX', '?')},{chest.get('posY', '?')})"
     
     # Debug info
-    print(f"DEBUG: Chest ID {chest_id} (type: {type(chest_id)}) not found in CHEST_MAP")
+    logger.debug("DEBUG: Chest ID %s (type: %s) not found in CHEST_MAP", chest_id, type(chest_id))
     
     # Check for similar IDs (in case of type issues)
     if isinstance(chest_id, int) and str(chest_id) in CHEST_MAP:
@@ -377,7 +934,7 @@ def get_chest_location_name(chest_id):
     
     return f"Unknown (Chest ID: {chest_id})"
 
-def place_key_item_in_valid_region(key_item, collected_items, chest_contents, shop_contents, used_chests, used_shop_slots, verbose=False):
+def place_key_item_in_valid_region(key_item, collected_items, chest_contents, shop_contents, used_chests, used_shop_slots, verbose=False, rng=None, chest_pool=None):
     """
     Place a key item in a valid accessible region (chest or shop)
     
@@ -389,14 +946,21 @@ def place_key_item_in_valid_region(key_item, collected_items, chest_contents, sh
         used_chests (set): Chests that have already been used
         used_shop_slots (dict): Shop slots that have already been used
         verbose (bool): Whether to print verbose output
-        
+        rng (SeededRNG): Random number generator
+        chest_pool (LocationPool): Free chests by area, built from used_chests if not given
+    
     Returns:
         tuple: (success, location_type, location_id, item_id) - success is bool, location_type ('chest' or 'shop'), location_id and item_id if placed
     """
+    if rng is None:
+        rng = create_seeded_rng()
+    if chest_pool is None:
+        chest_pool = create_chest_pool(used_chests)
+    
     item_id = ITEM_NAME_TO_ID.get(key_item)
     if not item_id:
         if verbose:
-            print(f"Missing ID for item: {key_item}")
+            logger.debug("Missing ID for item: %s", key_item)
         return False, None, None, None
     
     # Get valid placement regions
@@ -404,18 +968,13 @@ def place_key_item_in_valid_region(key_item, collected_items, chest_contents, sh
     
     # If no specific regions defined, use base logic
     if not valid_regions:
-        accessible_chests = get_accessible_chests(collected_items)
-        available_chests = [chest_id for chest_id in accessible_chests if chest_id not in used_chests and chest_id != PORTRAIT_CHEST_ID]
+        chosen_chest_id = chest_pool.take(get_accessible_areas(collected_items), rng)
         
-        if not available_chests:
+        if chosen_chest_id is None:
             if verbose:
-                print(f"No accessible chests available for {key_item}")
+                logger.debug("No accessible chests available for %s", key_item)
             return False, None, None, None
         
-        # Choose a random chest
-        shuffle_array(available_chests)
-        chosen_chest_id = available_chests[0]
-        
         return True, 'chest', chosen_chest_id, item_id
     
     # Separate shop and chest regions
@@ -423,7 +982,7 @@ def place_key_item_in_valid_region(key_item, collected_items, chest_contents, sh
     shop_regions = [r for r in valid_regions if r.startswith('SHOP_')]
     
     # Randomly decide whether to place in chest or shop (if both are available)
-    place_in_shop = random.random() < 0.3 and shop_regions  # 30% chance to use shop if available
+    place_in_shop = rng.random() < 0.3 and shop_regions  # 30% chance to use shop if available
     
     if place_in_shop:
         # Filter for shops that are in the valid regions and have slots available
@@ -433,7 +992,7 @@ def place_key_item_in_valid_region(key_item, collected_items, chest_contents, sh
                 available_shop_ids.append(shop_id)
         
         if available_shop_ids:
-            shuffle_array(available_shop_ids)
+            shuffle_array(available_shop_ids, rng)
             chosen_shop_id = available_shop_ids[0]
             
             # Track used shop slots
@@ -444,24 +1003,17 @@ def place_key_item_in_valid_region(key_item, collected_items, chest_contents, sh
             
             return True, 'shop', chosen_shop_id, item_id
     
-    # Get all chests in the valid regions
-    valid_chests = get_chests_for_regions(chest_regions)
-    
-    # Filter out already used chests and Portrait chest
-    available_chests = [chest_id for chest_id in valid_chests if chest_id not in used_chests and chest_id != PORTRAIT_CHEST_ID]
+    # Choose a random free chest in the valid regions
+    chosen_chest_id = chest_pool.take(chest_regions, rng)
     
-    if not available_chests:
+    if chosen_chest_id is None:
         if verbose:
-            print(f"No available chests in valid regions for {key_item}")
+            logger.debug("No available chests in valid regions for %s", key_item)
         return False, None, None, None
     
-    # Choose a random chest
-    shuffle_array(available_chests)
-    chosen_chest_id = available_chests[0]
-    
     return True, 'chest', chosen_chest_id, item_id
 
-def place_starstones(chest_contents, shop_contents, used_chests, collected_items, verbose=False):
+def place_starstones(chest_contents, shop_contents, used_chests, collected_items, verbose=False, rng=None, chest_pool=None):
     """
     Place 5 Starstones needed to access Astarica
     
@@ -471,43 +1023,43 @@ def place_starstones(chest_contents, shop_contents, used_chests, collected_items
         used_chests (set): Chests that have already been used
         collected_items (set): Currently collected items
         verbose (bool): Whether to print verbose output
-        
+        rng (SeededRNG): Random number generator
+        chest_pool (LocationPool): Free chests by area, built from used_chests if not given
+    
     Returns:
         bool: True if successfully placed all 5 Starstones
     """
+    if rng is None:
+        rng = create_seeded_rng()
+    if chest_pool is None:
+        chest_pool = create_chest_pool(used_chests)
+    
     starstone_id = ITEM_NAME_TO_ID.get('Starstone')
     if not starstone_id:
         if verbose:
-            print(f"Missing ID for Starstone item")
+            logger.debug("Missing ID for Starstone item")
         return False
     
     starstone_locations = 0
     
-    # Get accessible areas and chests for late-game areas where Starstones should be placed
-    late_area_chests = []
-    for area in ['NEOTOKYO_SEWER', 'MU_REGION', 'GREAT_LAKES_CAVERN',]:
-        if area in PROGRESSION_AREAS:
-            late_area_chests.extend([chest_id for chest_id in PROGRESSION_AREAS[area]['contains'] 
-                                     if chest_id not in used_chests and chest_id != PORTRAIT_CHEST_ID])
+    # Late-game areas where Starstones should be placed
+    late_areas = ['NEOTOKYO_SEWER', 'MU_REGION', 'GREAT_LAKES_CAVERN']
     
     # If we don't have enough late-game chests, use any accessible chests
-    if len(late_area_chests) < 3:
-        accessible_chests = get_accessible_chests(collected_items)
-        late_area_chests.extend([chest_id for chest_id in accessible_chests 
-                                if chest_id not in used_chests and chest_id not in late_area_chests and chest_id != PORTRAIT_CHEST_ID])
-    
-    # Shuffle the chest list
-    shuffle_array(late_area_chests)
+    if chest_pool.count(late_areas) < 3:
+        late_areas = late_areas + get_accessible_areas(collected_items)
     
     # Place up to 3 Starstones in chests
-    for i in range(min(3, len(late_area_chests))):
-        chest_id = late_area_chests[i]
+    for i in range(3):
+        chest_id = chest_pool.take(late_areas, rng)
+        if chest_id is None:
+            break
         chest_contents[chest_id] = starstone_id
         used_chests.add(chest_id)
         starstone_locations += 1
         
         if verbose:
-            print(f"Placed Starstone #{starstone_locations} in chest {chest_id} ({get_chest_location_name(chest_id)})")
+            logger.debug("Placed Starstone #%s in chest %s (%s)", starstone_locations, chest_id, get_chest_location_name(chest_id))
     
     # Get late-game shops for the remaining Starstones
     late_game_shops = []
@@ -522,7 +1074,7 @@ def place_starstones(chest_contents, shop_contents, used_chests, collected_items
                                if shop_id not in late_game_shops])
     
     # Shuffle the shop list
-    shuffle_array(late_game_shops)
+    shuffle_array(late_game_shops, rng)
     
     # Place remaining Starstones in shops
     for i in range(min(5 - starstone_locations, len(late_game_shops))):
@@ -532,7 +1084,7 @@ def place_starstones(chest_contents, shop_contents, used_chests, collected_items
             shop_contents[shop_id] = []
         
         # Add Starstone to shop with a price
-        price = 350 + random.randint(0, 200)
+        price = 350 + rng.randint(0, 200)
         shop_contents[shop_id].append({
             'itemId': starstone_id,
             'name': 'Starstone',
@@ -545,51 +1097,55 @@ def place_starstones(chest_contents, shop_contents, used_chests, collected_items
         starstone_locations += 1
         if verbose:
             shop_name = SHOP_ID_TO_NAME.get(shop_id, shop_id)
-            print(f"Placed Starstone #{starstone_locations} in shop {shop_name} for {price} gems")
+            logger.debug("Placed Starstone #%s in shop %s for %s gems", starstone_locations, shop_name, price)
     
     # We still need more Starstones - use any remaining chests
-    if starstone_locations < 5:
-        remaining_chests = [chest_id for chest_id in CHEST_MAP.keys() if chest_id not in used_chests and chest_id != PORTRAIT_CHEST_ID]
-        shuffle_array(remaining_chests)
-        
-        for i in range(min(5 - starstone_locations, len(remaining_chests))):
-            chest_id = remaining_chests[i]
-            chest_contents[chest_id] = starstone_id
-            used_chests.add(chest_id)
-            starstone_locations += 1
-            
-            if verbose:
-                print(f"Placed Starstone #{starstone_locations} in chest {chest_id} ({get_chest_location_name(chest_id)}) (fallback)")
+    while starstone_locations < 5:
+        chest_id = chest_pool.take([ALL_CHESTS_REGION], rng)
+        if chest_id is None:
+            break
+        
+        chest_contents[chest_id] = starstone_id
+        used_chests.add(chest_id)
+        starstone_locations += 1
+        
+        if verbose:
+            logger.debug("Placed Starstone #%s in chest %s (%s) (fallback)", starstone_locations, chest_id, get_chest_location_name(chest_id))
     
     # Check if we placed all 5
     if starstone_locations >= 5:
         if verbose:
-            print(f"Successfully placed all 5 Starstones")
+            logger.debug("Successfully placed all 5 Starstones")
         return True
     else:
         if verbose:
-            print(f"Warning: Could only place {starstone_locations}/5 Starstones")
+            logger.warning("Warning: Could only place %s/5 Starstones", starstone_locations)
         return False
 
-def create_logical_placement(verbose=False):
+def create_logical_placement(verbose=False, rng=None):
     """
     Create a logical placement of items in chests that ensures the game is beatable
     
     Args:
         verbose (bool): Whether to print detailed logs
-        
+        rng (SeededRNG): Random number generator
+    
     Returns:
         dict: Map of chest IDs to item IDs or None if failed
     """
+    if rng is None:
+        rng = create_seeded_rng()
+    
     if verbose:
-        print("Creating logical placement...")
-        print("NOTE: Portrait (chest 150) will remain in vanilla location")
+        logger.debug("Creating logical placement...")
+        logger.debug("NOTE: Portrait (chest 150) will remain in vanilla location")
     
     # Prepare our chest and shop placement maps
     chest_contents = {}
     shop_contents = {}
     used_chests = set()
     used_shop_slots = {}
+    chest_pool = create_chest_pool(used_chests)
     
     # Track placed items to ensure only one copy of each in the world
     placed_items = set()
@@ -602,15 +1158,11 @@ def create_logical_placement(verbose=False):
     mid_essentials = ['Red Scarf', 'Protect Bell', 'Dog Whistle', 'Tower Key']
     
     # Place early essentials in very accessible areas
-    early_chests = get_chests_for_regions(['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE'])
-    # Remove Portrait chest
-    if PORTRAIT_CHEST_ID in early_chests:
-        early_chests.remove(PORTRAIT_CHEST_ID)
-    shuffle_array(early_chests)
+    early_areas = ['UNDERWORLD_START', 'TREE_CAVE_ENTRANCE']
     
-    for i, key_item in enumerate(early_essentials):
-        if i < len(early_chests):
-            chest_id = early_chests[i]
+    for key_item in early_essentials:
+        chest_id = chest_pool.take(early_areas, rng)
+        if chest_id is not None:
             item_id = ITEM_NAME_TO_ID.get(key_item)
             
             if item_id:
@@ -621,26 +1173,24 @@ def create_logical_placement(verbose=False):
                 collected_items.add(key_item)
                 
                 if verbose:
-                    print(f"Placed {key_item} in chest {chest_id} ({get_chest_location_name(chest_id)})")
+                    logger.debug("Placed %s in chest %s (%s)", key_item, chest_id, get_chest_location_name(chest_id))
             else:
                 if verbose:
-                    print(f"Missing ID for item: {key_item}")
+                    logger.debug("Missing ID for item: %s", key_item)
                 return None
     
     # Now place Starstones
-    if not place_starstones(chest_contents, shop_contents, used_chests, collected_items, verbose):
+    if not place_starstones(chest_contents, shop_contents, used_chests, collected_items, verbose, rng, chest_pool):
         if verbose:
-            print("Failed to place all 5 Starstones")
+            logger.debug("Failed to place all 5 Starstones")
         return None
     
     # Add special handling for mid-game essentials
-    mid_game_chests = get_chests_for_regions(['SURFACE_INITIAL', 'GRECLIFF_ENTRANCE', 'GRECLIFF_MIDDLE', 'EKLEMATA_REGION'])
-    mid_game_chests = [chest_id for chest_id in mid_game_chests if chest_id not in used_chests and chest_id != PORTRAIT_CHEST_ID]
-    shuffle_array(mid_game_chests)
+    mid_game_areas = ['SURFACE_INITIAL', 'GRECLIFF_ENTRANCE', 'GRECLIFF_MIDDLE', 'EKLEMATA_REGION']
     
-    for i, key_item in enumerate(mid_essentials):
-        if i < len(mid_game_chests):
-            chest_id = mid_game_chests[i]
+    for key_item in mid_essentials:
+        chest_id = chest_pool.take(mid_game_areas, rng)
+        if chest_id is not None:
             item_id = ITEM_NAME_TO_ID.get(key_item)
             
             if item_id:
@@ -651,10 +1201,10 @@ def create_logical_placement(verbose=False):
                 collected_items.add(key_item)
                 
                 if verbose:
-                    print(f"Placed {key_item} in chest {chest_id} ({get_chest_location_name(chest_id)})")
+                    logger.debug("Placed %s in chest %s (%s)", key_item, chest_id, get_chest_location_name(chest_id))
             else:
                 if verbose:
-                    print(f"Missing ID for item: {key_item}")
+                    logger.debug("Missing ID for item: %s", key_item)
                 return None
     
     # Fill remaining chests with regular items
@@ -666,23 +1216,18 @@ def create_logical_placement(verbose=False):
     remaining_chests = [chest_id for chest_id in all_known_chest_ids if chest_id not in used_chests]
     
     # Get all non-key items for filling the rest
-    from terranigma_randomizer.constants.items import ITEM_DATABASE
-    regular_items = []
-    for id_hex, item in ITEM_DATABASE.items():
-        if item['name'] not in PROGRESSION_KEY_ITEMS:
-            try:
-                regular_items.append(int(id_hex, 16))
-            except ValueError:
-                # Skip if id_hex is not a valid hexadecimal
-                continue
+    regular_items = [
+        item_id for item_id, item in ITEM_BY_ID.items()
+        if item['name'] not in PROGRESSION_KEY_ITEMS
+    ]
     
     # Ensure we have enough items
     if len(regular_items) == 0:
         if verbose:
-            print("No regular items found!")
+            logger.debug("No regular items found!")
         return None
     
-    shuffle_array(regular_items)
+    shuffle_array(regular_items, rng)
     
     # Fill remaining chests
     for i, chest_id in enumerate(remaining_chests):
@@ -698,10 +1243,10 @@ def create_logical_placement(verbose=False):
     # Validate the placement
     if validate_game_progress(chest_contents, shop_contents, verbose):
         if verbose:
-            print("Placement validated - game is beatable!")
-            print(f"Portrait remains in chest {PORTRAIT_CHEST_ID}")
+            logger.debug("Placement validated - game is beatable!")
+            logger.debug("Portrait remains in chest %s", PORTRAIT_CHEST_ID)
         return chest_contents
     else:
         if verbose:
-            print("Placement validation failed - game is not beatable!")
+            logger.debug("Placement validation failed - game is not beatable!")
         return None
\ No newline at end of file
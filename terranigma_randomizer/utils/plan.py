@@ -0,0 +1,237 @@
+"""
+Placement plan format for Terranigma Randomizer
+
+A plan holds every ROM write a seed makes, so it can be stored and later
+applied to a base ROM without running placement or logic again.
+"""
+
+import json
+import struct
+from terranigma_randomizer.constants.items import CHEST_ITEM_ID_LOW_OFFSET, CHEST_ITEM_ID_HIGH_OFFSET
+from terranigma_randomizer.constants.chests import CHEST_MAP
+from terranigma_randomizer.constants.shops import (
+    KNOWN_SHOPS, SHOP_ID_TO_INDEX, decimal_to_bcd, SHOP_ITEM_ENTRY_SIZE
+)
+from terranigma_randomizer.utils.rom import as_patch_buffer
+from terranigma_randomizer.utils.asm import apply_asm_patches
+
+PLAN_FORMAT = 'terranigma-plan'
+PLAN_VERSION = 1
+
+# Options that select ASM patches, in the bit order of the binary flags byte
+PLAN_PATCH_OPTIONS = ['skip_intro', 'enable_boss_magic']
+
+# Shops hold at most this many items, the writer drops the rest
+PLAN_MAX_SHOP_ITEMS = 15
+
+# Binary encoding: header, then (chest ID, item ID) pairs, then each shop as
+# (shop ID, item count) followed by (item ID, BCD price, limit) entries. A
+# shop item entry has the same layout as in the ROM shop tables.
+PLAN_MAGIC = b'TNPL'
+PLAN_HEADER = struct.Struct('<4sBBqHB')
+PLAN_CHEST = struct.Struct('<HH')
+PLAN_SHOP = struct.Struct('<BB')
+PLAN_SHOP_ITEM = struct.Struct('<BHB')
+
+def create_plan(seed, chest_contents, shops, options):
+    """
+    Create a plan from a finished placement
+    
+    Args:
+        seed (int): Seed the placement was made with
+        chest_contents (dict): Map of chest IDs to item IDs
+        shops (list): Shop objects as passed to write_shops_to_rom
+        options (dict): Randomization options, for the ASM patch flags
+    
+    Returns:
+        dict: Plan with the chest writes, the shop entries as raw
+              [item ID, BCD price, limit] values and the ASM patches
+    """
+    return {
+        'format': PLAN_FORMAT,
+        'version': PLAN_VERSION,
+        'seed': seed,
+        'patches': [name for name in PLAN_PATCH_OPTIONS if options.get(name, False)],
+        'chests': [[chest_id, item_id] for chest_id, item_id in sorted(chest_contents.items())],
+        'shops': [
+            [shop['id'], [
+                [item['itemId'] & 0xFF, item.get('bcdPrice', decimal_to_bcd(item['price'])), item['limit'] & 0xFF]
+                for item in shop['items'][:PLAN_MAX_SHOP_ITEMS]
+            ]]
+            for shop in shops
+        ]
+    }
+
+def check_plan(plan):
+    """
+    Check that a plan can be applied by this version of the randomizer
+    
+    Args:
+        plan (dict): Plan to check
+    
+    Raises:
+        ValueError: If the plan has an unknown format or version, or refers
+                    to chests or shops that are not known
+    """
+    if plan.get('format') != PLAN_FORMAT:
+        raise ValueError("Not a Terranigma Randomizer plan")
+    if plan.get('version') != PLAN_VERSION:
+        raise ValueError(f"Unsupported plan version {plan.get('version')} (expected {PLAN_VERSION})")
+    
+    for chest_id, _ in plan['chests']:
+        if chest_id not in CHEST_MAP:
+            raise ValueError(f"Plan refers to unknown chest {chest_id}")
+    for shop_id, items in plan['shops']:
+        if shop_id not in SHOP_ID_TO_INDEX:
+            raise ValueError(f"Plan refers to unknown shop {shop_id}")
+        if len(items) > PLAN_MAX_SHOP_ITEMS:
+            raise ValueError(f"Plan puts {len(items)} items in shop {shop_id}")
+    for name in plan['patches']:
+        if name not in PLAN_PATCH_OPTIONS:
+            raise ValueError(f"Plan refers to unknown patch {name}")
+
+def encode_plan(plan):
+    """
+    Encode a plan in the compact binary format
+    
+    Args:
+        plan (dict): Plan from create_plan
+    
+    Returns:
+        bytes: Binary plan
+    """
+    flags = sum(1 << bit for bit, name in enumerate(PLAN_PATCH_OPTIONS) if name in plan['patches'])
+    data = [PLAN_HEADER.pack(PLAN_MAGIC, plan['version'], flags, plan['seed'], len(plan['chests']), len(plan['shops']))]
+    
+    for chest_id, item_id in plan['chests']:
+        data.append(PLAN_CHEST.pack(chest_id, item_id))
+    for shop_id, items in plan['shops']:
+        data.append(PLAN_SHOP.pack(shop_id, len(items)))
+        for item_id, bcd_price, limit in items:
+            data.append(PLAN_SHOP_ITEM.pack(item_id, bcd_price, limit))
+    
+    return b''.join(data)
+
+def decode_plan(data):
+    """
+    Decode a plan from the compact binary format
+    
+    Args:
+        data (bytes): Binary plan
+    
+    Returns:
+        dict: Plan in the same form as create_plan returns
+    
+    Raises:
+        ValueError: If the data is not a binary plan
+    """
+    try:
+        magic, version, flags, seed, chest_count, shop_count = PLAN_HEADER.unpack_from(data)
+        if magic != PLAN_MAGIC:
+            raise ValueError("Not a Terranigma Randomizer plan")
+        offset = PLAN_HEADER.size
+        
+        chests = []
+        for _ in range(chest_count):
+            chests.append(list(PLAN_CHEST.unpack_from(data, offset)))
+            offset += PLAN_CHEST.size
+        
+        shops = []
+        for _ in range(shop_count):
+            shop_id, item_count = PLAN_SHOP.unpack_from(data, offset)
+            offset += PLAN_SHOP.size
+            items = []
+            for _ in range(item_count):
+                items.append(list(PLAN_SHOP_ITEM.unpack_from(data, offset)))
+                offset += PLAN_SHOP_ITEM.size
+            shops.append([shop_id, items])
+    except struct.error as e:
+        raise ValueError(f"Truncated plan: {e}")
+    
+    return {
+        'format': PLAN_FORMAT,
+        'version': version,
+        'seed': seed,
+        'patches': [name for bit, name in enumerate(PLAN_PATCH_OPTIONS) if flags & (1 << bit)],
+        'chests': chests,
+        'shops': shops
+    }
+
+def save_plan(plan, filepath, binary=False):
+    """
+    Write a plan to a file
+    
+    Args:
+        plan (dict): Plan from create_plan
+        filepath (str): Path to the plan file
+        binary (bool): Whether to use the binary format instead of JSON
+    """
+    if binary:
+        with open(filepath, 'wb') as f:
+            f.write(encode_plan(plan))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(plan, f, separators=(',', ':'))
+
+def load_plan(filepath):
+    """
+    Read a plan from a file in either format
+    
+    Args:
+        filepath (str): Path to the plan file
+    
+    Returns:
+        dict: Plan, checked with check_plan
+    """
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    
+    if data.startswith(PLAN_MAGIC):
+        plan = decode_plan(data)
+    else:
+        plan = json.loads(data)
+    
+    check_plan(plan)
+    return plan
+
+def apply_plan(rom_data, plan):
+    """
+    Apply a plan to a base ROM
+    
+    Only the planned bytes are written, in the order the randomizer writes
+    them: chests, then shops, then the ASM patches, and the internal
+    checksum is updated last.
+    
+    Args:
+        rom_data (bytes or RomPatchBuffer): Base ROM
+        plan (dict): Plan from create_plan or load_plan
+    
+    Returns:
+        RomPatchBuffer: ROM buffer with the plan applied
+    
+    Raises:
+        ValueError: If a planned write falls outside the ROM
+    """
+    patched_rom = as_patch_buffer(rom_data)
+    
+    try:
+        for chest_id, item_id in plan['chests']:
+            address = CHEST_MAP[chest_id]['address']
+            patched_rom[address + CHEST_ITEM_ID_LOW_OFFSET] = item_id & 0xFF
+            patched_rom[address + CHEST_ITEM_ID_HIGH_OFFSET] = (item_id >> 8) & 0xFF
+        
+        for shop_id, items in plan['shops']:
+            file_offset = KNOWN_SHOPS[SHOP_ID_TO_INDEX[shop_id]]['fileOffset']
+            end_offset = file_offset + len(items) * SHOP_ITEM_ENTRY_SIZE
+            if end_offset >= len(patched_rom):
+                raise IndexError(end_offset)
+            
+            # Item entries followed by the 0xFF end marker
+            entries = b''.join(PLAN_SHOP_ITEM.pack(*item) for item in items) + b'\xff'
+            patched_rom[file_offset:end_offset + 1] = entries
+    except IndexError:
+        raise ValueError("Plan writes past the end of the ROM")
+    
+    patched_rom = apply_asm_patches(patched_rom, {name: True for name in plan['patches']})
+    patched_rom.update_checksum()
+    return patched_rom
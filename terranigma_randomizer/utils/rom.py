@@ -2,6 +2,42 @@
 ROM reading and writing utilities for Terranigma Randomizer
 """
 
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import zlib
+
+# Copier header that some dumps carry in front of the ROM image
+SMC_HEADER_SIZE = 512
+
+# Size of the Terranigma ROM image without a copier header (32 Mbit)
+EXPECTED_ROM_SIZE = 0x400000
+
+# SNES internal header checksum fields of the HiROM image: the complement
+# at $FFDC and the 16-bit sum of every ROM byte at $FFDE, both little endian
+SNES_CHECKSUM_COMPLEMENT_ADDRESS = 0xFFDC
+SNES_CHECKSUM_ADDRESS = 0xFFDE
+
+# SNES internal header title (21 bytes of ASCII padded with spaces) and map
+# mode of the HiROM image
+SNES_TITLE_ADDRESS = 0xFFC0
+SNES_TITLE_SIZE = 21
+SNES_MAP_MODE_ADDRESS = 0xFFD5
+
+# Internal title of the Terranigma release the chest and shop tables are for
+EXPECTED_ROM_TITLE = 'TERRANIGMA'
+
+# HiROM map modes, at SlowROM and FastROM speed
+SNES_HIROM_MAP_MODES = (0x21, 0x31)
+
+# Bytes hashed at a time when fingerprinting a ROM
+FINGERPRINT_CHUNK_SIZE = 0x100000
+
+# Fingerprints computed in this process, by path, modification time and size
+_fingerprint_cache = {}
+
 def read_rom(filepath):
     """
     Read ROM data from a file
@@ -15,21 +51,238 @@ def read_rom(filepath):
     with open(filepath, 'rb') as f:
         return bytearray(f.read())
 
-def write_rom(filepath, data):
+def map_rom(filepath):
+    """
+    Map a ROM file into memory read-only
+    
+    Nothing is copied when the ROM is loaded, and processes that map the
+    same file share its pages. The map can be indexed like a bytearray and
+    wrapped in a RomPatchBuffer for writing. The caller closes it, see
+    open_rom_image for a map that is closed when it is no longer needed.
+    
+    Args:
+        filepath (str): Path to the ROM file
+        
+    Returns:
+        mmap.mmap: Read-only ROM data
+    """
+    with open(filepath, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def map_rom_image(filepath):
+    """
+    Map a ROM file and get its image without any copier header
+    
+    Args:
+        filepath (str): Path to the ROM file
+        
+    Returns:
+        tuple: (copier header, empty if there is none; ROM image from split_smc_header)
+    """
+    return split_smc_header(map_rom(filepath))
+
+@contextlib.contextmanager
+def open_rom_image(filepath, copy=False):
+    """
+    Load a ROM image for the duration of a with block
+    
+    The ROM is mapped as by map_rom_image and the map is closed when the
+    block ends, so the input file is not held open afterwards. Views of the
+    image must not outlive the block.
+    
+    Args:
+        filepath (str): Path to the ROM file
+        copy (bool): Read the ROM into memory instead of mapping it, for
+                     when the block overwrites the ROM file
+        
+    Yields:
+        tuple: (copier header, empty if there is none; ROM image)
+    """
+    if copy:
+        yield split_smc_header(read_rom(filepath))
+        return
+    
+    rom_map = map_rom(filepath)
+    header, image = split_smc_header(rom_map)
+    try:
+        yield header, image
+    finally:
+        if isinstance(image, memoryview):
+            image.release()
+        try:
+            rom_map.close()
+        except BufferError:
+            # A view of the map is still referenced, it is closed when collected
+            pass
+
+def write_rom(filepath, data, header=b''):
     """
     Write ROM data to a file
     
     Args:
         filepath (str): Path to the output ROM file
-        data (bytearray): ROM data to write
+        data (bytearray or RomPatchBuffer): ROM data to write
+        header (bytes): Copier header to write in front of the ROM image
         
     Returns:
         bool: True if successful
     """
+    if isinstance(data, RomPatchBuffer):
+        data = data.materialize()
     with open(filepath, 'wb') as f:
+        f.write(header)
         f.write(data)
     return True
 
+def has_smc_header(rom_data):
+    """
+    Check whether ROM data starts with a copier header
+    
+    SNES ROM images are a multiple of 1 KiB, so 512 extra bytes are a header.
+    
+    Args:
+        rom_data (bytes): ROM data
+        
+    Returns:
+        bool: True if the data has a copier header
+    """
+    return len(rom_data) % 1024 == SMC_HEADER_SIZE
+
+def split_smc_header(rom_data):
+    """
+    Separate a copier header from the ROM image
+    
+    The image is a memoryview into rom_data rather than a copy, so chest
+    addresses and shop offsets can index it directly whether or not the
+    dump had a header.
+    
+    Args:
+        rom_data (bytes): ROM data, such as a map from map_rom
+        
+    Returns:
+        tuple: (copier header, empty if there is none; ROM image)
+    """
+    if not has_smc_header(rom_data):
+        return b'', rom_data
+    return bytes(rom_data[:SMC_HEADER_SIZE]), memoryview(rom_data)[SMC_HEADER_SIZE:]
+
+def fingerprint_rom(rom_data):
+    """
+    Fingerprint a ROM image
+    
+    The ROM is hashed in chunks over a memoryview, so nothing is copied even
+    when the data is a memory map. A copier header is skipped, so headered
+    and unheadered dumps of the same ROM get the same digests.
+    
+    Args:
+        rom_data (bytes): ROM data
+        
+    Returns:
+        dict: Size without the header, whether there was a header, the
+              internal title and map mode (empty and None if the image is
+              too small to have them), and the CRC32 and SHA-1 of the ROM
+              image as hex strings
+    """
+    view = memoryview(rom_data)
+    headered = has_smc_header(view)
+    if headered:
+        view = view[SMC_HEADER_SIZE:]
+    
+    title = ''
+    map_mode = None
+    if len(view) > SNES_MAP_MODE_ADDRESS:
+        title_bytes = bytes(view[SNES_TITLE_ADDRESS:SNES_TITLE_ADDRESS + SNES_TITLE_SIZE])
+        title = title_bytes.decode('ascii', errors='replace').rstrip(' \x00')
+        map_mode = view[SNES_MAP_MODE_ADDRESS]
+    
+    crc32 = 0
+    sha1 = hashlib.sha1()
+    for start in range(0, len(view), FINGERPRINT_CHUNK_SIZE):
+        chunk = view[start:start + FINGERPRINT_CHUNK_SIZE]
+        crc32 = zlib.crc32(chunk, crc32)
+        sha1.update(chunk)
+    
+    return {
+        'size': len(view),
+        'headered': headered,
+        'title': title,
+        'map_mode': map_mode,
+        'crc32': f"{crc32:08X}",
+        'sha1': sha1.hexdigest()
+    }
+
+def get_rom_fingerprint(filepath, cache_path=None):
+    """
+    Fingerprint a ROM file, reusing the result while the file is unchanged
+    
+    Results are kept by path, modification time and size for the rest of the
+    process, and in the JSON file at cache_path if one is given, so repeat
+    runs do not hash the ROM again.
+    
+    Args:
+        filepath (str): Path to the ROM file
+        cache_path (str): JSON file to keep fingerprints in across runs
+        
+    Returns:
+        dict: Fingerprint from fingerprint_rom
+    """
+    path = os.path.abspath(filepath)
+    stat = os.stat(path)
+    key = f"{path}|{stat.st_mtime_ns}|{stat.st_size}"
+    if key in _fingerprint_cache:
+        return _fingerprint_cache[key]
+    
+    stored = {}
+    if cache_path:
+        try:
+            with open(cache_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+    
+    # Fingerprints stored by earlier versions lack the header fields
+    fingerprint = stored.get(key)
+    if fingerprint is None or 'map_mode' not in fingerprint:
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as rom_data:
+                fingerprint = fingerprint_rom(rom_data)
+        
+        if cache_path:
+            # Drop fingerprints of earlier versions of the same file
+            stored = {name: value for name, value in stored.items() if not name.startswith(path + '|')}
+            stored[key] = fingerprint
+            temp_path = f"{cache_path}.tmp-{os.getpid()}"
+            with open(temp_path, 'w') as f:
+                json.dump(stored, f, indent=1)
+            os.replace(temp_path, cache_path)
+    
+    _fingerprint_cache[key] = fingerprint
+    return fingerprint
+
+def check_rom_fingerprint(fingerprint):
+    """
+    Check that a fingerprinted ROM can be randomized
+    
+    The ROM must be 32 Mbit and its internal header must name Terranigma and
+    use the HiROM map mode, so other games and broken dumps are rejected
+    before any chest or shop data is read from them.
+    
+    Args:
+        fingerprint (dict): Fingerprint from fingerprint_rom
+        
+    Returns:
+        list: Descriptions of the problems found, empty if the ROM is usable
+    """
+    problems = []
+    if fingerprint['size'] != EXPECTED_ROM_SIZE:
+        problems.append(f"ROM is {fingerprint['size']} bytes, expected {EXPECTED_ROM_SIZE} (32 Mbit)")
+    if fingerprint['title'] != EXPECTED_ROM_TITLE:
+        problems.append(f"ROM title is {fingerprint['title']!r}, expected {EXPECTED_ROM_TITLE!r}")
+    if fingerprint['map_mode'] not in SNES_HIROM_MAP_MODES:
+        map_mode = 'missing' if fingerprint['map_mode'] is None else f"${fingerprint['map_mode']:02X}"
+        problems.append(f"ROM map mode is {map_mode}, expected HiROM")
+    return problems
+
 def read_byte(rom_data, address):
     """
     Read a single byte from ROM
@@ -84,3 +337,271 @@ def write_word(rom_data, address, value):
     """
     rom_data[address] = value & 0xFF
     rom_data[address + 1] = (value >> 8) & 0xFF
+
+class RomPatchBuffer:
+    """
+    Copy-on-write ROM image
+    
+    Reads fall through to a view of the base ROM unless the byte has been
+    written, and writes are kept in an overlay, never in the base. Several writers can
+    share one buffer without copying the ROM, and the final image is built
+    once with materialize().
+    
+    Args:
+        base (bytes): Base ROM data, which is never modified
+    """
+    
+    def __init__(self, base):
+        self.base = memoryview(base)
+        self.patches = {}
+    
+    def __len__(self):
+        return len(self.base)
+    
+    def _address(self, address):
+        if address < 0:
+            address += len(self.base)
+        if not 0 <= address < len(self.base):
+            raise IndexError("ROM address out of range")
+        return address
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            addresses = range(*key.indices(len(self.base)))
+            data = bytearray(self.base[key])
+            for address, value in self.patches.items():
+                if address in addresses:
+                    data[addresses.index(address)] = value
+            return bytes(data)
+        address = self._address(key)
+        return self.patches.get(address, self.base[address])
+    
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            addresses = range(*key.indices(len(self.base)))
+            if len(addresses) != len(value):
+                raise ValueError("RomPatchBuffer slice assignment cannot change the ROM size")
+            for address, byte in zip(addresses, value):
+                self[address] = byte
+            return
+        if not 0 <= value <= 0xFF:
+            raise ValueError("byte must be in range(0, 256)")
+        self.patches[self._address(key)] = value
+    
+    def original(self, address):
+        """Read a byte from the base ROM, ignoring any writes"""
+        return self.base[address]
+    
+    def update_checksum(self):
+        """
+        Bring the SNES internal checksum and its complement up to date
+        
+        The checksum is the 16-bit sum of every byte in the ROM, so only the
+        written bytes can change it. The base ROM's checksum is adjusted by
+        their difference from the base instead of summing the image again.
+        The four checksum bytes themselves always add up to the same value
+        and are left out.
+        
+        Returns:
+            int: The new checksum
+        """
+        fields = range(SNES_CHECKSUM_COMPLEMENT_ADDRESS, SNES_CHECKSUM_ADDRESS + 2)
+        if len(self.base) < fields.stop:
+            raise ValueError("ROM is too small to have a SNES header")
+        
+        delta = sum(value - self.base[address] for address, value in self.patches.items() if address not in fields)
+        checksum = (read_word(self.base, SNES_CHECKSUM_ADDRESS) + delta) & 0xFFFF
+        
+        write_word(self, SNES_CHECKSUM_ADDRESS, checksum)
+        write_word(self, SNES_CHECKSUM_COMPLEMENT_ADDRESS, checksum ^ 0xFFFF)
+        return checksum
+    
+    def materialize(self):
+        """
+        Build the patched ROM image
+        
+        Returns:
+            bytearray: Base ROM with every write applied
+        """
+        data = bytearray(self.base)
+        for address, value in self.patches.items():
+            data[address] = value
+        return data
+
+def as_patch_buffer(rom_data):
+    """
+    Get a RomPatchBuffer for ROM data, reusing it if it already is one
+    
+    Args:
+        rom_data (bytes or RomPatchBuffer): ROM data
+        
+    Returns:
+        RomPatchBuffer: Buffer that writes can be made to
+    """
+    if isinstance(rom_data, RomPatchBuffer):
+        return rom_data
+    return RomPatchBuffer(rom_data)
+
+# IPS patch format constants
+IPS_HEADER = b'PATCH'
+IPS_FOOTER = b'EOF'
+IPS_MAX_OFFSET = 0xFFFFFF
+IPS_MAX_RECORD_SIZE = 0xFFFF
+# A record starting here would be read back as the footer
+IPS_FOOTER_OFFSET = 0x454F46
+# Unchanged gaps up to one record header long are cheaper to copy than to split on
+IPS_MERGE_GAP = 5
+IPS_COMPARE_BLOCK = 4096
+
+def find_changed_ranges(original, modified):
+    """
+    Find the byte ranges where modified differs from original
+    
+    Ranges separated by IPS_MERGE_GAP unchanged bytes or fewer are merged.
+    Bytes past the end of original always count as changed.
+    
+    Args:
+        original (bytes): Base ROM data
+        modified (bytes): Modified ROM data
+        
+    Returns:
+        list: (start, end) tuples with end exclusive
+    """
+    ranges = []
+    start = last = None
+    size = len(modified)
+    
+    for block_start in range(0, size, IPS_COMPARE_BLOCK):
+        block_end = min(block_start + IPS_COMPARE_BLOCK, size)
+        if original[block_start:block_end] == modified[block_start:block_end]:
+            continue
+        
+        for address in range(block_start, block_end):
+            if address < len(original) and original[address] == modified[address]:
+                continue
+            if start is not None and address - last - 1 <= IPS_MERGE_GAP:
+                last = address
+            else:
+                if start is not None:
+                    ranges.append((start, last + 1))
+                start = last = address
+    
+    if start is not None:
+        ranges.append((start, last + 1))
+    return ranges
+
+def create_ips_patch(original, modified, base_offset=0):
+    """
+    Create an IPS patch that turns original into modified
+    
+    Args:
+        original (bytes): Base ROM data
+        modified (bytes or RomPatchBuffer): Modified ROM data
+        base_offset (int): File offset of the data, the copier header size
+                           for a patch that applies to a headered file
+        
+    Returns:
+        bytes: IPS patch data
+    """
+    if isinstance(modified, RomPatchBuffer):
+        modified = modified.materialize()
+    if len(modified) + base_offset > IPS_MAX_OFFSET + 1:
+        raise ValueError("IPS patches cannot address ROMs larger than 16 MiB")
+    
+    patch = bytearray(IPS_HEADER)
+    for start, end in find_changed_ranges(original, modified):
+        offset = start
+        while offset < end:
+            if offset + base_offset == IPS_FOOTER_OFFSET:
+                offset -= 1
+            size = min(end - offset, IPS_MAX_RECORD_SIZE)
+            data = bytes(modified[offset:offset + size])
+            
+            patch += (offset + base_offset).to_bytes(3, 'big')
+            if size > 8 and data.count(data[0]) == size:
+                # RLE record: zero size, then run length and the repeated byte
+                patch += b'\x00\x00' + size.to_bytes(2, 'big') + data[:1]
+            else:
+                patch += size.to_bytes(2, 'big') + data
+            offset += size
+    
+    patch += IPS_FOOTER
+    if len(modified) < len(original):
+        patch += (len(modified) + base_offset).to_bytes(3, 'big')
+    return bytes(patch)
+
+def apply_ips_patch(rom_data, patch):
+    """
+    Apply an IPS patch to ROM data
+    
+    Args:
+        rom_data (bytes): Base ROM data
+        patch (bytes): IPS patch data
+        
+    Returns:
+        bytearray: Patched ROM data
+    """
+    if patch[:len(IPS_HEADER)] != IPS_HEADER:
+        raise ValueError("Not an IPS patch")
+    
+    patched = bytearray(rom_data)
+    position = len(IPS_HEADER)
+    
+    while patch[position:position + 3] != IPS_FOOTER:
+        if position + 5 > len(patch):
+            raise ValueError("IPS patch is truncated")
+        offset = int.from_bytes(patch[position:position + 3], 'big')
+        size = int.from_bytes(patch[position + 3:position + 5], 'big')
+        position += 5
+        
+        if size == 0:
+            size = int.from_bytes(patch[position:position + 2], 'big')
+            data = patch[position + 2:position + 3] * size
+            position += 3
+        else:
+            data = patch[position:position + size]
+            position += size
+        if len(data) != size:
+            raise ValueError("IPS patch is truncated")
+        
+        if offset + size > len(patched):
+            patched.extend(bytes(offset + size - len(patched)))
+        patched[offset:offset + size] = data
+    
+    # Optional truncation extension after the footer
+    position += 3
+    if len(patch) >= position + 3:
+        del patched[int.from_bytes(patch[position:position + 3], 'big'):]
+    
+    return patched
+
+def write_ips_patch(filepath, original, modified, base_offset=0):
+    """
+    Write an IPS patch that turns original into modified
+    
+    Args:
+        filepath (str): Path to the output patch file
+        original (bytes): Base ROM data
+        modified (bytes or RomPatchBuffer): Modified ROM data
+        base_offset (int): File offset of the data, see create_ips_patch
+        
+    Returns:
+        int: Size of the patch in bytes
+    """
+    patch = create_ips_patch(original, modified, base_offset)
+    with open(filepath, 'wb') as f:
+        f.write(patch)
+    return len(patch)
+
+def read_ips_patch(filepath):
+    """
+    Read an IPS patch file
+    
+    Args:
+        filepath (str): Path to the patch file
+        
+    Returns:
+        bytes: IPS patch data
+    """
+    with open(filepath, 'rb') as f:
+        return f.read()
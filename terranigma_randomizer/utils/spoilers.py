@@ -2,7 +2,9 @@
 Spoiler log generation functions for Terranigma Randomizer
 """
 
-from terranigma_randomizer.constants.items import PROGRESSION_KEY_ITEMS, ITEM_DATABASE, get_item_name, ITEM_NAME_TO_ID, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID
+from terranigma_randomizer.constants.items import PROGRESSION_KEY_ITEMS, ITEM_BY_ID, get_item_name, ITEM_NAME_TO_ID, PORTRAIT_CHEST_ID, PORTRAIT_ITEM_ID
+from terranigma_randomizer.constants.progression import SHOP_ID_TO_NAME
+from terranigma_randomizer.utils.logic import get_chest_location_name
 
 def generate_chest_spoiler_text(spoiler_log):
     """
@@ -142,6 +144,47 @@ def generate_shop_spoiler_text(shops, seed):
     
     return text
 
+def generate_playthrough_text(playthrough):
+    """
+    Generate the playthrough section of a spoiler log
+    
+    Args:
+        playthrough (dict): Playthrough from compute_playthrough
+        
+    Returns:
+        str: Playthrough text, sphere by sphere
+    """
+    def describe(entry):
+        if entry['type'] == 'shop':
+            shop_name = SHOP_ID_TO_NAME.get(entry['location'], entry['location'])
+            return f"{entry['item']}: Shop in {shop_name} - {entry['price']} gems"
+        return f"{entry['item']}: Chest in {get_chest_location_name(entry['location'])}"
+    
+    text = 'Playthrough:\n'
+    text += '============\n\n'
+    
+    if not playthrough['beatable']:
+        text += 'WARNING: The sweep could not collect every essential item!\n\n'
+    
+    for sphere, found in enumerate(playthrough['spheres']):
+        text += f"Sphere {sphere} ({len(playthrough['sphere_locations'][sphere])} new locations):\n"
+        for entry in found:
+            text += f"   - {describe(entry)}\n"
+        text += '\n'
+    
+    text += 'Required Items Playthrough:\n'
+    text += '==========================\n\n'
+    
+    for sphere, found in enumerate(playthrough['required']):
+        if not found:
+            continue
+        text += f"Sphere {sphere}:\n"
+        for entry in found:
+            text += f"   - {describe(entry)}\n"
+        text += '\n'
+    
+    return text
+
 def generate_enhanced_spoiler_text(result, seed):
     """
     Generate an enhanced spoiler log text file that includes shop information
@@ -272,8 +315,7 @@ def generate_enhanced_spoiler_text(result, seed):
     # Find unique weapons in chests
     unique_weapons_in_chests = []
     for entry in chest_spoiler_log:
-        id_hex = format(entry['newItemId'], '04X')
-        item_info = ITEM_DATABASE.get(id_hex, {})
+        item_info = ITEM_BY_ID.get(entry['newItemId'], {})
         if item_info.get('type') == 'weapon':
             unique_weapons_in_chests.append(entry)
     unique_weapons_in_chests.sort(key=lambda x: x['newItem'])
@@ -281,8 +323,7 @@ def generate_enhanced_spoiler_text(result, seed):
     # Find unique armor in chests
     unique_armor_in_chests = []
     for entry in chest_spoiler_log:
-        id_hex = format(entry['newItemId'], '04X')
-        item_info = ITEM_DATABASE.get(id_hex, {})
+        item_info = ITEM_BY_ID.get(entry['newItemId'], {})
         if item_info.get('type') == 'armor':
             unique_armor_in_chests.append(entry)
     unique_armor_in_chests.sort(key=lambda x: x['newItem'])
@@ -388,4 +429,7 @@ def generate_enhanced_spoiler_text(result, seed):
     
     text += '\n'
     
+    if result.get('playthrough'):
+        text += generate_playthrough_text(result['playthrough'])
+    
     return text
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Tests for the progression logic helpers
+"""
+
+from terranigma_randomizer.constants.items import ITEM_NAME_TO_ID
+from terranigma_randomizer.constants.progression import PROGRESSION_AREAS
+from terranigma_randomizer.utils.logic import create_seeded_rng, get_accessible_areas, place_starstones
+
+def test_place_starstones_falls_back_to_any_chest():
+    # Fill every late-game and starting chest so only two Crysta shops are
+    # left before the any-chest fallback
+    late_areas = ['NEOTOKYO_SEWER', 'MU_REGION', 'GREAT_LAKES_CAVERN']
+    used_chests = set()
+    for area_name in late_areas + get_accessible_areas(set()):
+        used_chests.update(PROGRESSION_AREAS[area_name]['contains'])
+
+    chest_contents = {}
+    shop_contents = {}
+    placed = place_starstones(chest_contents, shop_contents, set(used_chests), set(), rng=create_seeded_rng(1))
+
+    starstone_id = ITEM_NAME_TO_ID['Starstone']
+    starstone_chests = [chest_id for chest_id, item_id in chest_contents.items() if item_id == starstone_id]
+    starstone_shop_items = [item for items in shop_contents.values() for item in items if item['itemId'] == starstone_id]
+
+    assert placed
+    assert len(starstone_chests) + len(starstone_shop_items) == 5
+    assert len(starstone_chests) == 3
+    assert not used_chests & set(starstone_chests)